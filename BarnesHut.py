@@ -0,0 +1,190 @@
+# agent
+# 10/18/2026
+
+import numpy as np
+from BodySystem import BodySystem
+
+# Barnes-Hut gravity
+# A quadtree is built over the body positions every pass, and distant groups of bodies are approximated by their center of mass
+# The tree is built from sorted Morton (z-order) keys, so every node is a contiguous run of the sorted bodies,
+# and it is walked for many bodies at once by keeping a frontier of (body, node) pairs
+# It always works in float64 (the precision of a BodySystem only changes direct gravity)
+class BarnesHut:
+	depth = 16 # number of levels the bounding square is split into (positions are quantized to 2^depth cells per side)
+	# roughly bounds the number of (body, node) pairs being walked at once
+	frontierElements = 1 << 20
+	frontierPerBody = 256 # rough number of frontier pairs a single body needs at the widest level
+
+	# positions: (n, 2) array, masses: (n,) array
+	def __init__(self, positions, masses):
+		self.positions = positions
+		self.masses = masses
+		n = len(masses)
+		self.lo = positions.min(axis = 0) if n > 0 else np.zeros(2)
+		# the side length of the root square (a little bigger than the bounding box so that every key fits)
+		self.size = max(float((positions.max(axis = 0) - self.lo).max()) if n > 0 else 0, 1e-12) * (1 + 1e-9)
+		self.keys = BarnesHut.mortonKeys(positions, self.lo, self.size)
+		self.order = np.argsort(self.keys, kind = 'stable')
+		self.build()
+
+	# Spreads the lower 32 bits of each value out so that there is a 0 bit between every original bit
+	@staticmethod
+	def spreadBits(v):
+		v = v.astype(np.uint64) & np.uint64(0xFFFFFFFF)
+		v = (v | (v << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+		v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+		v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+		v = (v | (v << np.uint64(2))) & np.uint64(0x3333333333333333)
+		v = (v | (v << np.uint64(1))) & np.uint64(0x5555555555555555)
+		return v
+
+	# Interleaves the quantized x and y coordinates of each position into a single z-order key
+	@staticmethod
+	def mortonKeys(positions, lo, size):
+		cells = 1 << BarnesHut.depth
+		q = np.clip(((positions - lo) / size * cells).astype(np.int64), 0, cells - 1)
+		return BarnesHut.spreadBits(q[:, 0]) | (BarnesHut.spreadBits(q[:, 1]) << np.uint64(1))
+
+	# Builds the nodes of every level from the sorted keys
+	# Level 0 is the root and level depth+1 holds the bodies themselves, so that cells at the finest level that hold
+	# more than one body can still be opened
+	def build(self):
+		sortedKeys = self.keys[self.order]
+		sortedMass = self.masses[self.order]
+		sortedPos = self.positions[self.order]
+		weighted = sortedPos * sortedMass[:, None]
+		n = len(sortedKeys)
+		starts, prefixes, levels = [], [], []
+		for level in range(BarnesHut.depth + 2):
+			if n == 0:
+				break
+			if level <= BarnesHut.depth:
+				prefix = sortedKeys >> np.uint64(2*(BarnesHut.depth - level))
+				first = np.flatnonzero(np.concatenate(([True], prefix[1:] != prefix[:-1])))
+				prefixes.append(prefix[first])
+			else:
+				first = np.arange(n)
+				prefixes.append(sortedKeys)
+			starts.append(first)
+			levels.append(np.full(len(first), level))
+		self.levelOffsets = np.cumsum([0] + [len(s) for s in starts])
+		if n == 0:
+			self.start = self.count = self.childStart = self.childCount = self.level = np.zeros(0, dtype = np.intp)
+			self.prefix = np.zeros(0, dtype = np.uint64)
+			self.mass = self.nodeSize = np.zeros(0)
+			self.com = np.zeros((0, 2))
+			return
+		self.start = np.concatenate(starts)
+		ends = np.concatenate([np.append(s[1:], n) for s in starts])
+		self.count = ends - self.start
+		self.level = np.concatenate(levels)
+		self.prefix = np.concatenate(prefixes)
+		self.mass = np.concatenate([np.add.reduceat(sortedMass, s) for s in starts])
+		self.com = np.concatenate([np.add.reduceat(weighted, s, axis = 0) for s in starts]) / self.mass[:, None]
+		# using the exact position of single bodies, since (pos*mass)/mass can be off by a rounding error,
+		# and a body sharing a position with its target has to come out at a distance of exactly 0 to be skipped
+		single = self.count == 1
+		self.com[single] = sortedPos[self.start[single]]
+		self.nodeSize = self.size / 2.0**np.minimum(self.level, BarnesHut.depth)
+		# the children of a node are the nodes on the next level whose runs start inside its run
+		self.childStart = np.zeros(len(self.start), dtype = np.intp)
+		self.childCount = np.zeros(len(self.start), dtype = np.intp)
+		for level in range(len(starts) - 1):
+			a, b = self.levelOffsets[level], self.levelOffsets[level + 1]
+			lo = np.searchsorted(starts[level + 1], self.start[a:b])
+			hi = np.searchsorted(starts[level + 1], ends[a:b])
+			self.childStart[a:b] = lo + self.levelOffsets[level + 1]
+			self.childCount[a:b] = hi - lo
+
+	# Returns the sum of (mass * displacement / distance^3) acting on each target, like BodySystem.pairwiseAccelerations
+	# targets are row indices into the positions the tree was built from (so that a body does not attract itself)
+	# theta is the opening angle: a node is approximated when its size divided by its distance is below theta
+	# When potential is true, the sums of (mass / distance) are returned as well, from the same nodes
+	def accelerations(self, targets, theta, potential = False):
+		acc = np.zeros((len(targets), 2))
+		pot = np.zeros(len(targets))
+		self.interactions = 0 # how many node-body interactions were summed
+		if len(targets) == 0 or len(self.start) == 0:
+			return (acc, pot) if potential else acc
+		# the position of each body in the sorted order, used to tell whether a leaf is the body itself
+		rank = np.empty(len(self.order), dtype = np.intp)
+		rank[self.order] = np.arange(len(self.order))
+		chunk = max(1, BarnesHut.frontierElements // BarnesHut.frontierPerBody)
+		for first in range(0, len(targets), chunk):
+			rows = np.arange(first, min(first + chunk, len(targets)))
+			self.walk(rows, targets[rows], rank[targets[rows]], theta, acc, pot)
+		return (acc, pot) if potential else acc
+
+	# Walks the tree for a batch of targets, adding onto acc[rows] and pot[rows]
+	def walk(self, rows, targets, targetRank, theta, acc, pot):
+		tPos = self.positions[targets]
+		tKey = self.keys[targets]
+		frontierT = np.arange(len(rows)) # position of the target within this batch
+		frontierN = np.zeros(len(rows), dtype = np.intp) # node index (starting from the root)
+		accX = np.zeros(len(rows))
+		accY = np.zeros(len(rows))
+		potSum = np.zeros(len(rows))
+		while len(frontierT) > 0:
+			d = self.com[frontierN] - tPos[frontierT]
+			r2 = (d**2).sum(axis = 1)
+			count = self.count[frontierN]
+			level = self.level[frontierN]
+			isLeaf = count == 1
+			# a single body leaf is the target itself when it sits at the target's place in the sorted order
+			isSelf = isLeaf & (self.start[frontierN] == targetRank[frontierT])
+			shift = (2*(BarnesHut.depth - np.minimum(level, BarnesHut.depth))).astype(np.uint64)
+			contains = (tKey[frontierT] >> shift) == self.prefix[frontierN]
+			opened = ~isLeaf & (contains | (self.nodeSize[frontierN]**2 >= theta**2 * r2))
+			accept = ~opened & ~isSelf & (r2 > 0)
+			t, dA, r2A = frontierT[accept], d[accept], r2[accept]
+			massA = self.mass[frontierN[accept]]
+			weight = massA * r2A**-1.5
+			self.interactions += len(t)
+			accX += np.bincount(t, weights = weight*dA[:, 0], minlength = len(rows))
+			accY += np.bincount(t, weights = weight*dA[:, 1], minlength = len(rows))
+			potSum += np.bincount(t, weights = massA * r2A**-0.5, minlength = len(rows))
+			# replacing every opened node with its children
+			t, nodes = frontierT[opened], frontierN[opened]
+			counts = self.childCount[nodes]
+			total = int(counts.sum())
+			offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+			frontierT = np.repeat(t, counts)
+			frontierN = np.repeat(self.childStart[nodes], counts) + offsets
+		acc[rows, 0] += accX
+		acc[rows, 1] += accY
+		pot[rows] += potSum
+
+	# Compares tree accelerations against direct summation for a random sample of bodies
+	# Returns the median, 99th percentile and max relative error of the acceleration vectors
+	@staticmethod
+	def forceError(positions, masses, theta, sample = 100, rng = None):
+		rng = np.random.default_rng() if rng is None else rng
+		n = len(masses)
+		if n < 2:
+			return {"theta": theta, "sample": 0, "median": 0.0, "p99": 0.0, "max": 0.0}
+		targets = rng.choice(n, size = min(sample, n), replace = False)
+		tree = BarnesHut(positions, masses).accelerations(targets, theta)
+		direct = BodySystem.pairwiseAccelerations(positions[targets], positions, masses, precision = "float64")
+		norm = np.sqrt((direct**2).sum(axis = 1))
+		err = np.sqrt(((tree - direct)**2).sum(axis = 1)) / np.where(norm > 0, norm, 1)
+		return {"theta": theta, "sample": len(targets), "median": float(np.median(err)), \
+			"p99": float(np.percentile(err, 99)), "max": float(err.max())}
+
+# Prints the force error for a range of opening angles on a random cloud, to help pick theta for a workload
+if __name__ == "__main__":
+	import argparse
+	import time
+	parser = argparse.ArgumentParser(description = "Barnes-Hut force error against direct summation")
+	parser.add_argument("--bodies", type = int, default = 10000)
+	parser.add_argument("--sample", type = int, default = 200)
+	parser.add_argument("--thetas", type = float, nargs = "+", default = [0.3, 0.5, 0.7, 1.0])
+	args = parser.parse_args()
+	rng = np.random.default_rng(0)
+	positions = rng.uniform(0, 800, (args.bodies, 2))
+	masses = rng.uniform(8*10**22, 4*10**23, args.bodies)
+	for theta in args.thetas:
+		startTime = time.perf_counter()
+		BarnesHut(positions, masses).accelerations(np.arange(args.bodies), theta)
+		elapsed = time.perf_counter() - startTime
+		err = BarnesHut.forceError(positions, masses, theta, args.sample, rng)
+		print("theta {:.2f}: {:.3f} s, median error {:.2e}, p99 {:.2e}, max {:.2e}".format(theta, elapsed, err["median"], err["p99"], err["max"]))
@@ -0,0 +1,289 @@
+# agent
+# 10/18/2026
+
+import gc
+import json
+import math
+import platform
+import time
+import tracemalloc
+import numpy as np
+from Body import Body
+from BodySystem import BodySystem
+from Kernels import Kernels
+from Profiler import Profiler
+from Simulation import Simulation
+
+# A fixed, seeded run that is timed by the benchmark
+class Workload:
+	# setup(sim) loads the bodies into a new Simulation, and frames is how many frames are timed
+	# fixedField sets Body.cacheFixedField while the workload runs (None leaves it as it is)
+	def __init__(self, name, frames, setup, seed = "bench0", fixedField = None):
+		self.name = name
+		self.frames = frames
+		self.setup = setup
+		self.seed = seed
+		self.fixedField = fixedField
+
+	def build(self):
+		sim = Simulation(self.seed)
+		self.setup(sim)
+		return sim
+
+	# Runs fn with the workload's settings in place
+	def using(self, fn):
+		previous = Body.cacheFixedField
+		if self.fixedField is not None:
+			Body.cacheFixedField = self.fixedField
+		try:
+			return fn()
+		finally:
+			Body.cacheFixedField = previous
+
+# Times a set of workloads (steps per second, time per phase and peak memory), finds how the time per step scales with
+# the number of bodies, and compares results with a saved baseline
+# Every workload starts from the same seed and presets, so two runs do exactly the same work
+class Benchmark:
+	cloudBodies = 2000
+	cloudSize = 120 # pixels across
+	cloudSeed = "cloud0"
+	memoryFrames = 3 # frames run again with tracemalloc on (it slows things down too much to leave on while timing)
+	attractors = 200
+	attractorBodies = 2000
+
+	# many heavy fixed bodies with lighter ones falling into them, so the fixed bodies keep gaining mass
+	@staticmethod
+	def attractorField(sim):
+		rng = sim.rng
+		for _ in range(Benchmark.attractors):
+			pos = (rng.uniform(0, Simulation.screenWidth), rng.uniform(0, Simulation.screenHeight))
+			sim.addBody(pos, [0, 0], rng.randint(*Simulation.randomMassRange)*50, released = True, fixed = True)
+		for _ in range(Benchmark.attractorBodies):
+			pos = (rng.uniform(0, Simulation.screenWidth), rng.uniform(0, Simulation.screenHeight))
+			sim.addBody(pos, [0, 0], rng.randint(*Simulation.randomMassRange)//100, released = True)
+		sim.markInitialState()
+
+	# a small clump of bodies that are nearly touching, so most of the work is collisions
+	@staticmethod
+	def denseCloud(sim):
+		rng = sim.rng
+		center = Simulation.screenWidth/2
+		for _ in range(Benchmark.cloudBodies):
+			pos = (center + rng.uniform(-1, 1)*Benchmark.cloudSize/2, center + rng.uniform(-1, 1)*Benchmark.cloudSize/2)
+			sim.addBody(pos, [0, 0], rng.randint(*Simulation.randomMassRange)//100, released = True)
+		sim.markInitialState()
+
+	workloads = [
+		Workload("earthMoon", 2000, lambda sim: sim.loadPreset(Simulation.CIRCULAR_ORBIT)),
+		Workload("oscillation", 2000, lambda sim: sim.loadPreset(Simulation.OSCILLATION)),
+		Workload("random100", 300, lambda sim: sim.loadPreset(Simulation.RANDOM, 100), "bench1"),
+		Workload("random1k", 60, lambda sim: sim.loadPreset(Simulation.RANDOM, 1000), "bench2"),
+		Workload("random10k", 6, lambda sim: sim.loadPreset(Simulation.RANDOM, 10000), "bench3"),
+		Workload("denseCloud", 60, lambda sim: Benchmark.denseCloud(sim), cloudSeed),
+		# the same attractors with their field summed every step and read from a FixedField
+		Workload("attractors", 150, lambda sim: Benchmark.attractorField(sim), "bench4", fixedField = False),
+		Workload("attractorsField", 150, lambda sim: Benchmark.attractorField(sim), "bench4", fixedField = True),
+	]
+
+	# names picks the workloads to run (all of them when None), and scale multiplies how many frames each one runs
+	# each workload is run 'repeat' times and the fastest run is kept
+	def __init__(self, names = None, repeat = 3, scale = 1.0):
+		self.workloads = [w for w in Benchmark.workloads if names is None or w.name in names]
+		self.repeat = repeat
+		self.scale = scale
+
+	# Runs every workload and returns {name: result}
+	def run(self):
+		return {w.name: Benchmark.measure(w, max(1, int(w.frames*self.scale)), self.repeat) for w in self.workloads}
+
+	# Times a workload, returning its steps/s, mean time per phase (ms per step), peak memory (MiB) and how many bodies it ended with
+	@staticmethod
+	def measure(workload, frames, repeat = 1):
+		return workload.using(lambda: Benchmark.measureRuns(workload, frames, repeat))
+
+	@staticmethod
+	def measureRuns(workload, frames, repeat):
+		best = None
+		for _ in range(max(1, repeat)):
+			sim = workload.build()
+			bodies = len(sim.system.liveRows())
+			gc.collect()
+			profiler = Profiler(window = frames, traceLength = 0).start()
+			try:
+				startTime = time.perf_counter()
+				for _ in range(frames):
+					sim.step()
+					profiler.endFrame(len(sim.system.liveRows()))
+				elapsed = time.perf_counter() - startTime
+			finally:
+				profiler.stop()
+			if best is None or elapsed < best[0]:
+				best = (elapsed, profiler.summary(), len(sim.system.liveRows()))
+		elapsed, stats, finalBodies = best
+		return {
+			"bodies": bodies,
+			"finalBodies": finalBodies,
+			"frames": frames,
+			"stepsPerSecond": frames/elapsed if elapsed > 0 else math.inf,
+			"phases": {name[:-3]: s["mean"] for name, s in stats.items() if name.endswith(" ms") and name != "frame ms"},
+			"peakMemory": Benchmark.peakMemory(workload, min(frames, Benchmark.memoryFrames)),
+		}
+
+	# The most memory (MiB) allocated at once while setting up and running a workload for a few frames
+	@staticmethod
+	def peakMemory(workload, frames):
+		gc.collect()
+		tracemalloc.start()
+		try:
+			workload.using(lambda: workload.build().step(frames))
+			return tracemalloc.get_traced_memory()[1]/2**20
+		finally:
+			tracemalloc.stop()
+
+	# Time per step (ms) of the random preset for each number of bodies, with the exponent of the best fitting power law
+	@staticmethod
+	def scaling(counts, frames = 5, seed = "scale0"):
+		times = []
+		for n in counts:
+			result = Benchmark.measure(Workload("random{}".format(n), frames, lambda sim: sim.loadPreset(Simulation.RANDOM, n), seed), frames)
+			times.append(1000/result["stepsPerSecond"])
+		exponent = float(np.polyfit(np.log(counts), np.log(times), 1)[0]) if len(counts) > 1 else math.nan
+		return {"bodies": list(counts), "msPerStep": times, "exponent": exponent}
+
+	# How far a workload run in float32 (see BodySystem.precision) ends up from the same run in float64
+	# Returns the relative error of the direct gravity sums on the starting bodies (median and largest), how far apart the bodies that are
+	# in both runs end up (root mean square and largest, in pixels), the relative difference in the final energy (both found in float64),
+	# the bodies left in each run, how many times faster float32 was and the peak memory (MiB) of each
+	@staticmethod
+	def precisionError(workload, frames):
+		runs = {}
+		previous = BodySystem.precision
+		try:
+			for precision in ("float64", "float32"):
+				BodySystem.precision = precision
+				sim = workload.build()
+				system = sim.system
+				rows = system.liveRows()
+				rows = rows[system.released[rows]]
+				sums = BodySystem.pairwiseAccelerations(system.pos[rows], system.pos[rows], system.mass[rows], precision = system.precision)
+				gc.collect()
+				startTime = time.perf_counter()
+				sim.step(frames)
+				elapsed = time.perf_counter() - startTime
+				runs[precision] = (sim, sums, elapsed, Benchmark.peakMemory(workload, min(frames, Benchmark.memoryFrames)))
+			BodySystem.precision = "float64"
+			energy = {precision: run[0].findEnergy() for precision, run in runs.items()}
+		finally:
+			BodySystem.precision = previous
+		(sim64, sums64, elapsed64, memory64), (sim32, sums32, elapsed32, memory32) = runs["float64"], runs["float32"]
+		scale = np.linalg.norm(sums64, axis = 1)
+		forceError = np.linalg.norm(sums32 - sums64, axis = 1)[scale > 0]/scale[scale > 0]
+		rows64, rows32 = sim64.system.liveRows(), sim32.system.liveRows()
+		_, at64, at32 = np.intersect1d(sim64.system.id[rows64], sim32.system.id[rows32], return_indices = True)
+		distance = np.linalg.norm(sim64.system.pos[rows64[at64]] - sim32.system.pos[rows32[at32]], axis = 1)
+		return {
+			"bodies": len(rows),
+			"frames": frames,
+			"forceError": (float(np.median(forceError)), float(forceError.max())) if len(forceError) > 0 else (0.0, 0.0),
+			"positionError": (float(np.sqrt((distance**2).mean())), float(distance.max())) if len(distance) > 0 else (0.0, 0.0),
+			"energyError": (energy["float32"] - energy["float64"])/abs(energy["float64"]) if energy["float64"] != 0 else 0.0,
+			"finalBodies": (len(rows64), len(rows32)),
+			"speedup": elapsed64/elapsed32 if elapsed32 > 0 else math.inf,
+			"peakMemory": (memory64, memory32),
+		}
+
+	# The workloads whose steps/s dropped by more than 'threshold' (a fraction) from the baseline
+	# Returns a list of (name, baseline steps/s, steps/s, change)
+	@staticmethod
+	def compare(results, baseline, threshold = 0.1):
+		regressions = []
+		for name, result in results.items():
+			if name not in baseline:
+				continue
+			old, new = baseline[name]["stepsPerSecond"], result["stepsPerSecond"]
+			change = new/old - 1
+			if change < -threshold:
+				regressions.append((name, old, new, change))
+		return regressions
+
+	# Where the results came from, saved with them so baselines from different machines are not mixed up by accident
+	@staticmethod
+	def environment():
+		return {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+			"processor": platform.processor(), "gravityMode": Body.gravityMode, "theta": Body.theta,
+			"kernels": Kernels.active(), "precision": BodySystem.precision}
+
+	@staticmethod
+	def save(path, results, scaling = None):
+		with open(path, "w") as f:
+			json.dump({"environment": Benchmark.environment(), "results": results, "scaling": scaling}, f, indent = 1)
+
+	@staticmethod
+	def load(path):
+		with open(path) as f:
+			return json.load(f)
+
+# Runs the benchmark
+if __name__ == "__main__":
+	import argparse
+	import sys
+	import warnings
+	parser = argparse.ArgumentParser(description = "Time the simulation on fixed workloads")
+	parser.add_argument("--workloads", nargs = "+", default = None, choices = [w.name for w in Benchmark.workloads])
+	parser.add_argument("--repeat", type = int, default = 3, help = "runs of each workload (the fastest is kept)")
+	parser.add_argument("--scale", type = float, default = 1.0, help = "multiplies the number of frames of every workload")
+	parser.add_argument("--gravity", choices = ["direct", "tree", "pm"], default = Body.gravityMode)
+	parser.add_argument("--theta", type = float, default = Body.theta)
+	parser.add_argument("--kernels", choices = ["auto", "numpy"], default = Kernels.backend, help = "\"auto\" uses the compiled kernels when numba is installed")
+	parser.add_argument("--precision", choices = ["float64", "float32"], default = BodySystem.precision, help = "precision of the timed runs")
+	parser.add_argument("--compare-precision", action = "store_true", help = "also report how far each workload run in float32 ends up from float64")
+	parser.add_argument("--scaling", type = int, nargs = "*", default = None, metavar = "N", \
+		help = "also time the random preset at these numbers of bodies")
+	parser.add_argument("--save", default = None, help = "write the results to this JSON file (to use as a baseline)")
+	parser.add_argument("--baseline", default = None, help = "compare against results saved with --save")
+	parser.add_argument("--threshold", type = float, default = 0.1, help = "slowdown (as a fraction) that counts as a regression")
+	args = parser.parse_args()
+	Body.gravityMode, Body.theta = args.gravity, args.theta
+	Kernels.backend = args.kernels
+	BodySystem.precision = args.precision
+	# the tree and particle mesh always work in float64
+	if BodySystem.precision == "float32" and Body.gravityMode != "direct":
+		warnings.warn("--precision float32 only changes how direct gravity is summed, so with --gravity {} it only halves the memory of the stored values".format(Body.gravityMode))
+	if args.compare_precision and Body.gravityMode != "direct":
+		parser.error("--compare-precision needs --gravity direct, since the tree and particle mesh always work in float64")
+	benchmark = Benchmark(args.workloads, args.repeat, args.scale)
+	results = {}
+	print("{:<12}{:>8}{:>8}{:>11}{:>10}  {}".format("workload", "bodies", "frames", "steps/s", "peak MiB", "ms per step by phase"))
+	for workload in benchmark.workloads:
+		result = Benchmark.measure(workload, max(1, int(workload.frames*benchmark.scale)), benchmark.repeat)
+		results[workload.name] = result
+		phases = ", ".join("{} {:.3f}".format(name, ms) for name, ms in sorted(result["phases"].items(), key = lambda p: -p[1]))
+		print("{:<12}{:>8}{:>8}{:>11.1f}{:>10.1f}  {}".format(workload.name, result["bodies"], result["frames"], \
+			result["stepsPerSecond"], result["peakMemory"], phases))
+	scaling = None
+	if args.scaling:
+		scaling = Benchmark.scaling(sorted(args.scaling))
+		print("\n{:>8}{:>14}".format("bodies", "ms per step"))
+		for n, ms in zip(scaling["bodies"], scaling["msPerStep"]):
+			print("{:>8}{:>14.3f}".format(n, ms))
+		print("Time per step grows as N^{:.2f}".format(scaling["exponent"]))
+	if args.compare_precision:
+		print("\n{:<12}{:>8}{:>8}{:>22}{:>22}{:>12}{:>12}{:>9}{:>14}".format("workload", "bodies", "frames", "force error (p50/max)", \
+			"drift px (rms/max)", "energy", "bodies left", "speedup", "peak MiB"))
+		for workload in benchmark.workloads:
+			error = Benchmark.precisionError(workload, max(1, int(workload.frames*benchmark.scale)))
+			print("{:<12}{:>8}{:>8}{:>22}{:>22}{:>12.2e}{:>12}{:>8.2f}x{:>14}".format(workload.name, error["bodies"], error["frames"], \
+				"{:.1e} / {:.1e}".format(*error["forceError"]), "{:.1e} / {:.1e}".format(*error["positionError"]), error["energyError"], \
+				"{} / {}".format(*error["finalBodies"]), error["speedup"], "{:.1f} / {:.1f}".format(*error["peakMemory"])))
+	if args.save:
+		Benchmark.save(args.save, results, scaling)
+	if args.baseline:
+		baseline = Benchmark.load(args.baseline)
+		if baseline["environment"] != Benchmark.environment():
+			print("\nThe baseline was saved in a different environment: {}".format(baseline["environment"]))
+		regressions = Benchmark.compare(results, baseline["results"], args.threshold)
+		for name, old, new, change in regressions:
+			print("REGRESSION {}: {:.1f} -> {:.1f} steps/s ({:+.1%})".format(name, old, new, change))
+		if not regressions:
+			print("\nNo regressions beyond {:.0%}".format(args.threshold))
+		sys.exit(1 if regressions else 0)
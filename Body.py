@@ -1,12 +1,16 @@
 # Nathaniel Morin
 # 8/22/2021
 
-import pygame
 import math
+import weakref
 import numpy as np
-import itertools
-
-pygame.init()
+from BodySystem import BodySystem
+from BarnesHut import BarnesHut
+from ParticleMesh import ParticleMesh
+from SpatialHash import SpatialHash
+from Profiler import Profiler
+from Kernels import Kernels
+from FixedField import FixedField
 
 # Body class
 class Body:
@@ -34,21 +38,135 @@ class Body:
 	mpp = 1_000_000 # meters per pixel (1000 km)
 	spf = 1200 # seconds per frame (20 min)
 
+	# How gravity is worked out: "direct" sums over every pair, "tree" uses a Barnes-Hut quadtree, and "pm" a particle mesh (see ParticleMesh)
+	gravityMode = "direct"
+	theta = 0.5 # Barnes-Hut opening angle (smaller is more accurate but slower)
+	# When above 0 and gravityMode is "tree" or "pm", each gravity pass also measures the force error against direct summation
+	# on this many bodies and stores it in the BodySystem's 'gravError'
+	gravityErrorSample = 0
+	# When true, the pull of the fixed bodies on the others is read from a FixedField that is only worked out again when they change,
+	# instead of being summed over every fixed body each frame (fixed bodies are not pulled at all, since they cannot move)
+	cacheFixedField = False
+
+	# the store that bodies are kept in unless another one is given
+	defaultSystem = BodySystem()
+
 	# self, position of the center (x, y), vector, mass, surface
 	# released stores whether the body has been launched
 	# fixed stores whether the body is fixed at a certain point (cannot move)
-	def __init__(self, pos, vec, mass, srf, released = False, fixed = False):
+	# the body's state lives in a row of 'system' (a BodySystem), this object is just a view onto it
+	def __init__(self, pos, vec, mass, srf, released = False, fixed = False, system = None):
+		self.homeSystem = Body.defaultSystem if system is None else system # the store the body goes back to when reset
+		self.system = self.homeSystem
+		self.index = self.system.add(pos, vec, 0, 0, released, fixed, view = self)
 		self.initPos = pos # initial position
 		self.initVec = vec # initial vector
 		self.initMass = mass # initial mass (kg)
-		self.pos = pos # position [x, y]
-		self.vec = vec # vector components [dx, dy]
 		self.setMass(mass) # radius and mass
-		self.trailList = [] # a list of points marking the trail of the body
-		self.gravVecList = [] # a list of gravity vectors acting on the ball
 		self.srf = srf # surface (the screen)
-		self.released = released # whether the body has been launched
-		self.fixed = fixed
+
+	# Returns the view of an existing row of a BodySystem, creating one if the row does not have one yet
+	@staticmethod
+	def viewOf(system, row, srf = None):
+		ref = system.views[row]
+		body = None if ref is None else ref()
+		if body is not None and body.system is system and body.index == row:
+			return body
+		body = Body.__new__(Body)
+		body.homeSystem = body.system = system
+		body.index = row
+		body.initPos = body.pos
+		body.initVec = body.vec
+		body.initMass = body.mass
+		body.srf = srf
+		system.views[row] = weakref.ref(body)
+		return body
+
+	# position [x, y]
+	@property
+	def pos(self):
+		p = self.system.pos[self.index]
+		return (float(p[0]), float(p[1]))
+
+	@pos.setter
+	def pos(self, value):
+		self.system.pos[self.index] = value
+		self.system.accValid = False
+
+	# vector components [dx, dy]
+	@property
+	def vec(self):
+		v = self.system.vec[self.index]
+		return [float(v[0]), float(v[1])]
+
+	@vec.setter
+	def vec(self, value):
+		self.system.vec[self.index] = value
+
+	@property
+	def mass(self):
+		return float(self.system.mass[self.index])
+
+	@mass.setter
+	def mass(self, value):
+		self.system.mass[self.index] = value
+		self.system.accValid = False
+
+	@property
+	def displayRad(self):
+		return float(self.system.displayRad[self.index])
+
+	@displayRad.setter
+	def displayRad(self, value):
+		self.system.displayRad[self.index] = value
+
+	# whether the body has been launched
+	@property
+	def released(self):
+		return bool(self.system.released[self.index])
+
+	@released.setter
+	def released(self, value):
+		self.system.released[self.index] = value
+		self.system.accValid = False
+
+	@property
+	def fixed(self):
+		return bool(self.system.fixed[self.index])
+
+	@fixed.setter
+	def fixed(self, value):
+		self.system.fixed[self.index] = value
+		self.system.accValid = False
+
+	# the points marking the trail of the body (oldest first, in world coordinates)
+	# they are kept in the BodySystem's trail ring buffer
+	@property
+	def trailList(self):
+		return self.system.trailPoints(self.index, Body.max_trail_length)
+
+	def clearTrail(self):
+		self.system.clearTrails(self.index)
+		return self
+
+	# the gravity vectors acting on the body during the last gravity pass (one per other body)
+	# worked out on demand, since they are only needed when they are drawn
+	@property
+	def gravVecList(self):
+		return Body.findGravVecs(self.system, self.index).tolist()
+
+	# The gravity vectors (changes in momentum over a frame) acting on a row of a BodySystem during its last gravity pass
+	@staticmethod
+	def findGravVecs(system, row):
+		sources = system.gravSources
+		if not np.any(sources == row):
+			return np.zeros((0, 2))
+		sources = sources[sources != row]
+		d = system.pos[sources] - system.pos[row]
+		r2 = (d**2).sum(axis = 1)
+		sources, d, r2 = sources[r2 > 0], d[r2 > 0], r2[r2 > 0]
+		attr = Body.G * system.mass[row] * system.mass[sources] / (r2 * Body.mpp**2) * Body.spf
+		return d * (attr / np.sqrt(r2))[:, None]
 
 	# Finds the volume of the body (sphere)
 	def findVolume(self):
@@ -80,9 +198,7 @@ class Body:
 
 	# Updates the position of the body, applying intertia
 	def update(self):
-		self.trailList.append(self.pos)
-		if not Body.max_trail_length == -1 and len(self.trailList) > Body.max_trail_length:
-			self.trailList = self.trailList[1:]
+		self.system.appendTrails(self.index, Body.max_trail_length)
 		# adjusting the position
 		if not self.fixed:
 			self.pos = [self.pos[0] + self.vec[0]/Body.mpp/self.mass*Body.spf, self.pos[1] + \
@@ -91,12 +207,38 @@ class Body:
 			self.vec = [0, 0]	
 		return self
 
+	# Removes the body from its store (it can still be read, and reset puts it back)
+	def remove(self):
+		self.system.remove(self.index)
+		return self
+
+	# Moves the body's row into a store of its own (used when its row is dropped from a compacted store)
+	def detach(self):
+		system = BodySystem(1)
+		self.index = system.add(self.system.pos[self.index], self.system.vec[self.index], self.system.mass[self.index], \
+			self.system.displayRad[self.index], self.system.released[self.index], self.system.fixed[self.index], view = self)
+		self.system = system
+		return self
+
+	# Moves the given rows of a BodySystem one frame forward, applying inertia (like update, but for many bodies at once)
+	@staticmethod
+	def updateSystem(system, rows):
+		fixed = system.fixed[rows]
+		moving = rows[~fixed]
+		system.pos[moving] += system.vec[moving]/Body.mpp/system.mass[moving, None]*Body.spf
+		system.vec[rows[fixed]] = 0
+
 	# Resets a body
 	def reset(self):
+		# putting it back into its original store if it was removed (e.g. absorbed by another body)
+		if self.system is not self.homeSystem or not self.system.alive[self.index]:
+			released, fixed = self.released, self.fixed
+			self.system = self.homeSystem
+			self.index = self.system.add(self.initPos, self.initVec, 0, 0, released, fixed, view = self)
 		self.vec = self.initVec
 		self.pos = self.initPos
 		self.setMass(self.initMass)
-		self.trailList.clear()
+		self.clearTrail()
 		return self
 
 	# Distance formula
@@ -137,91 +279,256 @@ class Body:
 	def addVectors(vec1, vec2):
 		return [vec1[0]+vec2[0], vec1[1]+vec2[1]]
 
+	# Finds the display radius of bodies with the given mass(es)
+	@staticmethod
+	def findDisplayRadius(mass):
+		return ((3*(mass/Body.density)/(4*math.pi))**(1/3))/Body.mpp
+
 	# A function that iterates over a list of bodies and handles collisions between them
-	# returns the new list of bodies (post-collisions)
+	# absorbed bodies are removed from the list (and from their BodySystem)
+	# all of the bodies need to share the same BodySystem
 	@staticmethod
 	def checkForBodyCollision(lst):
-		# Iterates over all possible body combinations
-		pairs = list(itertools.combinations(lst, 2))
-		for pair in pairs:
-			body1, body2 = pair[0], pair[1]
-			if body1.released and body2.released:
-				dist = Body.findDisplayDistance(body1.pos, body2.pos)
-				# true if body1 is bigger and they are colliding
-				absorb = dist <= body1.displayRad + body2.displayRad*Body.collisionDistanceFactor and body1.mass >= body2.mass
-				# if body2 is bigger and they are colliding
-				if dist <= body2.displayRad + body1.displayRad*Body.collisionDistanceFactor and body2.mass >= body1.mass:
-					absorb = True
-					# swapping them so that body1 refers to the larger
-					temp = body2
-					body2 = body1
-					body1 = temp
-				# absorb = Body.collisionApproximationLinesAreIntersecting(body1, body2, body1.srf)
-				if absorb:
-					body1.vec = Body.addVectors(body1.vec, body2.vec)
-					body1.setMass(body1.mass + body2.mass)
-					if body2 in lst:
-						lst.remove(body2)				
+		system, idx = BodySystem.gather(lst)
+		if system is None:
+			return
+		survivors, absorbed = Body.collideSystem(system, idx)
+		if len(absorbed) > 0:
+			dead = np.zeros(system.count, dtype = bool)
+			dead[absorbed] = True
+			lst[:] = [b for b, d in zip(lst, dead[idx]) if not d]
+
+	# Finds and resolves every collision between the given rows of a BodySystem (given in list order)
+	# Every group of bodies that touch (including chains, where A touches B and B touches C) merges into its most massive member
+	# Returns the rows of the surviving and absorbed body of each merge, as two arrays
+	@staticmethod
+	def collideSystem(system, rows):
+		with Profiler.phase("collisions"):
+			return Body.mergeCollisions(system, rows)
+
+	@staticmethod
+	def mergeCollisions(system, rows):
+		rel = rows[system.released[rows]]
+		first, second = Body.findCollidingPairs(system, rel)
+		if len(first) == 0:
+			return np.zeros(0, dtype = np.intp), np.zeros(0, dtype = np.intp)
+		survivors, absorbed, keep = Body.mergeGroups(system.mass, system.vec, rel[first], rel[second])
+		system.displayRad[keep] = Body.findDisplayRadius(system.mass[keep])
+		system.remove(absorbed)
+		return survivors, absorbed
+
+	# Merges each group of bodies joined by colliding pairs (first absorbs second) into one body, adding up their masses and momenta
+	# mass and vec are changed in place, and the indices of (the survivor of each absorbed body, the absorbed bodies, every survivor) are returned
+	@staticmethod
+	def mergeGroups(mass, vec, first, second):
+		# working with the bodies that collide (in list order), so that ties go to the body that comes first like before
+		involved, local = np.unique(np.concatenate((first, second)), return_inverse = True)
+		labels = SpatialHash.connectedLabels(len(involved), local[:len(first)], local[len(first):])
+		groupMass = mass[involved]
+		# the survivor of each group is its most massive body
+		order = np.lexsort((np.arange(len(involved)), -groupMass, labels))
+		isSurvivor = np.zeros(len(involved), dtype = bool)
+		isSurvivor[order[np.concatenate(([True], labels[order][1:] != labels[order][:-1]))]] = True
+		survivorOf = np.zeros(len(involved), dtype = np.intp)
+		survivorOf[labels[isSurvivor]] = np.flatnonzero(isSurvivor)
+		survivorOf = survivorOf[labels]
+		totalMass = np.bincount(labels, weights = groupMass, minlength = len(involved))
+		totalVec = np.stack([np.bincount(labels, weights = vec[involved, k], minlength = len(involved)) for k in range(2)], axis = 1)
+		keep = involved[isSurvivor]
+		mass[keep] = totalMass[labels[isSurvivor]]
+		vec[keep] = totalVec[labels[isSurvivor]]
+		absorbed = ~isSurvivor
+		return involved[survivorOf[absorbed]], involved[absorbed], keep
+
+	# Finds every pair of the given rows that is colliding, returned as positions in 'rows' (i, j) where the first
+	# absorbs the second (so the first is the larger one)
+	# Candidates come from a uniform grid sized for the typical body, and the few bodies too big for it only look through coarser grids near them
+	@staticmethod
+	def findCollidingPairs(system, rows):
+		none = np.zeros(0, dtype = np.intp)
+		if len(rows) < 2:
+			return none, none
+		pos, rad, mass = system.pos[rows], system.displayRad[rows], system.mass[rows]
+		# two bodies can only collide if their centers are closer than the sum of their radii
+		typical = np.percentile(rad, 99) if len(rows) >= 100 else rad.max()
+		cellSize = max(2*typical, 1e-9)
+		small = np.flatnonzero(rad <= typical)
+		i, j = SpatialHash.candidatePairs(pos[small], cellSize)
+		i, j = [small[i]], [small[j]]
+		# the few bodies too big for that grid are grouped by size, each doubling of the radius getting a coarser grid of its own,
+		# and each is only tested against the bodies near it that are no bigger than the biggest of its group
+		big = np.flatnonzero(rad > typical)
+		if len(big) > 0:
+			levels = np.zeros(len(rows), dtype = np.int64)
+			levels[big] = np.ceil(np.log2(rad[big] / max(typical, 1e-9)))
+			for level in np.unique(levels[big]):
+				members = big[levels[big] == level]
+				levelMax = rad[members].max()
+				others = np.flatnonzero(rad <= levelMax)
+				q, k = SpatialHash.queryPairs(pos[members], pos[others], 2*levelMax)
+				a, b = members[q], others[k]
+				# pairs between two bodies of the group appear twice, so only one ordering of those is kept
+				keep = (a != b) & ~((levels[b] == level) & (b < a))
+				i.append(np.minimum(a[keep], b[keep]))
+				j.append(np.maximum(a[keep], b[keep]))
+		i, j = np.concatenate(i), np.concatenate(j)
+		Profiler.count("collision pairs", len(i))
+		return Body.absorbingPairs(pos, rad, mass, i, j)
+
+	# Of the candidate pairs (i, j) of bodies, returns the ones that are colliding as (larger, smaller)
+	# Uses the compiled kernel when there is one (see Kernels)
+	@staticmethod
+	def absorbingPairs(pos, rad, mass, i, j):
+		if len(i) > 0 and Kernels.ready():
+			return Kernels.absorbingPairs(pos, rad, mass, i, j, Body.collisionDistanceFactor)
+		return Body.numpyAbsorbingPairs(pos, rad, mass, i, j)
+
+	# The NumPy version of absorbingPairs
+	@staticmethod
+	def numpyAbsorbingPairs(pos, rad, mass, i, j):
+		dist = np.sqrt(((pos[j] - pos[i])**2).sum(axis = 1))
+		# true if the first body is bigger and they are colliding
+		firstAbsorbs = (dist <= rad[i] + rad[j]*Body.collisionDistanceFactor) & (mass[i] >= mass[j])
+		# if the second body is bigger and they are colliding (this takes precedence, like before)
+		secondAbsorbs = (dist <= rad[j] + rad[i]*Body.collisionDistanceFactor) & (mass[j] >= mass[i])
+		hit = firstAbsorbs | secondAbsorbs
+		larger = np.where(secondAbsorbs, j, i)[hit]
+		smaller = np.where(secondAbsorbs, i, j)[hit]
+		return larger, smaller
 
 	# function that iterates over a list of bodies and handles shifts to their vectors due to gravitational interactions
+	# all of the bodies need to share the same BodySystem
 	@staticmethod
 	def applyGravity(lst):
-		for body in lst:
-			body.gravVecList.clear()
-		pairs = list(itertools.combinations(lst, 2))
-		for pair in pairs:
-			body1, body2 = pair[0], pair[1]
-			if body1.released and body2.released:
-				attr = Body.findGravitationalAttraction(body1, body2)
-				b1ToB2Angle = Body.findRadianAngleFromCoords(body1.pos, body2.pos)
-				dx_grav, dy_grav = attr*np.cos(b1ToB2Angle), attr*np.sin(b1ToB2Angle)
-				body1.vec = Body.addVectors(body1.vec, [dx_grav, dy_grav])
-				body2.vec = Body.addVectors(body2.vec, [-dx_grav, -dy_grav])
-				body1.gravVecList.append([dx_grav, dy_grav])
-				body2.gravVecList.append([-dx_grav, -dy_grav])
+		system, idx = BodySystem.gather(lst)
+		if system is None:
+			return
+		system.grav[idx] = 0
+		rel = idx[system.released[idx]]
+		Body.applySystemGravity(system, rel)
+
+	# Applies one frame of gravity between the given rows of a BodySystem
+	@staticmethod
+	def applySystemGravity(system, rows):
+		mass = system.mass[rows]
+		acc = Body.findSystemSums(system, rows) # (kg/pixel^2)
+		if Body.gravityMode == "tree" and Body.gravityErrorSample > 0:
+			system.gravError = BarnesHut.forceError(system.pos[rows], mass, Body.theta, Body.gravityErrorSample)
+		elif Body.gravityMode == "pm" and Body.gravityErrorSample > 0:
+			system.gravError = ParticleMesh.forceError(system.pos[rows], mass, Body.gravityErrorSample)
+		# converting to a change in momentum over one frame (kg*m/s)
+		dv = acc * (Body.G / Body.mpp**2 * Body.spf * mass)[:, None]
+		system.vec[rows] += dv
+		system.grav[rows] = dv
+		system.gravSources = rows
+
+	# Finds the gravitational acceleration (pixels/s^2) of the given rows of a BodySystem
+	# Only released bodies pull or get pulled, and fixed bodies are given no acceleration since they cannot move
+	# The result is also stored in the system's 'acc' (and the matching change in momentum over a frame in 'grav', for drawing)
+	@staticmethod
+	def findSystemAccelerations(system, rows):
+		acc = np.zeros((len(rows), 2))
+		released = system.released[rows]
+		rel = rows[released]
+		acc[released] = Body.findSystemSums(system, rel) * (Body.G / Body.mpp**3)
+		acc[system.fixed[rows]] = 0
+		system.acc[rows] = acc
+		system.grav[rows] = acc * (system.mass[rows] * Body.mpp * Body.spf)[:, None]
+		system.gravSources = rel
+		system.accValid = True
+		return acc
+
+	# Sums (mass * displacement / distance^3) acting on every body from every other body, using the selected gravityMode
+	# When targets (indices into pos) is given, only the sums for those bodies are found (in that order)
+	# When potential is true, the sums of (mass / distance) are returned as well, found by the same gravityMode (so they are as
+	# approximate as the accelerations in the tree and particle mesh modes)
+	# precision is the precision of the store the bodies are from (see BodySystem.pairwiseAccelerations), which only direct gravity uses
+	@staticmethod
+	def findAccelerations(pos, mass, targets = None, potential = False, precision = None):
+		with Profiler.phase("gravity"):
+			if Body.gravityMode == "tree":
+				tree = BarnesHut(pos, mass)
+				result = tree.accelerations(np.arange(len(mass)) if targets is None else targets, Body.theta, potential)
+				Profiler.count("interactions", tree.interactions)
+				return result
+			if Body.gravityMode == "pm":
+				return ParticleMesh(pos, mass).accelerations(np.arange(len(mass)) if targets is None else targets, potential)
+			if Body.gravityMode != "direct":
+				raise ValueError("Unknown gravity mode: {}".format(Body.gravityMode))
+			Profiler.count("interactions", (len(mass) if targets is None else len(targets))*len(mass))
+			return BodySystem.pairwiseAccelerations(pos if targets is None else pos[targets], pos, mass, potential, precision)
+
+	# The sums of findAccelerations for (the targets among) the given rows of a BodySystem, with the rows at positions pos if it is given
+	# With cacheFixedField, only the bodies that are not fixed are summed over, and the pull of the fixed ones comes from the system's FixedField
+	# When the system wants the potential (see BodySystem.wantPotential) and every row is summed where it is, the potential is kept too
+	@staticmethod
+	def findSystemSums(system, rows, pos = None, targets = None):
+		whole = pos is None and targets is None
+		pos = system.pos[rows] if pos is None else pos
+		mass = system.mass[rows]
+		fixed = system.fixed[rows]
+		if not Body.cacheFixedField or not fixed.any():
+			if whole and system.wantPotential:
+				acc, pot = Body.findAccelerations(pos, mass, potential = True, precision = system.precision)
+				system.lastPotential = None if pot is None else (rows.copy(), pos, mass, pot)
+				return acc
+			return Body.findAccelerations(pos, mass, targets, precision = system.precision)
+		targets = np.arange(len(rows)) if targets is None else targets
+		free = np.flatnonzero(~fixed)
+		freeIndex = np.full(len(rows), -1, dtype = np.intp)
+		freeIndex[free] = np.arange(len(free))
+		moving = ~fixed[targets]
+		acc = np.zeros((len(targets), 2))
+		if moving.any():
+			acc[moving] = Body.findAccelerations(pos[free], mass[free], freeIndex[targets[moving]], precision = system.precision)
+			with Profiler.phase("gravity"):
+				acc[moving] += FixedField.of(system, rows[fixed], pos[free]).accelerations(pos[targets[moving]])
+		return acc
 
+	# all of the bodies need to share the same BodySystem (see Diagnostics for the center of mass of rows of a system)
 	@staticmethod
 	def findCenterOfMass(lst):
-		totalMass = 0
-		averagePos = [0, 0]
-		for b in lst:
-			totalMass += b.mass
-			averagePos[0] += b.pos[0]*b.mass
-			averagePos[1] += b.pos[1]*b.mass
-		return (averagePos[0]/totalMass, averagePos[1]/totalMass), totalMass
+		system, idx = BodySystem.gather(lst)
+		mass = system.mass[idx]
+		totalMass = float(mass.sum())
+		averagePos = (system.pos[idx]*mass[:, None]).sum(axis = 0)
+		return (float(averagePos[0])/totalMass, float(averagePos[1])/totalMass), totalMass
 
+	# pygame is only imported when something is drawn, so the physics can run without it
+	# offset is the position of the camera (the world position that is drawn at the top left of the screen)
 	@staticmethod
-	def drawCenterOfMass(lst, screen):
+	def drawCenterOfMass(lst, screen, offset = (0, 0)):
+		import pygame
 		centerOfMassPos, totalMass = Body.findCenterOfMass(lst)
 		centerOfMassRad = (3*(totalMass/Body.density)/(4*math.pi))**(1/3)/Body.mpp
-		pygame.draw.circle(screen, Body.centerOfMassColor, centerOfMassPos, centerOfMassRad)
+		pygame.draw.circle(screen, Body.centerOfMassColor, (centerOfMassPos[0]-offset[0], centerOfMassPos[1]-offset[1]), centerOfMassRad)
 
 	# Draws the body	
-	def draw(self, drawVec = False, drawGrav = False, drawAgg = False, drawTrail = False):
+	# offset is the position of the camera (the world position that is drawn at the top left of the screen)
+	def draw(self, drawVec = False, drawGrav = False, drawAgg = False, drawTrail = False, offset = (0, 0)):
+		import pygame
+		pos = (self.pos[0]-offset[0], self.pos[1]-offset[1])
 		# drawing the body
 		clr = Body.color if not self.fixed else Body.fixedColor
-		pygame.draw.circle(self.srf, clr, self.pos, self.displayRad)
+		pygame.draw.circle(self.srf, clr, pos, self.displayRad)
 		# drawing the vector of the ball
 		if drawVec:
-			pygame.draw.line(self.srf, Body.vecColor, self.pos, \
-				[self.pos[0] + self.vec[0]/Body.mpp/self.mass*self.vectorDisplayFactor, \
-				self.pos[1] + self.vec[1]/Body.mpp/self.mass*self.vectorDisplayFactor])
+			pygame.draw.line(self.srf, Body.vecColor, pos, \
+				[pos[0] + self.vec[0]/Body.mpp/self.mass*self.vectorDisplayFactor, \
+				pos[1] + self.vec[1]/Body.mpp/self.mass*self.vectorDisplayFactor])
 		# drawing the vectors displaying all gravity effects
 		if drawGrav:
 			for gVec in self.gravVecList:
-				pygame.draw.line(self.srf, Body.gravColor, self.pos, \
-					(self.pos[0]+(gVec[0]/Body.spf/Body.mpp)*Body.gravDisplayFactor, self.pos[1]+(gVec[1]/Body.spf/Body.mpp)*Body.gravDisplayFactor))
+				pygame.draw.line(self.srf, Body.gravColor, pos, \
+					(pos[0]+(gVec[0]/Body.spf/Body.mpp)*Body.gravDisplayFactor, pos[1]+(gVec[1]/Body.spf/Body.mpp)*Body.gravDisplayFactor))
 		# drawing aggregate gravitational effect vector
-		if drawAgg and len(self.gravVecList) > 0:
-			gVecs = [[gV[0]/Body.spf/Body.mpp, gV[1]/Body.spf/Body.mpp] for gV in self.gravVecList]
-			sumVec = gVecs[0]
-			if len(gVecs) > 1:
-				for gVec in gVecs[1:]:
-					sumVec = Body.addVectors(sumVec, gVec)
-			pygame.draw.line(self.srf, Body.aggGravColor, self.pos, (self.pos[0]+sumVec[0]*Body.gravDisplayFactor, self.pos[1]+sumVec[1]*Body.gravDisplayFactor))
+		if drawAgg and np.any(self.system.gravSources == self.index):
+			sumVec = self.system.grav[self.index]/Body.spf/Body.mpp
+			pygame.draw.line(self.srf, Body.aggGravColor, pos, (pos[0]+sumVec[0]*Body.gravDisplayFactor, pos[1]+sumVec[1]*Body.gravDisplayFactor))
 		# drawing the trail
 		if drawTrail:
-			if len(self.trailList) > 0:
-				pygame.draw.lines(self.srf, Body.trailColor, False, self.trailList+[self.pos])
+			trail = self.trailList
+			if len(trail) > 0:
+				pygame.draw.lines(self.srf, Body.trailColor, False, np.vstack((trail, [self.pos])) - offset)
 		else:
-			self.trailList.clear() # saving spaces
+			self.clearTrail() # saving spaces
@@ -0,0 +1,377 @@
+# agent
+# 10/18/2026
+
+import weakref
+import numpy as np
+from Kernels import Kernels
+
+# Structure-of-arrays store for bodies
+# Every Body is a lightweight view (a row index) into one of these, so that physics can be done on whole arrays at once
+class BodySystem:
+	initialCapacity = 64
+	# upper bound on the number of elements in a single (targets x sources) temporary when computing pairwise interactions
+	# keeps memory bounded no matter how many bodies there are
+	tileElements = 1 << 20
+	# "float64" or "float32"
+	# In float32, new stores keep the columns in 'reduced' in float32 (halving the trails, which are most of a store's memory), and direct
+	# gravity (pairwiseAccelerations) works out each pair in float32, in the natural units (see Units), and adds them up in float64
+	# Positions, momenta and masses are always float64, since they are what gets integrated and small changes to them would be lost
+	precision = "float64"
+	reduced = ("displayRad", "grav", "acc", "trail")
+
+	def __init__(self, capacity = None, precision = None):
+		capacity = BodySystem.initialCapacity if capacity is None else max(1, capacity)
+		self.precision = BodySystem.precision if precision is None else precision
+		dtype = np.dtype(self.precision)
+		self.count = 0 # number of rows in use
+		self.pos = np.zeros((capacity, 2)) # display position [x, y] (pixels)
+		self.vec = np.zeros((capacity, 2)) # momentum [dx, dy] (kg*m/s)
+		self.mass = np.zeros(capacity) # kg
+		self.displayRad = np.zeros(capacity, dtype = dtype) # pixels
+		self.released = np.zeros(capacity, dtype = bool)
+		self.fixed = np.zeros(capacity, dtype = bool)
+		self.alive = np.zeros(capacity, dtype = bool) # false once a body has been removed (e.g. absorbed in a collision)
+		self.views = [] # weak references to the Body views of each row (None for rows without one)
+		self.grav = np.zeros((capacity, 2), dtype = dtype) # net change in momentum due to gravity during the last gravity pass
+		self.acc = np.zeros((capacity, 2), dtype = dtype) # gravitational acceleration (pixels/s^2) from the last time it was found
+		self.accValid = False # whether 'acc' still matches the bodies (cleared whenever bodies are added, removed or changed)
+		# trails are a ring buffer of past positions per row (world coordinates)
+		# it is only allocated once a trail is recorded, and 'trailCount' is how many points each row has had added since it was cleared
+		self.trail = np.zeros((capacity, 0, 2), dtype = dtype)
+		self.trailCount = np.zeros(capacity, dtype = np.int64)
+		# snapshots share the trail buffer instead of copying it (see snapshot), so while it is shared, it is only ever written to by
+		# adding points, and anything that would move or clear points (compacting, resizing, clearing) gives the store new arrays first
+		self.trailShared = False
+		self.trailRows = None # in a snapshot, the row of the shared buffer each row's trail is in
+		self.sharedTrailCount = None # and the trailCount of the store it was taken from, which keeps going up as points are added
+		self.gravSources = np.zeros(0, dtype = np.intp) # the rows that took part in the last gravity pass
+		self.gravError = None # force error of the last gravity pass when it is being measured (see Body.gravityErrorSample)
+		self.fixedField = None # the cached pull of the fixed bodies (see FixedField), made again when they change
+		# when wantPotential is true, gravity passes over the whole system also find the sum of (mass / distance) onto each body, and keep it
+		# as (rows, positions, masses, potential) in lastPotential, so that it can be used for the energy while the bodies have not changed
+		self.wantPotential = False
+		self.lastPotential = None
+		# every body added gets the next id, which stays with it when rows move (so it can be followed across frames and merges)
+		self.id = np.zeros(capacity, dtype = np.int64)
+		self.nextId = 0
+
+	# the per-row arrays
+	columns = ("pos", "vec", "mass", "displayRad", "released", "fixed", "alive", "grav", "acc", "trail", "trailCount", "id")
+
+	def capacity(self):
+		return len(self.mass)
+
+	# Grows every array so that at least 'needed' rows fit
+	def reserve(self, needed):
+		capacity = self.capacity()
+		if needed <= capacity:
+			return self
+		if self.trailRows is not None:
+			self.unshareTrails()
+		while capacity < needed:
+			capacity *= 2
+		for name in BodySystem.columns:
+			old = getattr(self, name)
+			new = np.zeros((capacity,)+old.shape[1:], dtype = old.dtype)
+			new[:self.count] = old[:self.count]
+			setattr(self, name, new)
+		return self
+
+	# Adds a row and returns its index
+	# 'view' is the Body that refers to the row (if there is one), so that its index can be updated when rows move
+	def add(self, pos, vec, mass, displayRad, released = False, fixed = False, view = None):
+		if self.count == self.capacity() and not self.alive[:self.count].all():
+			self.compact()
+		self.reserve(self.count+1)
+		i = self.count
+		self.pos[i] = pos
+		self.vec[i] = vec
+		self.mass[i] = mass
+		self.displayRad[i] = displayRad
+		self.released[i] = released
+		self.fixed[i] = fixed
+		self.alive[i] = True
+		self.grav[i] = 0
+		self.acc[i] = 0
+		self.trailCount[i] = 0
+		self.id[i] = self.nextId
+		self.nextId += 1
+		self.accValid = False
+		self.views.append(None if view is None else weakref.ref(view))
+		self.count += 1
+		return i
+
+	# Adds many rows at once from arrays (one value or row per body, or a single value for all of them), returning their indices
+	# The rows have no views until Body.viewOf makes them
+	def addMany(self, pos, vec, mass, displayRad, released = False, fixed = False):
+		mass = np.asarray(mass, dtype = float)
+		n = len(mass)
+		if self.count + n > self.capacity() and not self.alive[:self.count].all():
+			self.compact()
+		self.reserve(self.count + n)
+		rows = np.arange(self.count, self.count + n)
+		self.pos[rows] = pos
+		self.vec[rows] = vec
+		self.mass[rows] = mass
+		self.displayRad[rows] = displayRad
+		self.released[rows] = released
+		self.fixed[rows] = fixed
+		self.alive[rows] = True
+		self.grav[rows] = 0
+		self.acc[rows] = 0
+		self.trailCount[rows] = 0
+		self.id[rows] = np.arange(self.nextId, self.nextId + n)
+		self.nextId += n
+		self.accValid = False
+		self.views.extend([None]*n)
+		self.count += n
+		return rows
+
+	# Marks rows as removed (they are only dropped for good by compact)
+	def remove(self, rows):
+		self.alive[rows] = False
+		self.accValid = False
+
+	# Indices of every row that has not been removed
+	def liveRows(self):
+		return np.flatnonzero(self.alive[:self.count])
+
+	# Drops removed rows, moving the rest to the front
+	# Views of removed rows that are still referenced are moved into their own store, so they can still be read
+	# Returns an array mapping each old row to its new index (-1 for removed rows)
+	def compact(self):
+		keep = self.liveRows()
+		newIndex = np.full(self.count, -1, dtype = np.intp)
+		newIndex[keep] = np.arange(len(keep))
+		views = [None]*len(keep)
+		for old, ref in enumerate(self.views):
+			body = None if ref is None else ref()
+			# skipping views that have since been moved to another row or store
+			if body is None or body.system is not self or body.index != old:
+				continue
+			if newIndex[old] >= 0:
+				views[newIndex[old]] = ref
+			else:
+				body.detach()
+		self.unshareTrails()
+		for name in BodySystem.columns:
+			column = getattr(self, name)
+			column[:len(keep)] = column[keep]
+			column[len(keep):self.count] = 0
+		for new, ref in enumerate(views):
+			if ref is not None:
+				ref().index = new
+		self.views = views
+		self.count = len(keep)
+		self.gravSources = newIndex[self.gravSources]
+		self.gravSources = self.gravSources[self.gravSources >= 0]
+		return newIndex
+
+	# Adds the current position of each of the given rows to its trail
+	# maxLength is the number of points kept (-1 keeps every point, growing the buffer as needed)
+	# The buffer has a spare slot, so that the point being written is never one a snapshot shows
+	def appendTrails(self, rows, maxLength):
+		if self.trailRows is not None:
+			self.unshareTrails()
+		length = self.trail.shape[1]
+		needed = int(self.trailCount[rows].max(initial = 0)) + 2 if maxLength == -1 else maxLength + 1
+		if needed > length:
+			self.resizeTrails(max(needed, 2*length) if maxLength == -1 else needed)
+			length = self.trail.shape[1]
+		if length == 0:
+			return
+		self.trail[rows, self.trailCount[rows] % length] = self.pos[rows]
+		self.trailCount[rows] += 1
+
+	# Changes how many points each trail buffer holds, keeping the most recent points
+	def resizeTrails(self, length):
+		self.unshareTrails()
+		old = self.trail
+		oldLength = old.shape[1]
+		self.trail = np.zeros((old.shape[0], length, 2), dtype = old.dtype)
+		if oldLength == 0 or self.count == 0:
+			self.trailCount[:] = 0
+			return
+		# laying the points that fit out from the start of the new buffers
+		count = self.trailCount[:self.count]
+		kept = np.minimum(count, min(oldLength, length))
+		j = np.arange(min(oldLength, length))[None, :]
+		valid = j < kept[:, None]
+		rowIdx = np.broadcast_to(np.arange(self.count)[:, None], valid.shape)
+		self.trail[rowIdx[valid], j.repeat(self.count, axis = 0)[valid]] = \
+			old[rowIdx[valid], ((count - kept)[:, None] + j)[valid] % oldLength]
+		self.trailCount[:self.count] = kept
+
+	# The points of a row's trail, oldest first (at most maxLength of them unless it is -1)
+	def trailPoints(self, row, maxLength = -1):
+		length = self.trail.shape[1]
+		count = int(self.trailCount[row])
+		n = min(count, length) if maxLength == -1 else min(count, length, maxLength)
+		if self.trailRows is not None:
+			# leaving out the oldest points, which the store the snapshot was taken from has written over since
+			# (and the one it may be writing now)
+			row = self.trailRows[row]
+			ahead = int(self.sharedTrailCount[row]) - count
+			n = 0 if ahead < 0 else min(n, length - ahead - 1)
+		if n <= 0:
+			return np.zeros((0, 2))
+		return self.trail[row, np.arange(count - n, count) % length]
+
+	def clearTrails(self, rows):
+		self.unshareTrails()
+		self.trailCount[rows] = 0
+
+	# Gives the store its own trail arrays when snapshots are sharing them, so that they can be changed in place
+	# A snapshot gets its own copy of just the points it can see
+	def unshareTrails(self):
+		if self.trailRows is not None:
+			length = self.trail.shape[1]
+			count = self.trailCount[:self.count]
+			ahead = self.sharedTrailCount[self.trailRows] - count
+			kept = np.where(ahead < 0, 0, np.clip(np.minimum(count, length - ahead - 1), 0, length))
+			trail = np.zeros((self.capacity(), length, 2), dtype = self.trail.dtype)
+			if length > 0:
+				slots = ((count - kept)[:, None] + np.arange(length)[None, :]) % length
+				trail[:self.count] = self.trail[self.trailRows[:, None], slots]
+			self.trail = trail
+			self.trailCount = self.trailCount.copy()
+			self.trailCount[:self.count] = kept
+			self.trailRows = None
+			self.sharedTrailCount = None
+			self.trailShared = False
+		elif self.trailShared:
+			self.trail = self.trail.copy()
+			self.trailCount = self.trailCount.copy()
+			self.trailShared = False
+
+	# A new store holding copies of the given rows (in order, with no views), which does not change as this one does
+	# The trails are the exception: they are most of the memory, so instead of being copied, the buffer is shared (only to be read with
+	# trailPoints), and this store gets new arrays before it changes any point a snapshot can see
+	def snapshot(self, rows):
+		copy = BodySystem(len(rows), self.precision)
+		for name in BodySystem.columns:
+			if name == "trail":
+				continue
+			column = getattr(self, name)
+			if len(rows) > 0:
+				setattr(copy, name, column[rows])
+			else:
+				setattr(copy, name, np.zeros((1,)+column.shape[1:], dtype = column.dtype))
+		copy.count = len(rows)
+		copy.views = [None]*len(rows)
+		copy.trail = self.trail
+		copy.trailRows = np.asarray(rows, dtype = np.intp).copy() if self.trailRows is None else self.trailRows[rows]
+		copy.sharedTrailCount = self.trailCount if self.sharedTrailCount is None else self.sharedTrailCount
+		copy.trailShared = True
+		self.trailShared = True
+		# keeping the gravity sources that were copied, as indices into the copy
+		newIndex = np.full(self.count, -1, dtype = np.intp)
+		newIndex[rows] = np.arange(len(rows))
+		copy.gravSources = newIndex[self.gravSources]
+		copy.gravSources = copy.gravSources[copy.gravSources >= 0]
+		copy.gravError = self.gravError
+		# the cached field's grid is shared, since it never changes once it is made, but the copy keeps the version it was taken with
+		copy.fixedField = None if self.fixedField is None else self.fixedField.copy()
+		copy.nextId = self.nextId
+		return copy
+
+	# Copies of everything in the store (every row in use, including removed ones that have not been compacted yet), to restore it from
+	def getState(self):
+		if self.trailRows is not None:
+			self.unshareTrails()
+		state = {name: getattr(self, name)[:self.count].copy() for name in BodySystem.columns}
+		state["gravSources"] = self.gravSources.copy()
+		state["accValid"] = self.accValid
+		state["nextId"] = self.nextId
+		state["precision"] = self.precision
+		return state
+
+	# A new store made from a getState (with no views)
+	@staticmethod
+	def fromState(state):
+		count = len(state["mass"])
+		system = BodySystem(count, state.get("precision"))
+		for name in BodySystem.columns:
+			values = np.asarray(state[name])
+			column = np.zeros((system.capacity(),)+values.shape[1:], dtype = getattr(system, name).dtype)
+			column[:count] = values
+			setattr(system, name, column)
+		system.count = count
+		system.views = [None]*count
+		system.gravSources = np.asarray(state["gravSources"], dtype = np.intp)
+		system.accValid = bool(state["accValid"])
+		system.nextId = int(state["nextId"])
+		return system
+
+	# Returns the store shared by a list of bodies and the array of their row indices
+	@staticmethod
+	def gather(lst):
+		if len(lst) == 0:
+			return None, np.zeros(0, dtype = np.intp)
+		system = lst[0].system
+		idx = np.fromiter((b.index for b in lst), dtype = np.intp, count = len(lst))
+		return system, idx
+
+	# Sums (mass * displacement / distance^3) from every source onto every target
+	# Multiplying the result by G (and any unit conversions) gives the gravitational acceleration
+	# When potential is true, the sum of (mass / distance) onto every target is returned as well
+	# Coincident points (including a body and itself) are skipped
+	# Uses the compiled kernel when there is one (see Kernels), and float32 when that is the precision
+	# (the store's, which callers with one pass in, or else BodySystem.precision)
+	@staticmethod
+	def pairwiseAccelerations(targetPos, sourcePos, sourceMass, potential = False, precision = None):
+		precision = BodySystem.precision if precision is None else precision
+		if len(targetPos) == 0 or len(sourcePos) == 0:
+			return BodySystem.numpyPairwiseAccelerations(targetPos, sourcePos, sourceMass, potential)
+		if precision == "float32":
+			return BodySystem.reducedPairwiseAccelerations(targetPos, sourcePos, sourceMass, potential)
+		if Kernels.ready():
+			return Kernels.pairwiseAccelerations(targetPos, sourcePos, sourceMass, potential)
+		return BodySystem.numpyPairwiseAccelerations(targetPos, sourcePos, sourceMass, potential)
+
+	# pairwiseAccelerations worked out in float32
+	# Positions are taken from the center of the sources, and masses are put in the natural mass unit (see Units), so that every value
+	# is near 1 and nothing overflows or is rounded away, and the float64 sums are put back in kg/pixel^2 (and kg/pixel) at the end
+	@staticmethod
+	def reducedPairwiseAccelerations(targetPos, sourcePos, sourceMass, potential = False):
+		from Units import Units
+		unit = Units.mass()
+		center = sourcePos.mean(axis = 0)
+		targetPos = (targetPos - center).astype(np.float32)
+		sourcePos = (sourcePos - center).astype(np.float32)
+		sourceMass = (sourceMass/unit).astype(np.float32)
+		if Kernels.ready():
+			result = Kernels.pairwiseAccelerations(targetPos, sourcePos, sourceMass, potential)
+		else:
+			result = BodySystem.numpyPairwiseAccelerations(targetPos, sourcePos, sourceMass, potential)
+		for sums in (result if potential else (result,)):
+			sums *= unit
+		return result
+
+	# The NumPy version of pairwiseAccelerations
+	# The work is split into tiles of targets so that no temporary has more than 'tileElements' elements
+	# The temporaries have the dtype of the positions, and the sums are always float64
+	@staticmethod
+	def numpyPairwiseAccelerations(targetPos, sourcePos, sourceMass, potential = False):
+		acc = np.zeros((len(targetPos), 2))
+		pot = np.zeros(len(targetPos))
+		if len(targetPos) == 0 or len(sourcePos) == 0:
+			return (acc, pot) if potential else acc
+		tile = max(1, BodySystem.tileElements // len(sourcePos))
+		sx, sy = sourcePos[:, 0], sourcePos[:, 1]
+		for start in range(0, len(targetPos), tile):
+			stop = min(start + tile, len(targetPos))
+			dx = sx[None, :] - targetPos[start:stop, 0, None]
+			dy = sy[None, :] - targetPos[start:stop, 1, None]
+			r2 = dx*dx + dy*dy
+			weight = np.zeros_like(r2)
+			np.power(r2, -1.5, out = weight, where = r2 > 0)
+			weight *= sourceMass[None, :]
+			acc[start:stop, 0] = (weight*dx).sum(axis = 1, dtype = np.float64)
+			acc[start:stop, 1] = (weight*dy).sum(axis = 1, dtype = np.float64)
+			# worked out separately, so that the accelerations come out the same whether or not the potential is found
+			if potential:
+				np.power(r2, -0.5, out = weight, where = r2 > 0)
+				weight *= sourceMass[None, :]
+				pot[start:stop] = weight.sum(axis = 1, dtype = np.float64)
+		return (acc, pot) if potential else acc
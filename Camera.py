@@ -0,0 +1,51 @@
+# agent
+# 10/18/2026
+
+import numpy as np
+
+# Maps world positions (the pixels the physics uses) to the screen, with panning and zooming
+# Nothing in the world is moved by the camera, it is only applied when drawing
+class Camera:
+	minZoom = 1/64
+	maxZoom = 64
+
+	def __init__(self, width, height, pos = (0, 0), zoom = 1):
+		self.width = width
+		self.height = height
+		self.pos = np.array(pos, dtype = float) # the world position shown at the top left of the screen
+		self.zoom = zoom # screen pixels per world pixel
+		self.version = 0 # goes up every time the view changes
+
+	# Moves the view by (dx, dy) screen pixels
+	def pan(self, dx = 0, dy = 0):
+		self.pos += (dx/self.zoom, dy/self.zoom)
+		self.version += 1
+
+	# Zooms by 'factor', keeping the world position under the given screen position in place
+	def zoomAt(self, factor, screenPos):
+		anchor = self.screenToWorld(screenPos)
+		self.zoom = min(max(self.zoom*factor, Camera.minZoom), Camera.maxZoom)
+		self.pos = anchor - np.asarray(screenPos, dtype = float)/self.zoom
+		self.version += 1
+
+	# Works on a single (x, y) or an (n, 2) array of them
+	def worldToScreen(self, pos):
+		return (np.asarray(pos, dtype = float) - self.pos)*self.zoom
+
+	def screenToWorld(self, pos):
+		return np.asarray(pos, dtype = float)/self.zoom + self.pos
+
+	# The world rectangle that is on screen, as (left, top, right, bottom)
+	def worldBounds(self):
+		return (self.pos[0], self.pos[1], self.pos[0] + self.width/self.zoom, self.pos[1] + self.height/self.zoom)
+
+	# Which circles (world centers and radii) are at least partly on screen
+	def visible(self, pos, rad = 0):
+		left, top, right, bottom = self.worldBounds()
+		return (pos[:, 0] + rad >= left) & (pos[:, 0] - rad <= right) & (pos[:, 1] + rad >= top) & (pos[:, 1] - rad <= bottom)
+
+	# Which line segments (world start and end points) might cross the screen (tested with their bounding boxes)
+	def segmentsVisible(self, start, end):
+		left, top, right, bottom = self.worldBounds()
+		return (np.maximum(start[:, 0], end[:, 0]) >= left) & (np.minimum(start[:, 0], end[:, 0]) <= right) & \
+			(np.maximum(start[:, 1], end[:, 1]) >= top) & (np.minimum(start[:, 1], end[:, 1]) <= bottom)
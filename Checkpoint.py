@@ -0,0 +1,126 @@
+# agent
+# 10/18/2026
+
+import glob
+import json
+import os
+import re
+import numpy as np
+from Body import Body
+from BodySystem import BodySystem
+from Simulation import Simulation
+
+# Saves the full state of a Simulation (Simulation.getState) to a file, and makes simulations from those files
+# A checkpoint is an .npz file holding every array of the state, plus the rest of the state as JSON
+# It is written to a temporary file that is then moved over the old checkpoint, so a crash part way through never leaves a broken one
+# The settings that change the physics of every simulation (the timestep, gravity mode and precision) are saved with it and put back
+# when it is loaded, so a run carries on with the same physics it started with
+class Checkpoint:
+	version = 2
+	readableVersions = (1, 2) # version 1 checkpoints have no settings
+
+	@staticmethod
+	def save(sim, path, compress = False):
+		state = sim.getState()
+		state["settings"] = Checkpoint.settings()
+		return Checkpoint.write(state, path, compress)
+
+	# A new Simulation that carries on from a checkpoint file (with the settings it was saved with, unless restoreSettings is false)
+	@staticmethod
+	def load(path, srf = None, restoreSettings = True):
+		state = Checkpoint.read(path)
+		if restoreSettings and "settings" in state:
+			Checkpoint.applySettings(state["settings"])
+		return Simulation(state["seed"], srf).setState(state)
+
+	# The settings shared by every simulation that change how it moves
+	@staticmethod
+	def settings():
+		return {"spf": Body.spf, "mpp": Body.mpp, "gravityMode": Body.gravityMode, "theta": Body.theta, "precision": BodySystem.precision}
+
+	@staticmethod
+	def applySettings(settings):
+		Body.spf, Body.mpp = settings["spf"], settings["mpp"]
+		Body.gravityMode, Body.theta = settings["gravityMode"], settings["theta"]
+		BodySystem.precision = settings["precision"]
+
+	# The settings a checkpoint file was saved with (None for a checkpoint from before they were saved)
+	@staticmethod
+	def savedSettings(path):
+		with np.load(path, allow_pickle = False) as data:
+			values = json.loads(data["meta"].tobytes().decode())["values"]
+		settings = {key[len("settings/"):]: value for key, value in values.items() if key.startswith("settings/")}
+		return settings or None
+
+	# Independent copies of a simulation (or of a checkpoint file), each of which can go its own way without the others
+	# knowing, and without running the frames before the fork again
+	@staticmethod
+	def fork(source, count, srf = None):
+		state = Checkpoint.read(source) if isinstance(source, str) else source.getState()
+		return [Simulation(state["seed"], srf).setState(state) for _ in range(count)]
+
+	@staticmethod
+	def write(state, path, compress = False):
+		arrays, meta = {}, {}
+		Checkpoint.flatten(state, "", arrays, meta)
+		arrays["meta"] = np.frombuffer(json.dumps({"version": Checkpoint.version, "values": meta}).encode(), dtype = np.uint8)
+		directory = os.path.dirname(os.path.abspath(path))
+		temp = os.path.join(directory, ".{}.{}.tmp".format(os.path.basename(path), os.getpid()))
+		try:
+			with open(temp, "wb") as f:
+				(np.savez_compressed if compress else np.savez)(f, **arrays)
+				f.flush()
+				os.fsync(f.fileno())
+			os.replace(temp, path)
+		finally:
+			if os.path.exists(temp):
+				os.remove(temp)
+		return path
+
+	@staticmethod
+	def read(path):
+		with np.load(path, allow_pickle = False) as data:
+			meta = json.loads(data["meta"].tobytes().decode())
+			if meta["version"] not in Checkpoint.readableVersions:
+				raise ValueError("Unsupported checkpoint version {} in {}".format(meta["version"], path))
+			state = {}
+			for key, value in meta["values"].items():
+				Checkpoint.insert(state, key, value)
+			for key in data.files:
+				if key != "meta":
+					Checkpoint.insert(state, key, data[key])
+		return state
+
+	# The checkpoint with the highest frame out of the files matching a path with a {frame} field (or the path itself when it has none)
+	@staticmethod
+	def latest(path):
+		if "{frame}" not in path:
+			return path if os.path.exists(path) else None
+		found = {}
+		pattern = re.compile(re.escape(path).replace(re.escape("{frame}"), r"(\d+)") + "$")
+		for candidate in glob.glob(path.replace("{frame}", "*")):
+			match = pattern.match(candidate)
+			if match:
+				found[int(match.group(1))] = candidate
+		return found[max(found)] if found else None
+
+	# Splits a nested state into arrays and everything else, with keys that are the '/' separated path to each value
+	@staticmethod
+	def flatten(state, prefix, arrays, meta):
+		for key, value in state.items():
+			name = prefix + key
+			if isinstance(value, dict):
+				Checkpoint.flatten(value, name + "/", arrays, meta)
+			elif isinstance(value, np.ndarray):
+				arrays[name] = value
+			elif isinstance(value, np.generic):
+				meta[name] = value.item()
+			else:
+				meta[name] = value
+
+	@staticmethod
+	def insert(state, key, value):
+		*parents, last = key.split("/")
+		for parent in parents:
+			state = state.setdefault(parent, {})
+		state[last] = value
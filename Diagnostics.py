@@ -0,0 +1,132 @@
+# agent
+# 10/18/2026
+
+import math
+import numpy as np
+from Body import Body
+
+# A conserved quantity that drifted further than its threshold
+class DriftAlarm:
+	def __init__(self, frame, quantity, drift, threshold):
+		self.frame = frame
+		self.quantity = quantity
+		self.drift = drift
+		self.threshold = threshold
+
+	def __str__(self):
+		return "Frame {}: {} drifted by {:.3e} (more than {:.1e})".format(self.frame, self.quantity, self.drift, self.threshold)
+
+# The conserved quantities of a BodySystem (center of mass, momentum, angular momentum and energy), found with whole-array operations,
+# and a monitor that checks how far they have drifted every 'every' frames of a Simulation
+# The potential energy uses the sums the last gravity pass found when the bodies have not changed since (see BodySystem.wantPotential),
+# so on the frames it is checked, the energy costs about as much as the kinetic part
+# Drift is measured from a reference taken at the first check:
+#  * energy relative to the size of the energy
+#  * momentum and angular momentum (about the center of mass) relative to the sums of the sizes of the bodies' own
+# Merges are inelastic and move the survivor's mass, so energy and angular momentum are measured again from the first check after one,
+# and everything is when mass is added or taken away some other way (like a body being added)
+# Fixed bodies are held in place by outside forces, so momentum and angular momentum are not checked while there are any
+# (and the tree and particle mesh do not keep them exactly, so their thresholds need to be looser with those)
+# The tree and particle mesh find the potential from the same nodes and grid as the forces, so it is off by about as much
+# (the tree's monopoles make the potential energy about 0.5% too small at theta 0.5), but consistently from check to check
+class Diagnostics:
+	every = 100 # frames between checks
+	maxEnergyDrift = 1e-2
+	maxMomentumDrift = 1e-6
+	maxAngularDrift = 1e-6
+
+	# stop is whether the Simulation should stop stepping once there is an alarm (so a run that has gone wrong does not carry on)
+	def __init__(self, every = None, maxEnergyDrift = None, maxMomentumDrift = None, maxAngularDrift = None, stop = False):
+		self.every = Diagnostics.every if every is None else every
+		self.thresholds = {
+			"energy": Diagnostics.maxEnergyDrift if maxEnergyDrift is None else maxEnergyDrift,
+			"momentum": Diagnostics.maxMomentumDrift if maxMomentumDrift is None else maxMomentumDrift,
+			"angular momentum": Diagnostics.maxAngularDrift if maxAngularDrift is None else maxAngularDrift,
+		}
+		self.stop = stop
+		self.reference = None # what the last check measured from
+		self.latest = None # what the last check measured (see measure)
+		self.drift = {} # {quantity: drift} at the last check
+		self.alarms = [] # every DriftAlarm so far
+		self.halted = False # whether an alarm has asked the simulation to stop
+		self.merged = False # whether there has been a merge since the last check
+
+	# Whether the quantities are checked at the end of the given frame
+	def due(self, frame):
+		return frame % self.every == 0
+
+	# Called by the Simulation after every step, checking the quantities when it is on one of the frames they are checked
+	def update(self, sim):
+		if len(sim.lastMerges[1]) > 0:
+			self.merged = True
+		if not self.due(sim.frame):
+			return
+		values = Diagnostics.measure(sim.system)
+		reference = self.reference
+		if reference is None or not math.isclose(values["mass"], reference["mass"], rel_tol = 1e-12) or values["fixed"] != reference["fixed"]:
+			reference = self.reference = values
+		elif self.merged:
+			reference["energy"] = values["energy"]
+			reference["angularMomentum"] = values["angularMomentum"]
+		self.merged = False
+		self.latest = values
+		self.drift = {"energy": abs(values["energy"] - reference["energy"])/abs(reference["energy"]) if reference["energy"] != 0 else 0.0}
+		if not values["fixed"]:
+			self.drift["momentum"] = float(np.linalg.norm(values["momentum"] - reference["momentum"]))/values["momentumScale"] \
+				if values["momentumScale"] > 0 else 0.0
+			self.drift["angular momentum"] = abs(values["angularMomentum"] - reference["angularMomentum"])/values["angularMomentumScale"] \
+				if values["angularMomentumScale"] > 0 else 0.0
+		for quantity, drift in self.drift.items():
+			# (written so that a drift of NaN, from a run that has blown up, is an alarm too)
+			if not drift <= self.thresholds[quantity]:
+				self.alarms.append(DriftAlarm(sim.frame, quantity, drift, self.thresholds[quantity]))
+				self.halted = self.halted or self.stop
+
+	# The center of mass (pixels) and total mass (kg) of the given rows of a system
+	@staticmethod
+	def centerOfMass(system, rows):
+		mass = system.mass[rows]
+		totalMass = float(mass.sum())
+		if totalMass <= 0:
+			return np.zeros(2), totalMass
+		return (system.pos[rows]*mass[:, None]).sum(axis = 0)/totalMass, totalMass
+
+	# The sums of (mass / distance) onto each of the given rows from the others, taken from the last gravity pass when it found them
+	# for the same bodies in the same places, and otherwise found with the gravity mode in use (so in the tree and particle mesh modes
+	# a check costs about as much as a step, not O(N^2))
+	@staticmethod
+	def potential(system, rows):
+		pos, mass = system.pos[rows], system.mass[rows]
+		if system.lastPotential is not None:
+			lastRows, lastPos, lastMass, pot = system.lastPotential
+			if np.array_equal(lastRows, rows) and np.array_equal(lastPos, pos) and np.array_equal(lastMass, mass):
+				return pot
+		return Body.findAccelerations(pos, mass, potential = True, precision = system.precision)[1]
+
+	# The conserved quantities of the released bodies of a system (or of the given rows), as a dictionary of
+	# mass (kg), centerOfMass (pixels), momentum (kg*m/s), angularMomentum (about the center of mass, kg*m^2/s),
+	# kinetic, potential and energy (J), the sums of the sizes of the bodies' momenta and angular momenta (momentumScale and
+	# angularMomentumScale) and fixed (whether any of the bodies are fixed)
+	@staticmethod
+	def measure(system, rows = None):
+		if rows is None:
+			rows = system.liveRows()
+			rows = rows[system.released[rows]]
+		mass, vec = system.mass[rows], system.vec[rows]
+		center, totalMass = Diagnostics.centerOfMass(system, rows)
+		arm = (system.pos[rows] - center)*Body.mpp
+		angular = arm[:, 0]*vec[:, 1] - arm[:, 1]*vec[:, 0]
+		kinetic = float(((vec**2).sum(axis = 1)/(2*mass)).sum())
+		potential = -0.5*Body.G/Body.mpp*float((mass*Diagnostics.potential(system, rows)).sum())
+		return {
+			"mass": totalMass,
+			"centerOfMass": center,
+			"momentum": vec.sum(axis = 0),
+			"angularMomentum": float(angular.sum()),
+			"kinetic": kinetic,
+			"potential": potential,
+			"energy": kinetic + potential,
+			"momentumScale": float(np.sqrt((vec**2).sum(axis = 1)).sum()),
+			"angularMomentumScale": float(np.abs(angular).sum()),
+			"fixed": bool(system.fixed[rows].any()),
+		}
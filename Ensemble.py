@@ -0,0 +1,161 @@
+# agent
+# 10/18/2026
+
+import numpy as np
+from Body import Body
+from Profiler import Profiler
+from Simulation import Simulation
+
+# Runs many small independent simulations together, as (systems x bodies) arrays
+# Each step moves, collides and pulls the bodies of every system with whole-array operations, instead of a Python loop per simulation,
+# which is where most of the time goes when the systems only have tens of bodies
+# The systems have different numbers of bodies (and lose bodies as they merge), so the arrays are padded and 'alive' marks the real bodies
+# A step is the same as a step of the euler integrator with direct gravity, so each system ends up where its own Simulation would
+# (up to rounding in the gravity sums)
+class Ensemble:
+	# upper bound on the number of elements in a single (systems x bodies x bodies) temporary
+	# much smaller than BodySystem.tileElements, since the arrays of a tile are gone over many times and are quicker to work on while they fit in the cache
+	tileElements = 1 << 16
+
+	# sims are the Simulations to start from (they are copied, and are not changed by running the ensemble)
+	def __init__(self, sims):
+		self.seeds = [sim.seed.raw for sim in sims]
+		self.frame = sims[0].frame if len(sims) > 0 else 0
+		m = len(sims)
+		n = max((len(sim.system.liveRows()) for sim in sims), default = 0)
+		self.pos = np.zeros((m, n, 2))
+		self.vec = np.zeros((m, n, 2))
+		self.mass = np.zeros((m, n))
+		self.rad = np.zeros((m, n))
+		self.alive = np.zeros((m, n), dtype = bool)
+		self.fixed = np.zeros((m, n), dtype = bool)
+		self.released = np.zeros((m, n), dtype = bool)
+		for s, sim in enumerate(sims):
+			system = sim.system
+			rows = system.liveRows()
+			k = len(rows)
+			self.pos[s, :k] = system.pos[rows]
+			self.vec[s, :k] = system.vec[rows]
+			self.mass[s, :k] = system.mass[rows]
+			self.rad[s, :k] = system.displayRad[rows]
+			self.alive[s, :k] = True
+			self.fixed[s, :k] = system.fixed[rows]
+			self.released[s, :k] = system.released[rows]
+
+	# An ensemble of random-preset runs, one for each seed
+	@staticmethod
+	def fromSeeds(seeds, numBodies = Simulation.randomNumBodies, massRange = Simulation.randomMassRange):
+		return Ensemble([Simulation(seed).generateRandomBodies(numBodies, massRange) for seed in seeds])
+
+	def systemCount(self):
+		return self.alive.shape[0]
+
+	# How many systems are worked on at once
+	def tile(self):
+		n = self.alive.shape[1]
+		return max(1, Ensemble.tileElements // max(n*n, 1))
+
+	# Advances every system by n frames
+	def step(self, n = 1):
+		for _ in range(n):
+			with Profiler.phase("update"):
+				self.update()
+			active = (self.alive & self.released).sum(axis = 1)
+			Profiler.count("collision pairs", int((active*(active - 1)//2).sum()))
+			Profiler.count("interactions", int((active*active).sum()))
+			m, tile = self.systemCount(), self.tile()
+			for start in range(0, m, tile):
+				stop = min(start + tile, m)
+				# the bodies do not move between the collisions and gravity, so the distances between them are shared
+				with Profiler.phase("collisions"):
+					dx, dy, r2 = self.separations(start, stop)
+					self.collide(start, stop, r2)
+				with Profiler.phase("gravity"):
+					self.applyGravity(start, stop, dx, dy, r2)
+			self.frame += 1
+			Profiler.count("steps", m)
+			# dropping the padding left by absorbed bodies once most of it is unused
+			if 2*self.alive.sum(axis = 1).max(initial = 0) < self.alive.shape[1]:
+				self.compact()
+		return self
+
+	# Moves the bodies along their momenta (like Body.updateSystem)
+	def update(self):
+		moving = self.alive & ~self.fixed
+		self.pos[moving] += self.vec[moving]/Body.mpp/self.mass[moving, None]*Body.spf
+		self.vec[self.alive & self.fixed] = 0
+
+	# The displacements and squared distances between every pair of bodies of systems start to stop, as [system, target, source]
+	def separations(self, start, stop):
+		x, y = np.ascontiguousarray(self.pos[start:stop, :, 0]), np.ascontiguousarray(self.pos[start:stop, :, 1])
+		dx = x[:, None, :] - x[:, :, None]
+		dy = y[:, None, :] - y[:, :, None]
+		return dx, dy, dx*dx + dy*dy
+
+	# Merges colliding bodies within systems start to stop (like Body.mergeCollisions)
+	# Pairs closer than the sum of their radii get the exact test of Body.absorbingPairs
+	def collide(self, start, stop, r2):
+		n = self.alive.shape[1]
+		active = self.alive[start:stop] & self.released[start:stop]
+		# bodies that are gone (or not released) get a radius of NaN so that no pair with them passes
+		# and the rest a little extra, so that rounding in the squares cannot leave out a pair that the exact test would count
+		rad = np.where(active, self.rad[start:stop], np.nan)*(1 + 1e-9)
+		reach = rad[:, :, None] + rad[:, None, :]
+		s, pair = np.divmod(np.flatnonzero(r2 <= reach*reach), n*n)
+		i, j = np.divmod(pair, n)
+		upper = i < j
+		s, i, j = s[upper], i[upper], j[upper]
+		if len(s) == 0:
+			return
+		# as indices into the flattened (systems x bodies) arrays, so every system's groups can be merged in one go
+		# (the groups never cross from one system into another, since only bodies in the same system are paired)
+		offset = (start + s)*n
+		mass = self.mass.reshape(-1)
+		first, second = Body.absorbingPairs(self.pos.reshape(-1, 2), self.rad.reshape(-1), mass, offset + i, offset + j)
+		if len(first) == 0:
+			return
+		_, absorbed, keep = Body.mergeGroups(mass, self.vec.reshape(-1, 2), first, second)
+		self.rad.reshape(-1)[keep] = Body.findDisplayRadius(mass[keep])
+		self.alive.reshape(-1)[absorbed] = False
+
+	# Applies one frame of gravity between the released bodies of systems start to stop (like Body.applySystemGravity)
+	def applyGravity(self, start, stop, dx, dy, r2):
+		# bodies that are gone (or not released) are given no mass, so they neither pull nor get pulled
+		mass = np.where(self.alive[start:stop] & self.released[start:stop], self.mass[start:stop], 0)
+		# coincident bodies (including each body and itself) are skipped, like in BodySystem.pairwiseAccelerations
+		r2[r2 == 0] = np.inf
+		weight = mass[:, None, :]/(r2*np.sqrt(r2))
+		acc = np.stack((np.einsum("sij,sij->si", weight, dx), np.einsum("sij,sij->si", weight, dy)), axis = 2)
+		# converting to a change in momentum over one frame (kg*m/s)
+		self.vec[start:stop] += acc*(Body.G/Body.mpp**2*Body.spf*mass)[:, :, None]
+
+	# Moves the bodies of each system to the front of its row (keeping their order) and drops the padding that is no longer needed
+	def compact(self):
+		width = int(self.alive.sum(axis = 1).max(initial = 0))
+		order = np.argsort(~self.alive, axis = 1, kind = "stable")[:, :width]
+		self.pos = np.take_along_axis(self.pos, order[:, :, None], axis = 1)
+		self.vec = np.take_along_axis(self.vec, order[:, :, None], axis = 1)
+		for name in ("mass", "rad", "alive", "fixed", "released"):
+			setattr(self, name, np.take_along_axis(getattr(self, name), order, axis = 1))
+		return self
+
+	# Keeps only the systems where keep (a boolean array with one value per system) is true
+	def select(self, keep):
+		keep = np.asarray(keep, dtype = bool)
+		self.seeds = [seed for seed, k in zip(self.seeds, keep) if k]
+		for name in ("pos", "vec", "mass", "rad", "alive", "fixed", "released"):
+			setattr(self, name, getattr(self, name)[keep])
+		return self
+
+	# The positions and masses of the bodies left in system s, in the form a Scorer takes
+	def bodiesOf(self, s):
+		alive = self.alive[s]
+		return self.pos[s, alive], self.mass[s, alive]
+
+	# The score of every system from a Scorer (see Sweep)
+	def scores(self, scorer):
+		return [scorer.score(*self.bodiesOf(s)) for s in range(self.systemCount())]
+
+	# The number of bodies left in every system
+	def bodyCounts(self):
+		return self.alive.sum(axis = 1)
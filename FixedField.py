@@ -0,0 +1,331 @@
+# agent
+# 10/18/2026
+
+import copy
+import numpy as np
+from BodySystem import BodySystem
+
+# The pull of the fixed bodies, worked out once and kept on an adaptive grid
+# Fixed bodies never move, so their combined field only changes when one is added, removed or changes mass,
+# and the other bodies can read it from the grid instead of summing over every fixed body each frame
+# The field is split in two, a bit like in ParticleMesh: each cell of the grid keeps the pull of the fixed bodies more than
+# 'nearCells' of its widths away, which changes slowly over the cell and is interpolated (biquadratically) from a 3 x 3 grid of samples,
+# and a list of the few fixed bodies closer than that, which are summed directly
+# The grid starts as rootCells x rootCells square cells, and cells are split into four while they have more than 'maxNear' fixed bodies
+# close to them (or their interpolation is off by more than 'tolerance'), so it is fine around the fixed bodies and coarse away from them
+# The tolerance is only checked at four points in each cell, so elsewhere the field can be off by more (about 0.5% at worst)
+# Fixed bodies that gain mass (by absorbing others) or are removed (taken as losing all of it) do not need a new grid, since the field is
+# linear in the masses: the change in mass is summed directly at first, and once that has cost as many interactions as adding it
+# into the samples of every cell would, it is added into them
+# The grid is never changed once it is made: changes in mass give a new version of the field with its own samples and masses,
+# so a thread reading an older version (like the viewer's snapshot) never sees it change
+# Values are the same sums as BodySystem.pairwiseAccelerations: mass * displacement / distance^3 (and mass / distance for the potential)
+class FixedField:
+	tolerance = 1e-3 # largest interpolation error allowed at a cell's test points, relative to the strongest (interpolated) field in it
+	nearCells = 4 # fixed bodies within this many cell widths of a cell are summed directly instead of interpolated
+	maxNear = 8 # cells with more fixed bodies than this close to them are split
+	rootCells = 16 # cells along each side of the coarsest grid
+	lookupCells = 1024 # cells along each side of the flat table used to find the cell a position is in
+	maxDepth = 12 # times a cell can be split in four
+	margin = 0.5 # how far the grid reaches past the bodies it was made for (as a share of their extent)
+	samplePoints = np.array([0, 0.5, 1])
+	testPoints = np.array([[0.25, 0.25], [0.25, 0.75], [0.75, 0.25], [0.75, 0.75]]) # where a cell's interpolation is checked
+
+	# pos and mass are the fixed bodies', and 'covering' the positions the grid has to reach (as well as the fixed bodies)
+	# ids are the ids of the fixed bodies (in increasing order), so that removed ones can be told apart from new ones (see 'of')
+	# precision is that of the store the fixed bodies are from (see BodySystem.pairwiseAccelerations)
+	def __init__(self, pos, mass, covering, ids = None, precision = None):
+		self.pos = np.array(pos, dtype = float).reshape(-1, 2)
+		self.precision = BodySystem.precision if precision is None else precision
+		self.mass = np.array(mass, dtype = float) # the masses the samples were made with
+		self.ids = None if ids is None else np.array(ids)
+		self.version = 0 # goes up with every change in mass
+		self.buildWork = 0 # pairwise interactions summed to make the grid
+		# the fixed bodies whose mass is not in the samples yet, and how much mass each has gained, which are summed directly
+		self.pending = (np.zeros(0, dtype = np.intp), np.zeros(0))
+		self.pendingWork = 0 # interactions summed for the pending changes since the last were added into the samples
+		self.offGridWork = 0 # interactions summed directly for positions off the grid
+		points = np.concatenate((self.pos, np.asarray(covering, dtype = float).reshape(-1, 2)))
+		lo, hi = points.min(axis = 0), points.max(axis = 0)
+		extent = max(float((hi - lo).max())*(1 + 2*FixedField.margin), 1.0)
+		self.origin = (lo + hi)/2 - extent/2
+		self.rootSize = extent/FixedField.rootCells
+		self.build()
+
+	# The field of a BodySystem's fixed rows, made again only when fixed bodies have been added or moved (it is kept in the system's
+	# 'fixedField'), since changes in mass, and fixed bodies being removed, are added to the one there is
+	# It is also made again (to reach further) once the positions off the grid, which are summed directly, have cost as much as making it did
+	@staticmethod
+	def of(system, fixedRows, targetPos):
+		fixedRows = fixedRows[np.argsort(system.id[fixedRows], kind = 'stable')]
+		ids, pos, mass = system.id[fixedRows], system.pos[fixedRows], system.mass[fixedRows]
+		field = system.fixedField
+		masses = None if field is None else field.massesOf(ids, pos, mass)
+		field = None if masses is None else field.withMasses(masses)
+		if field is not None:
+			field.offGridWork += int((~field.covers(targetPos)).sum())*len(field.pos)
+		if field is None or field.offGridWork > field.buildWork:
+			field = FixedField(pos, mass, targetPos, ids, system.precision)
+		system.fixedField = field
+		return field
+
+	# Every fixed body's mass in the field's order, for fixed bodies with the given ids (in increasing order), positions and masses,
+	# with the ones that are gone at 0, or None when the field was not made for them (some are new or have moved)
+	def massesOf(self, ids, pos, mass):
+		if self.ids is None or len(ids) > len(self.ids):
+			return None
+		at = np.minimum(np.searchsorted(self.ids, ids), max(len(self.ids) - 1, 0))
+		if not (np.array_equal(self.ids[at], ids) and np.array_equal(self.pos[at], pos)):
+			return None
+		masses = np.zeros(len(self.ids))
+		masses[at] = mass
+		return masses
+
+	# The masses of the fixed bodies, with the pending changes
+	def currentMasses(self):
+		mass = self.mass.copy()
+		mass[self.pending[0]] += self.pending[1]
+		return mass
+
+	# The field with new masses for the fixed bodies (in the same order): itself when they have not changed, or a new version sharing
+	# the grid, with the changes pending (summed directly) or, once they have cost enough to be worth it, added into the samples
+	def withMasses(self, mass):
+		changed = np.flatnonzero(mass != self.mass)
+		extra = mass[changed] - self.mass[changed]
+		if np.array_equal(changed, self.pending[0]) and np.array_equal(extra, self.pending[1]):
+			return self
+		field = self.copy()
+		field.version = self.version + 1
+		field.pending = (changed, extra)
+		if self.pendingWork >= field.foldWork():
+			field.fold()
+		return field
+
+	# The interactions that adding the pending changes into the samples costs
+	def foldWork(self):
+		return len(self.leafCells)*len(FixedField.samplePoints)**2*len(self.pending[0])
+
+	# Adds the pull of the pending changes in mass into the samples of the cells they are far from
+	# (only called on a new version, since it replaces the samples and masses)
+	def fold(self):
+		changed, extra = self.pending
+		k = len(FixedField.samplePoints)**2
+		positions = self.samplePositions()
+		acc, pot = BodySystem.pairwiseAccelerations(positions, self.pos[changed], extra, potential = True, precision = self.precision)
+		# taking away the pull on the cells that the changed bodies are near to (they are summed directly there)
+		which = np.full(len(self.mass), -1, dtype = np.int64)
+		which[changed] = np.arange(len(changed))
+		leafOfNear = np.repeat(np.arange(len(self.leafCells)), np.diff(self.nearStart))
+		near = which[self.nearBodies] >= 0
+		targets = (leafOfNear[near][:, None]*k + np.arange(k)[None, :]).ravel()
+		sources = np.repeat(self.nearBodies[near], k)
+		nearAcc, nearPot = FixedField.pairSums(positions, targets, self.pos[sources], extra[which[sources]], len(positions))
+		values = np.concatenate((acc - nearAcc, (pot - nearPot)[:, None]), axis = 1)
+		self.samples = self.samples + values.reshape(self.samples.shape)
+		self.mass = self.currentMasses()
+		self.pending = (np.zeros(0, dtype = np.intp), np.zeros(0))
+		self.pendingWork = 0
+		return self
+
+	# A copy that shares the grid (which is never changed), with its own count of the work the pending changes have cost
+	def copy(self):
+		return copy.copy(self)
+
+	# The 3 x 3 sample points of every leaf, one leaf after another
+	def samplePositions(self):
+		s = FixedField.samplePoints
+		grid = np.stack(np.meshgrid(s, s, indexing = "ij"), axis = -1).reshape(-1, 2)
+		corners, sizes = self.corners[self.leafCells], self.sizes[self.leafCells]
+		return (corners[:, None, :] + grid[None, :, :]*sizes[:, None, None]).reshape(-1, 2)
+
+	# Splits cells a level at a time, starting from the root grid
+	def build(self):
+		n = FixedField.rootCells
+		ix, iy = np.meshgrid(np.arange(n), np.arange(n), indexing = "ij")
+		corners = self.origin + np.stack((ix.ravel(), iy.ravel()), axis = 1)*self.rootSize
+		size = self.rootSize
+		levelCorners, levelSizes, levelChildren, levelLeaves = [], [], [], []
+		samples, nearCounts, nearBodies = [], [], []
+		first = n*n # the index the next level's cells start at
+		leaves = 0
+		for depth in range(FixedField.maxDepth + 1):
+			if len(corners) == 0:
+				break
+			cells, bodies = self.nearPairs(corners, size)
+			count = np.bincount(cells, minlength = len(corners))
+			values, fits = self.sampleCells(corners, size, cells, bodies)
+			split = (count > FixedField.maxNear) | ~fits
+			if depth == FixedField.maxDepth:
+				split[:] = False
+			children = np.full(len(corners), -1, dtype = np.int64)
+			children[split] = first + 4*np.arange(int(split.sum()))
+			leafIndex = np.full(len(corners), -1, dtype = np.int64)
+			leafIndex[~split] = leaves + np.arange(int((~split).sum()))
+			leaves += int((~split).sum())
+			samples.append(values[~split])
+			nearCounts.append(count[~split])
+			nearBodies.append(bodies[~split[cells]])
+			levelCorners.append(corners)
+			levelSizes.append(np.full(len(corners), size))
+			levelChildren.append(children)
+			levelLeaves.append(leafIndex)
+			# the four children of a cell are stored together, in the order (left, bottom), (left, top), (right, bottom), (right, top)
+			size /= 2
+			offsets = np.array([[0, 0], [0, 1], [1, 0], [1, 1]])*size
+			corners = (corners[split, None, :] + offsets[None, :, :]).reshape(-1, 2)
+			first += len(corners)
+		self.corners = np.concatenate(levelCorners)
+		self.sizes = np.concatenate(levelSizes)
+		self.children = np.concatenate(levelChildren)
+		self.leafIndex = np.concatenate(levelLeaves)
+		self.leafCells = np.flatnonzero(self.leafIndex >= 0) # the cell of each leaf (leaves are numbered in the order of their cells)
+		self.samples = np.concatenate(samples) # (leaves, 3, 3, 3): the x and y of the far field and its potential at each sample point
+		# the near bodies of every leaf, one leaf after another (nearStart[k] is where leaf k's start)
+		nearCounts = np.concatenate(nearCounts)
+		self.nearStart = np.concatenate(([0], np.cumsum(nearCounts)))
+		self.nearBodies = np.concatenate(nearBodies)
+		self.depth = len(levelCorners) - 1
+		self.buildLookup()
+		return self
+
+	# A table of which cell covers each square of a uniform grid as fine as a cell 'lookupDepth' levels down,
+	# so finding the cell of a position only has to go down the levels below that
+	def buildLookup(self):
+		n = FixedField.rootCells
+		self.lookupDepth = 0
+		while n*2**(self.lookupDepth + 1) <= FixedField.lookupCells and self.lookupDepth < self.depth:
+			self.lookupDepth += 1
+		lookup = np.arange(n*n).reshape(n, n)
+		for _ in range(self.lookupDepth):
+			lookup = lookup.repeat(2, axis = 0).repeat(2, axis = 1)
+			parity = np.arange(len(lookup)) % 2
+			children = self.children[lookup]
+			lookup = np.where(children >= 0, children + 2*parity[:, None] + parity[None, :], lookup)
+		self.lookup = lookup
+		return self
+
+	# The (cell, fixed body) pairs where the body is within nearCells widths of the cell, sorted by cell
+	def nearPairs(self, corners, size):
+		center = corners + size/2
+		reach = (0.5 + FixedField.nearCells)*size
+		cells, bodies = [], []
+		chunk = max(1, BodySystem.tileElements // max(len(self.mass), 1))
+		for start in range(0, len(corners), chunk):
+			d = np.abs(self.pos[None, :, :] - center[start:start + chunk, None, :])
+			c, b = np.nonzero((d <= reach).all(axis = 2))
+			cells.append(c + start)
+			bodies.append(b)
+		return np.concatenate(cells), np.concatenate(bodies)
+
+	# The far field at the 3 x 3 sample points of each cell, and whether interpolating from them is close enough at the test points
+	def sampleCells(self, corners, size, cells, bodies):
+		s = FixedField.samplePoints
+		grid = np.stack(np.meshgrid(s, s, indexing = "ij"), axis = -1).reshape(-1, 2)
+		points = np.concatenate((grid, FixedField.testPoints))
+		positions = (corners[:, None, :] + points[None, :, :]*size).reshape(-1, 2)
+		# summing over every fixed body, and then taking away the pull of each cell's near ones
+		acc, pot = BodySystem.pairwiseAccelerations(positions, self.pos, self.mass, potential = True, precision = self.precision)
+		k = len(points)
+		targets = (cells[:, None]*k + np.arange(k)[None, :]).ravel()
+		sources = np.repeat(bodies, k)
+		nearAcc, nearPot = FixedField.pairSums(positions, targets, self.pos[sources], self.mass[sources], len(positions))
+		self.buildWork += len(positions)*len(self.mass) + len(targets)
+		values = np.concatenate((acc - nearAcc, (pot - nearPot)[:, None]), axis = 1).reshape(len(corners), k, 3)
+		sampled = values[:, :9].reshape(-1, 3, 3, 3)
+		test = values[:, 9:, :2]
+		f = np.tile(FixedField.testPoints, (len(corners), 1))
+		interpolated = FixedField.interpolate(np.repeat(sampled, len(FixedField.testPoints), axis = 0), f)[:, :2]
+		error = np.sqrt(((interpolated.reshape(test.shape) - test)**2).sum(axis = 2)).max(axis = 1)
+		strongest = np.sqrt((values[:, :, :2]**2).sum(axis = 2)).max(axis = 1)
+		return sampled, error <= FixedField.tolerance*strongest
+
+	# Sums the pull of each source onto its target (targets are indices into positions, one per source), skipping coincident pairs
+	# Returns the acceleration and potential sums for all 'count' targets
+	@staticmethod
+	def pairSums(positions, targets, sourcePos, sourceMass, count):
+		d = sourcePos - positions[targets]
+		r2 = (d**2).sum(axis = 1)
+		inverse = np.zeros(len(r2))
+		np.power(r2, -0.5, out = inverse, where = r2 > 0)
+		weight = sourceMass*inverse**3
+		acc = np.stack([np.bincount(targets, weights = weight*d[:, k], minlength = count) for k in range(2)], axis = 1)
+		return acc, np.bincount(targets, weights = sourceMass*inverse, minlength = count)
+
+	# The weights of the three samples along one side of a cell at positions t along it (as fractions of its width)
+	@staticmethod
+	def basis(t):
+		weights = np.empty((len(t), 3))
+		weights[:, 0] = (2*t - 1)*(t - 1)
+		weights[:, 1] = 4*t*(1 - t)
+		weights[:, 2] = t*(2*t - 1)
+		return weights
+
+	# Interpolates each cell's 3 x 3 samples at f (the position in the cell as fractions of its width)
+	@staticmethod
+	def interpolate(samples, f):
+		weights = FixedField.basis(f[:, 0])[:, :, None]*FixedField.basis(f[:, 1])[:, None, :]
+		return np.matmul(weights.reshape(-1, 1, 9), samples.reshape(-1, 9, 3))[:, 0]
+
+	# Whether each position is on the grid
+	def covers(self, positions):
+		u = (np.asarray(positions, dtype = float).reshape(-1, 2) - self.origin)/self.rootSize
+		return ((u >= 0) & (u < FixedField.rootCells)).all(axis = 1)
+
+	# The cell (leaf) each position is in, or -1 for positions off the grid
+	def find(self, positions):
+		n = len(self.lookup)
+		ix = np.floor((positions - self.origin)*(n/(self.rootSize*FixedField.rootCells))).astype(np.int64)
+		inside = ((ix >= 0) & (ix < n)).all(axis = 1)
+		cell = np.full(len(positions), -1, dtype = np.int64)
+		cell[inside] = self.lookup[ix[inside, 0], ix[inside, 1]]
+		# going down a level at a time for the positions whose cell is split further than the table goes
+		going = np.flatnonzero(inside)
+		going = going[self.children[cell[going]] >= 0]
+		while len(going) > 0:
+			children = self.children[cell[going]]
+			split = children >= 0
+			going, children = going[split], children[split]
+			half = self.corners[cell[going]] + self.sizes[cell[going], None]/2
+			quadrant = 2*(positions[going, 0] >= half[:, 0]) + (positions[going, 1] >= half[:, 1])
+			cell[going] = children + quadrant
+		return cell
+
+	# The field (and with potential, the potential) of the fixed bodies at each position
+	def accelerations(self, positions, potential = False):
+		positions = np.asarray(positions, dtype = float).reshape(-1, 2)
+		acc = np.zeros((len(positions), 2))
+		pot = np.zeros(len(positions))
+		cell = self.find(positions)
+		grid = np.flatnonzero(cell >= 0)
+		if len(grid) > 0:
+			c = cell[grid]
+			leaf = self.leafIndex[c]
+			f = (positions[grid] - self.corners[c])/self.sizes[c, None]
+			values = FixedField.interpolate(self.samples[leaf], f)
+			# adding on the near bodies of each position's cell
+			counts = self.nearStart[leaf + 1] - self.nearStart[leaf]
+			targets = np.repeat(grid, counts)
+			first = np.repeat(self.nearStart[leaf] - np.cumsum(counts) + counts, counts)
+			sources = self.nearBodies[first + np.arange(len(targets))]
+			nearAcc, nearPot = FixedField.pairSums(positions, targets, self.pos[sources], self.mass[sources], len(positions))
+			acc[grid] = values[:, :2] + nearAcc[grid]
+			pot[grid] = values[:, 2] + nearPot[grid]
+		off = np.flatnonzero(cell < 0)
+		if len(off) > 0:
+			acc[off], pot[off] = BodySystem.pairwiseAccelerations(positions[off], self.pos, self.mass, potential = True, precision = self.precision)
+		changed, extra = self.pending
+		if len(changed) > 0:
+			extraAcc, extraPot = BodySystem.pairwiseAccelerations(positions, self.pos[changed], extra, potential = True, \
+				precision = self.precision)
+			self.pendingWork += len(positions)*len(changed)
+			acc += extraAcc
+			pot += extraPot
+		return (acc, pot) if potential else acc
+
+	# The largest error of the field (relative to the directly summed one) over 'sample' random positions on the grid
+	def error(self, sample = 1000, seed = 0):
+		rng = np.random.default_rng(seed)
+		positions = self.origin + rng.random((sample, 2))*self.rootSize*FixedField.rootCells
+		expected = BodySystem.pairwiseAccelerations(positions, self.pos, self.currentMasses(), precision = "float64")
+		acc = self.accelerations(positions)
+		return float((np.sqrt(((acc - expected)**2).sum(axis = 1))/np.maximum(np.sqrt((expected**2).sum(axis = 1)), 1e-300)).max())
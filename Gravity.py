@@ -3,101 +3,150 @@
 
 import pygame
 import math
-import random
-import itertools
-from tkinter import *
+import argparse
 from Body import Body
 from Seed import Seed
+from Simulation import Simulation
+from Camera import Camera
+from Renderer import Renderer
+from Layers import TextCache, StaticLayer, DirtyRects
+from BodySystem import BodySystem
+from PhysicsThread import PhysicsThread
+from Profiler import Profiler
+from Recorder import Recorder, Recording, Replay
+from Scenario import Scenario
+from Stream import StreamServer
+from TrajectoryPreview import TrajectoryPreview
+
+parser = argparse.ArgumentParser(description = "Orbit simulator")
+parser.add_argument("--replay", default = None, help = "play back a recording instead of running a simulation")
+parser.add_argument("--record", default = None, help = "record the run into this folder")
+parser.add_argument("--stream", type = int, default = None, metavar = "PORT", help = "serve the state of the run on this local port")
+parser.add_argument("--stream-every", type = int, default = 1, help = "frames between streamed states")
+parser.add_argument("--stream-format", choices = ["ndjson", "binary"], default = "ndjson")
+parser.add_argument("--preview-frames", type = int, default = TrajectoryPreview.horizon, \
+	help = "how many frames ahead the path of a body being aimed is shown (0 turns it off)")
+parser.add_argument("--fixed-field", action = "store_true", help = "read the pull of fixed bodies from a cached field instead of summing it every frame")
+parser.add_argument("--precision", choices = ["float64", "float32"], default = BodySystem.precision, \
+	help = "float32 sums gravity faster and stores derived values in half the memory, at the cost of accuracy")
+parser.add_argument("--scenario", default = None, help = "load the bodies and display settings from this scenario file (see Scenario.py)")
+parser.add_argument("--preset", type = int, default = None, \
+	help = "start this preset without the preset dialog (0: none, 1: random (0 momentum), 2: circular orbit, 3: oscellation)")
+parser.add_argument("--bodies", type = int, default = Simulation.randomNumBodies, help = "number of bodies for the random preset")
+parser.add_argument("--seed", default = "", help = "seed string for the random preset")
+parser.add_argument("--draw", nargs = "*", choices = Scenario.displayNames, default = None, \
+	help = "what to draw when the preset dialog is skipped (by default the scenario's settings, or nothing)")
+args = parser.parse_args()
+Body.cacheFixedField = args.fixed_field
+BodySystem.precision = args.precision
+
+# The preset dialog, which returns the display settings, preset, number of bodies and seed that were picked
+# tkinter is only imported here, so runs that skip the dialog do not load it
+def askPreset():
+	from tkinter import Tk, IntVar, StringVar, Checkbutton, Radiobutton, Entry, Label, Button
+
+	chosen = {"displayInfo": [False, False, False, False, False], "presetVal": 0, "numBodies": Simulation.randomNumBodies, "seed": ""}
+
+	root = Tk()
+	root.title("Orbit Preset")
+
+	disabledColor, enabledColor = "#646464", "#000000"
+
+	def enter():
+		# display settings
+		chosen["displayInfo"] = [bool(vec_int.get()), bool(grav_int.get()), bool(aggGrav_int.get()), \
+		bool(trail_int.get()), bool(centerOfMass_int.get())]
+		chosen["presetVal"] = preset_int.get()
+		# handling entries
+		if len(numBodies_str.get()) > 0 and int(numBodies_str.get()) >= 0:
+			chosen["numBodies"] = numBodies_str.get()
+		chosen["seed"] = seed_str.get() if len(seed_str.get()) <= 6 else seed_str.get()[:6]
+		root.destroy()
+	def selectRadio():
+		stateUpdate = 'normal' if preset_int.get()==1 else 'disabled'
+		textUpdate = enabledColor if preset_int.get()==1 else disabledColor
+		randomNoMomentum_entry.config(state = stateUpdate)
+		seed_entry.config(state = stateUpdate)
+		randomNoMomentum_label.config(fg = textUpdate)
+		seed_label.config(fg = textUpdate)
+
+	vec_int = IntVar()
+	grav_int = IntVar()
+	aggGrav_int = IntVar()
+	trail_int = IntVar()
+	centerOfMass_int = IntVar()
+
+	preset_int = IntVar()
+	numBodies_str = StringVar()
+	seed_str = StringVar()
+
+	vec_check = Checkbutton(root, text = 'Draw vectors', variable = vec_int)
+	grav_check = Checkbutton(root, text = 'Draw gravity', variable = grav_int)
+	aggGrav_check = Checkbutton(root, text = 'Draw net grav', variable = aggGrav_int)
+	trail_check = Checkbutton(root, text = 'Draw trail', variable = trail_int)
+	centerOfMass_check = Checkbutton(root, text = 'Draw center of mass', variable = centerOfMass_int)
+
+	none_radio = Radiobutton(root, text = 'None', variable = preset_int, value = 0, command = selectRadio)
+	randomNoMomentum_radio = Radiobutton(root, text = 'Random (0 Momentum)', variable = preset_int, value = 1, command = selectRadio)
+	circularOrbit_radio = Radiobutton(root, text = 'Circular Orbit', variable = preset_int, value = 2, command = selectRadio)
+	oscellation_radio = Radiobutton(root, text = 'Oscellation', variable = preset_int, value = 3, command = selectRadio)
+
+	randomNoMomentum_entry = Entry(root, textvariable = numBodies_str, state = 'disabled')
+	numBodies_str.set(str(chosen["numBodies"]))
+	seed_entry = Entry(root, textvariable = seed_str, state = 'disabled')
+
+	display_label = Label(root, text = 'Display Settings')
+	presets_label = Label(root, text = 'Presets')
+
+	randomNoMomentum_label = Label(root, text = 'Number of bodies', fg = disabledColor)
+	seed_label = Label(root, text = 'Seed', fg = disabledColor)
+
+	enter_button = Button(root, text = "Enter", command = enter, padx = 70, pady = 10, borderwidth = 4)
+
+	vec_check.grid(row = 1, column = 0, sticky = "W", padx = 40)
+	grav_check.grid(row = 2, column = 0, sticky = "W", padx = 40)
+	aggGrav_check.grid(row = 3, column = 0, sticky = "W", padx = 40)
+	trail_check.grid(row = 4, column = 0, sticky = "W", padx = 40)
+	centerOfMass_check.grid(row = 5, column = 0, sticky = "W", padx = 40)
+
+	none_radio.grid(row = 1, column = 1, sticky = "W", padx = 40)
+	randomNoMomentum_radio.grid(row = 2, column = 1, sticky = "W", padx = 40)
+	circularOrbit_radio.grid(row = 7, column = 1, sticky = "W", padx = 40)
+	oscellation_radio.grid(row = 8, column = 1, sticky = "W", padx = 40)
+
+	randomNoMomentum_label.grid(row = 3, column = 1, sticky = "W", padx = 54)
+	randomNoMomentum_entry.grid(row = 4, column = 1)
+	seed_label.grid(row = 5, column = 1, sticky = "W", padx = 54)
+	seed_entry.grid(row = 6, column = 1)
+
+	display_label.grid(row = 0, column = 0)
+	presets_label.grid(row = 0, column = 1)
+
+	enter_button.grid(row = 9, column = 0, columnspan = 2)
+
+	root.mainloop()
+	return chosen["displayInfo"], chosen["presetVal"], int(chosen["numBodies"]), chosen["seed"]
 
 pygame.init()
 
-root = Tk()
-root.title("Orbit Preset")
-
-disabledColor, enabledColor = "#646464", "#000000"
-
-randomNoMomentum_numBodies = 120
-seedPreset = ""
+scenario = Scenario(args.scenario) if args.scenario is not None else None
+seedPreset = args.seed[:Seed.length]
+randomNoMomentum_numBodies = args.bodies
+presetVal = Simulation.NONE if args.preset is None else args.preset
 displayInfo = [False, False, False, False, False] # stores what should be drawn (vectors, gravity forces, etc.)
-presetVal = 0
-
-def enter():
-	global displayInfo
-	global presetVal
-	global randomNoMomentum_numBodies
-	global seedPreset
-	# display settings
-	displayInfo = [bool(vec_int.get()), bool(grav_int.get()), bool(aggGrav_int.get()), \
-	bool(trail_int.get()), bool(centerOfMass_int.get())]
-	presetVal = preset_int.get()
-	# handling entries
-	randomNoMomentum_numBodies = numBodies_str.get() if len(numBodies_str.get()) > 0 and \
-		int(numBodies_str.get()) >= 0 else randomNoMomentum_numBodies
-	seedPreset = seed_str.get() if len(seed_str.get()) <= 6 else seed_str.get()[:6]
-	root.destroy()
-def selectRadio():
-	stateUpdate = 'normal' if preset_int.get()==1 else 'disabled'
-	textUpdate = enabledColor if preset_int.get()==1 else disabledColor
-	randomNoMomentum_entry.config(state = stateUpdate)
-	seed_entry.config(state = stateUpdate)
-	randomNoMomentum_label.config(fg = textUpdate)
-	seed_label.config(fg = textUpdate)
-
-vec_int = IntVar()
-grav_int = IntVar()
-aggGrav_int = IntVar()
-trail_int = IntVar()
-centerOfMass_int = IntVar()
-
-preset_int = IntVar()
-numBodies_str = StringVar()
-seed_str = StringVar()
-
-vec_check = Checkbutton(root, text = 'Draw vectors', variable = vec_int)
-grav_check = Checkbutton(root, text = 'Draw gravity', variable = grav_int)
-aggGrav_check = Checkbutton(root, text = 'Draw net grav', variable = aggGrav_int)
-trail_check = Checkbutton(root, text = 'Draw trail', variable = trail_int)
-centerOfMass_check = Checkbutton(root, text = 'Draw center of mass', variable = centerOfMass_int)
-
-none_radio = Radiobutton(root, text = 'None', variable = preset_int, value = 0, command = selectRadio)
-randomNoMomentum_radio = Radiobutton(root, text = 'Random (0 Momentum)', variable = preset_int, value = 1, command = selectRadio)
-circularOrbit_radio = Radiobutton(root, text = 'Circular Orbit', variable = preset_int, value = 2, command = selectRadio)
-oscellation_radio = Radiobutton(root, text = 'Oscellation', variable = preset_int, value = 3, command = selectRadio)
-
-randomNoMomentum_entry = Entry(root, textvariable = numBodies_str, state = 'disabled')
-numBodies_str.set(str(randomNoMomentum_numBodies))
-seed_entry = Entry(root, textvariable = seed_str, state = 'disabled')
-
-display_label = Label(root, text = 'Display Settings')
-presets_label = Label(root, text = 'Presets')
-
-randomNoMomentum_label = Label(root, text = 'Number of bodies', fg = disabledColor)
-seed_label = Label(root, text = 'Seed', fg = disabledColor)
-
-enter_button = Button(root, text = "Enter", command = enter, padx = 70, pady = 10, borderwidth = 4)
-
-vec_check.grid(row = 1, column = 0, sticky = "W", padx = 40)
-grav_check.grid(row = 2, column = 0, sticky = "W", padx = 40)
-aggGrav_check.grid(row = 3, column = 0, sticky = "W", padx = 40)
-trail_check.grid(row = 4, column = 0, sticky = "W", padx = 40)
-centerOfMass_check.grid(row = 5, column = 0, sticky = "W", padx = 40)
-
-none_radio.grid(row = 1, column = 1, sticky = "W", padx = 40)
-randomNoMomentum_radio.grid(row = 2, column = 1, sticky = "W", padx = 40)
-circularOrbit_radio.grid(row = 7, column = 1, sticky = "W", padx = 40)
-oscellation_radio.grid(row = 8, column = 1, sticky = "W", padx = 40)
-
-randomNoMomentum_label.grid(row = 3, column = 1, sticky = "W", padx = 54)
-randomNoMomentum_entry.grid(row = 4, column = 1)
-seed_label.grid(row = 5, column = 1, sticky = "W", padx = 54)
-seed_entry.grid(row = 6, column = 1)
-
-display_label.grid(row = 0, column = 0)
-presets_label.grid(row = 0, column = 1)
-
-enter_button.grid(row = 9, column = 0, columnspan = 2)
-
-root.mainloop()
+if scenario is not None:
+	displayInfo = scenario.displayInfo()
+	seedPreset = args.seed[:Seed.length] or scenario.seed
+	Body.spf = scenario.units["spf"]
+if args.draw is not None:
+	displayInfo = [name in args.draw for name in Scenario.displayNames]
+
+# the preset dialog is only shown for new runs that were not given a preset or scenario
+# (a replay draws trails, and nothing else needs setting up)
+if args.replay is not None:
+	displayInfo[3] = True
+elif scenario is None and args.preset is None:
+	displayInfo, presetVal, randomNoMomentum_numBodies, seedPreset = askPreset()
 
 # variables
 screenWidth = 800
@@ -106,10 +155,9 @@ screenHeight = 800
 clock = pygame.time.Clock()
 
 fps = 60
-frame_count = 0
 
-seed = Seed(seedPreset)
-random.seed(seed.seed)
+replay = None if args.replay is None else Replay(Recording(args.replay), Body.max_trail_length if displayInfo[3] else 0)
+seed = Seed(seedPreset if replay is None else replay.recording.seed or "")
 
 game_font  = pygame.font.SysFont('calibri', 40, bold = True)
 frame_text_location = (10, 10)
@@ -117,6 +165,13 @@ mass_text_location = (10, 50)
 typedNum_text_location = (10, 90)
 seed_text_location = (550, 10)
 
+# 'p' shows the timings of each phase of a frame (p50, p95, p99 in ms over the last few seconds), and 'o' writes them out
+# nothing is timed while the overlay is hidden
+profiler = Profiler()
+profile_font = pygame.font.SysFont('consolas', 16)
+profile_text_location = (10, 130)
+profile_trace_path = "profile.csv"
+
 backUp = True
 numKeysUp = True
 rightArrowUp = True
@@ -134,56 +189,46 @@ screen = pygame.display.set_mode((screenWidth, screenHeight))
 background = pygame.Rect((0, 0), (screenWidth, screenHeight))
 background_color = pygame.Color(30, 30, 30)
 
-bodies = []
-
-# maxEvalSeed, maxEval = "", 0
-# secondEvalSeed, secondEval = "", 0
-# thirdEvalSeed, thirdEval = "", 0
-# def evaluateState(bodies):
-# 	maxBody = bodies[0]
-# 	for body in bodies:
-# 		if body.mass > maxBody.mass:
-# 			maxBody = body
-# 	value = 0
-# 	for body in bodies:
-# 		if body != maxBody:
-# 			dist = Body.findDisplayDistance(body.pos, maxBody.pos)
-# 			if(dist > 450):
-# 				continue
-# 			value += (2025**(-1))*dist**2-0.444*dist+100
-# 	return value
-
-# planet formation
-def generateRandomBodies(numBodies, massRange):
-	return [Body((random.randint(0, screenWidth), random.randint(0, screenHeight)),\
-		[0,0],\
-		random.randint(massRange[0], massRange[1]),\
-		screen,\
-		released = True,\
-		fixed = False) for _ in range(numBodies)]
-
-# PRESETS
-# random
-if presetVal == 1:
-	bodies = generateRandomBodies(int(randomNoMomentum_numBodies), (8*10**22, 4*10**23))
-# circular orbit (Earth and moon)
-elif presetVal == 2:
-	dist = 384.4
-	mass1, mass2 = 5.972*10**24, 7.3477*10**22
-	magnitude2 = math.sqrt((Body.G*(mass1+mass2))/(dist*Body.mpp))*mass2
-	pos1 = (400, 400)
-	pos2 = (pos1[0]+dist, pos1[1])
-	angle2 = Body.findRadianAngleFromCoords(pos1, pos2) + math.pi/2
-	bodies = [Body((400, 400), [0, 0], mass1, screen, released=True, fixed=True), \
-	Body((400+dist, 400), Body.findVectorFromMagnitudeAndAngle(magnitude2, angle2), mass2, screen, released = True, fixed = False)]
-# oscellation
-elif presetVal == 3:						
-	oscMass = 500 * 10**24
-	bodies = [Body((200, 400), [0, 0], oscMass, screen, released=True, fixed=True), \
-	Body((600, 400), [0, 0], oscMass, screen, released=True, fixed=True), \
-	Body((400, 100), [0, 0], 3 * 10**24, screen, released = True)]
-
-initialState = [ele for ele in bodies]
+# text surfaces are cached, the background and fixed bodies are only drawn again when they change,
+# and only the parts of the screen that were drawn on are sent to the display
+hud_text = TextCache(game_font)
+profile_text = TextCache(profile_font)
+static_layer = StaticLayer((screenWidth, screenHeight), background_color)
+dirty_rects = DirtyRects((screenWidth, screenHeight))
+
+# the simulation is stepped on its own thread, and is only changed through the commands posted to it
+# what is drawn is the latest snapshot it has published
+# when replaying, the snapshots come from the recording instead
+if replay is None:
+	sim = Simulation(seed, screen)
+	sim.recordTrails = displayInfo[3]
+	if scenario is not None:
+		sim.loadScenario(scenario)
+	else:
+		sim.loadPreset(presetVal, int(randomNoMomentum_numBodies))
+	if args.record is not None:
+		sim.recorder = Recorder(args.record, sim)
+		sim.recorder.record(sim)
+	if args.stream is not None:
+		sim.streamer = StreamServer(args.stream, format = args.stream_format, every = args.stream_every)
+	physics = PhysicsThread(sim, fps = fps)
+	physics.start()
+else:
+	physics = replay
+# while a body is being aimed, the path it would take is worked out on another thread and drawn once it is ready
+# a new path is asked for whenever the aim changes, or when the last one is done and the simulation has moved on
+preview = None
+if replay is None and args.preview_frames > 0:
+	preview = TrajectoryPreview(args.preview_frames)
+	preview.start()
+preview_aim = None # what the last path was asked for
+preview_frame = None # and the frame it was asked at
+max_steps_per_frame = 256 # the most the time warp ('[' and ']') can speed things up by
+
+leftArrowUp = True
+show_density = False # 'h' draws a heatmap of where the mass is instead of the bodies
+scrub_bar_height = 12 # pixels
+scrub_bar_color = pygame.Color(80, 80, 80)
 
 numberKeys = [pygame.K_0, pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4, pygame.K_5, pygame.K_6, pygame.K_7, \
 pygame.K_8, pygame.K_9] # needs to be in order 
@@ -199,8 +244,26 @@ launch_line_length_scaler = 300/Body.max_speed
 launch_line_info  = [] # color, start, end
 launch_line_width = 5
 
+# the body being held is kept out of the simulation until it is launched (bodies that have not been released do not interact anyway)
 def generateNewBody(pos, mass):
-	return Body(pos, [0, 0], mass, screen)
+	return Body(pos, [0, 0], mass, screen, system = BodySystem(1))
+
+# the momentum a held body is launched with when the mouse is let go at 'loc' (it goes the opposite way to the line)
+def findLaunchVec(body, loc):
+	# distance from the center of the body to the location that the mouse was released
+	launch_magnitude_raw = Body.findPhysicsDistance(body.pos, loc)
+	# getting the magnitude of the line
+	launch_magnitude = launch_magnitude_raw / launch_line_length_scaler
+	# getting the angle of the launch
+	launch_angle = math.radians((math.degrees(Body.findRadianAngleFromCoords(body.pos, loc)) + 180) % 360)
+	# assigning new dx and dy values to the body
+	new_dx, new_dy = launch_magnitude * math.cos(launch_angle), launch_magnitude * math.sin(launch_angle)
+	return [new_dx*body.mass, new_dy*body.mass]
+
+# adds the held body to the simulation with the given momentum
+def launchBody(body, vec):
+	pos, mass, fixed = body.pos, body.mass, body.fixed
+	physics.post(lambda sim: sim.addBody(pos, vec, mass, released = True, fixed = fixed))
 
 # made for clarity
 def numberKeyIsPressed(pressed):
@@ -210,12 +273,17 @@ def numberKeyIsPressed(pressed):
 def numberKeyPressed(pressed):
 	return [pressed[nKey] for nKey in numberKeys].index(True)
 
-# moves the camera a certain amount in the x and/or y directions
+# bodies and trails stay in world coordinates, and the camera is only applied when drawing
+camera = Camera(screenWidth, screenHeight)
+zoom_step = 1.1 # how much one notch of the scroll wheel zooms
+
+# moves the camera a certain amount in the x and/or y directions (in screen pixels)
 def moveCamera(dx=0, dy=0):
-	for body in bodies:
-		body.pos = (body.pos[0]-dx, body.pos[1]-dy)
-		for i in range(len(body.trailList)):
-			body.trailList[i] = (body.trailList[i][0]-dx, body.trailList[i][1]-dy)
+	camera.pan(dx, dy)
+
+# converts a position on the screen to a position in the world
+def screenToWorld(pos):
+	return tuple(camera.screenToWorld(pos).tolist())
 
 game_over = False
 
@@ -224,25 +292,42 @@ while not game_over:
 	for event in pygame.event.get():
 		if event.type == pygame.QUIT:
 			game_over = True
+		# zooming in and out around the mouse with the scroll wheel
+		if event.type == pygame.MOUSEWHEEL:
+			camera.zoomAt(zoom_step**event.y, pygame.mouse.get_pos())
+		# slowing down and speeding up the simulation (the number of steps taken per frame)
+		if event.type == pygame.KEYDOWN and event.key == pygame.K_LEFTBRACKET:
+			physics.stepsPerFrame = max(1, physics.stepsPerFrame//2)
+		if event.type == pygame.KEYDOWN and event.key == pygame.K_RIGHTBRACKET:
+			physics.stepsPerFrame = min(max_steps_per_frame, physics.stepsPerFrame*2)
+		if event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+			if Profiler.active is None:
+				profiler.start()
+			else:
+				profiler.stop()
+		if event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+			show_density = not show_density
+		if event.type == pygame.KEYDOWN and event.key == pygame.K_o:
+			print("Profile written to {}".format(profiler.write(profile_trace_path)))
 
 	pressed = pygame.key.get_pressed()
 
 	clock.tick(fps)
 
-	# drawing the background
-	screen.fill(background_color)
-
 	# exiting the game if escape is pressed
 	if pressed[pygame.K_ESCAPE]:
 		game_over = True
 
 	# clearing the screen if space is pressed
-	if pressed[pygame.K_SPACE]:
-		frame_count = 0
+	if pressed[pygame.K_SPACE] and replay is not None:
+		replay.seek(0)
+	elif pressed[pygame.K_SPACE]:
 		if pressed[pygame.K_LSHIFT] or pressed[pygame.K_RSHIFT]:
-			bodies.clear()
+			physics.post(Simulation.clear)
 		else:
-			bodies = [ele.reset() for ele in initialState]
+			physics.post(Simulation.reset)
+
+	snapshot = physics.latest()
 
 	# moving the camera with the 'w', 'a', 's', and 'd' keys
 	if pressed[pygame.K_w]:
@@ -266,13 +351,18 @@ while not game_over:
 	if pressed[pygame.K_d] and not pressed[pygame.K_w] and not pressed[pygame.K_s]:
 		moveCamera(dx=camera_speed)
 
+	# drawing the background and the fixed bodies
+	if static_layer.update(camera, snapshot.system, snapshot.system.liveRows()):
+		dirty_rects.invalidate()
+	static_layer.draw(screen, dirty_rects.stale())
+
 	# drawing the center of mass
-	if displayInfo[4] and len(bodies) > 0:
-		Body.drawCenterOfMass(bodies, screen)
+	if displayInfo[4]:
+		dirty_rects.add(Renderer.drawCenterOfMass(screen, camera, snapshot.system, snapshot.system.liveRows()))
 
 	# creating a new body
-	if event.type == pygame.MOUSEBUTTONDOWN and backUp: # fATgWvCQY@3r.if
-		click_loc = pygame.mouse.get_pos()
+	if event.type == pygame.MOUSEBUTTONDOWN and backUp and replay is None: # fATgWvCQY@3r.if
+		click_loc = screenToWorld(pygame.mouse.get_pos())
 		if pygame.mouse.get_pressed()[2]:
 			newMass = rightClickBodyMass
 		else:
@@ -281,12 +371,11 @@ while not game_over:
 		newBody = generateNewBody(click_loc, newMass)
 		# making the new generated body 'fixed' if shift is pressed
 		newBody.fixed = pressed[pygame.K_LSHIFT] or pressed[pygame.K_RSHIFT]
-		bodies.append(newBody)
+		heldBody = newBody
 		backUp = False
 
 	# displaying the magnitude indicator line and listening for keypresses related to generating bodies
 	if not backUp:
-		heldBody = bodies[-1]
 		newMass = heldBody.mass
 		# allowing the user to type in a mass for a body while it is held
 		if numKeysUp and numberKeyIsPressed(pressed):
@@ -306,16 +395,14 @@ while not game_over:
 			heldBody.setMass(newMass)
 		# displaying the mass of the held body
 		mass_label_text = "Mass: {} * 10^{} kg".format(prospectiveMass/(10**math.floor(math.log(prospectiveMass, 10))), math.floor(math.log(prospectiveMass, 10)))
-		mass_label = game_font.render(mass_label_text, 1, WHITE)
-		screen.blit(mass_label, mass_text_location)
+		dirty_rects.add(hud_text.draw(screen, mass_label_text, mass_text_location, WHITE))
 		# displaying number that is currently being typed ('typedNum')
 		if not typedNum == "":
 			typedNum_label_text = "Typed: {} * 10^{} kg".format(typedNum, baseDegreeOfMagnitude)
-			typedNum_label = game_font.render(typedNum_label_text, 1, WHITE)
-			screen.blit(typedNum_label, typedNum_text_location)
+			dirty_rects.add(hud_text.draw(screen, typedNum_label_text, typedNum_text_location, WHITE))
 
 		# getting the location of the mouse
-		held_loc = pygame.mouse.get_pos()
+		held_loc = screenToWorld(pygame.mouse.get_pos())
 		exaggerated_max_speed = Body.max_speed * launch_line_length_scaler
 		# distance from the mouse position to the center of the body
 		held_distance = Body.findDisplayDistance(heldBody.pos, held_loc)
@@ -328,86 +415,111 @@ while not game_over:
 			held_distance = exaggerated_max_speed
 		launch_line_info = [pygame.Color(255, int(255 - (held_distance / exaggerated_max_speed * 255)), 0), heldBody.pos, held_loc]
 
+		# asking for the path the body would take (fixed bodies do not go anywhere)
+		if preview is not None and not heldBody.fixed:
+			aim = (heldBody.pos, held_loc, heldBody.mass)
+			if aim != preview_aim or (preview.finished() and snapshot.frame != preview_frame):
+				preview.predict(snapshot.system, heldBody.pos, findLaunchVec(heldBody, held_loc), heldBody.mass, heldBody.displayRad)
+				preview_aim, preview_frame = aim, snapshot.frame
+
 	if not numberKeyIsPressed(pressed):
 		numKeysUp = True
 
 	# launching the body
 	if event.type == pygame.MOUSEBUTTONUP and not backUp:
-		heldBody = bodies[-1]
-		# distance from the center of the body to the location that the mouse was released
-		launch_magnitude_raw = Body.findPhysicsDistance(heldBody.pos, held_loc)
-		# getting the magnitude of the line
-		launch_magnitude = launch_magnitude_raw / launch_line_length_scaler
-		# getting the angle of the launch
-		launch_angle = math.radians((math.degrees(Body.findRadianAngleFromCoords(heldBody.pos, held_loc)) + 180) % 360)
-		# assigning new dx and dy values to the body
-		new_dx, new_dy = launch_magnitude * math.cos(launch_angle), launch_magnitude * math.sin(launch_angle)
-		heldBody.vec = [new_dx*heldBody.mass, new_dy*heldBody.mass]
-		heldBody.released = True
+		launchBody(heldBody, findLaunchVec(heldBody, held_loc))
 		backUp = True
 		typedNum = ""
 		launch_line_info = []
+		if preview is not None:
+			preview.cancel()
+			preview_aim = None
 
 	# tab button is not pressed, pause the game
 	# if the right arrow is tapped while paused, advance one frame
 	if pressed[pygame.K_TAB] and not (pressed[pygame.K_RIGHT] and rightArrowUp):
+		physics.paused = True
 		if not pressed[pygame.K_RIGHT]:
 			rightArrowUp = True
 	else:
-		frame_count += 1
-		# moving the bodies 
-		for body in bodies:
-			body.update()
-
-		Body.checkForBodyCollision(bodies)
-		Body.applyGravity(bodies)
+		if pressed[pygame.K_TAB] and replay is not None:
+			replay.seek(replay.position + 1)
+		elif pressed[pygame.K_TAB]:
+			physics.post(Simulation.step)
+		physics.paused = pressed[pygame.K_TAB]
 
 		rightArrowUp = False
 
-	# drawing the balls
-	for b in bodies:
-		b.draw(drawVec = displayInfo[0], drawGrav = displayInfo[1], drawAgg = displayInfo[2], drawTrail = displayInfo[3])	
+	# when replaying, tab + left arrow goes back a frame, and holding the mouse down on the bar at the bottom scrubs through the recording
+	if replay is not None:
+		if pressed[pygame.K_TAB] and pressed[pygame.K_LEFT] and leftArrowUp:
+			replay.seek(replay.position - 1)
+		leftArrowUp = not pressed[pygame.K_LEFT]
+		mouse_x, mouse_y = pygame.mouse.get_pos()
+		if pygame.mouse.get_pressed()[0] and mouse_y >= screenHeight - scrub_bar_height:
+			replay.seek(round(mouse_x/screenWidth*(replay.recording.frameCount() - 1)))
+		replay.advance()
+
+	# drawing the balls (only the ones on screen)
+	with Profiler.phase("draw"):
+		if show_density:
+			dirty_rects.add(Renderer.drawDensity(screen, camera, snapshot.system, snapshot.system.liveRows()))
+		else:
+			dirty_rects.add(Renderer.drawBodies(screen, camera, snapshot.system, snapshot.system.liveRows(), drawVec = displayInfo[0], \
+				drawGrav = displayInfo[1], drawAgg = displayInfo[2], drawTrail = displayInfo[3], skipFixed = True))
+
+	# drawing how far through the recording the replay is
+	if replay is not None:
+		scrub_fraction = replay.position/max(replay.recording.frameCount() - 1, 1)
+		dirty_rects.add(pygame.draw.rect(screen, scrub_bar_color, (0, screenHeight - scrub_bar_height, screenWidth, scrub_bar_height)))
+		pygame.draw.rect(screen, WHITE, (0, screenHeight - scrub_bar_height, screenWidth*scrub_fraction, scrub_bar_height))
+
+	# drawing the predicted path of the held body
+	if not backUp and preview is not None and not heldBody.fixed:
+		preview_path = preview.latest()
+		if preview_path is not None:
+			dirty_rects.add(Renderer.drawPath(screen, camera, TrajectoryPreview.color, preview_path.points))
+			# too many bodies to move along with it, so the path is only right for a short while
+			if not preview_path.moving:
+				note_location = (camera.worldToScreen(heldBody.pos) + heldBody.displayRad*camera.zoom + 6).tolist()
+				dirty_rects.add(profile_text.draw(screen, "other bodies held still", note_location, TrajectoryPreview.color))
+
+	# drawing the held body
+	if not backUp:
+		dirty_rects.add(pygame.draw.circle(screen, Body.fixedColor if heldBody.fixed else Body.color, camera.worldToScreen(heldBody.pos).tolist(), \
+			heldBody.displayRad*camera.zoom))
 
 	# drawing the magnitude indicator line
 	# multiplying Body.max_speed by 7.5 shows how fast a body would travel in 0.25 seconds as opposed to 1 frame, as this is easier to see when dragging the line
 	if not backUp:
-		pygame.draw.line(screen, launch_line_info[0], launch_line_info[1], launch_line_info[2], launch_line_width)
-
-	# if frame_count >= 500 and len(bodies) > 0:
-	# 	evaluation = evaluateState(bodies)
-	# 	print(evaluation)
-	# 	if evaluation > maxEval:
-	# 		thirdEval = secondEval
-	# 		thirdEvalSeed = secondEvalSeed
-	# 		secondEval = maxEval
-	# 		secondEvalSeed = maxEvalSeed
-	# 		maxEval = evaluation
-	# 		maxEvalSeed = seed.raw
-	# 	elif evaluation > secondEval:
-	# 		thirdEval = secondEval
-	# 		thirdEvalSeed = secondEvalSeed
-	# 		secondEval = evaluation 
-	# 		secondEvalSeed = seed.raw
-	# 	elif evaluation > thirdEval:
-	# 		thirdEval = evaluation
-	# 		thirdEvalSeed = seed.raw
-	# 	print(seed.raw)
-	# 	seed = Seed(Seed.generateRandom())
-	# 	print("Max: {} {}".format(maxEvalSeed, maxEval))
-	# 	print("2nd: {} {}".format(secondEvalSeed, secondEval))
-	# 	print("3rd: {} {}\n***".format(thirdEvalSeed, thirdEval))
-	# 	bodies.clear()
-	# 	random.seed(seed.seed)
-	# 	bodies = generateRandomBodies(int(randomNoMomentum_numBodies), (8*10**22, 4*10**23))
-	# 	frame_count = 0
-
-	frame_label_text = "Frame: {}".format(frame_count)
-	frame_label = game_font.render(frame_label_text, 1, WHITE)
-	screen.blit(frame_label, frame_text_location)
-
-	seed_label_text = "Seed: {}".format(seed.raw)
-	seed_label = game_font.render(seed_label_text, 1, WHITE)
-	screen.blit(seed_label, seed_text_location)
-
-	pygame.display.update()
-	pygame.display.flip()
+		launch_start = camera.worldToScreen(launch_line_info[1]).tolist()
+		launch_end = camera.worldToScreen(launch_line_info[2]).tolist()
+		dirty_rects.add(pygame.draw.line(screen, launch_line_info[0], launch_start, launch_end, launch_line_width))
+
+	with Profiler.phase("font"):
+		frame_label_text = "Frame: {}".format(snapshot.frame) if physics.stepsPerFrame == 1 else \
+			"Frame: {} (x{})".format(snapshot.frame, physics.stepsPerFrame)
+		dirty_rects.add(hud_text.drawGlyphs(screen, frame_label_text, frame_text_location, WHITE))
+
+		seed_label_text = "Seed: {}".format(seed.raw)
+		dirty_rects.add(hud_text.draw(screen, seed_label_text, seed_text_location, WHITE))
+
+		if Profiler.active is profiler:
+			for i, line in enumerate(profiler.overlayLines()):
+				dirty_rects.add(profile_text.drawGlyphs(screen, line, (profile_text_location[0], profile_text_location[1] + 18*i), WHITE))
+
+	with Profiler.phase("flip"):
+		dirty_rects.update()
+
+	if Profiler.active is profiler:
+		profiler.endFrame(snapshot.system.count)
+
+if preview is not None:
+	preview.stop()
+if replay is None:
+	physics.stop()
+	physics.join()
+	if sim.recorder is not None:
+		sim.recorder.close()
+	if sim.streamer is not None:
+		sim.streamer.close()
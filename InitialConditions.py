@@ -0,0 +1,127 @@
+# agent
+# 10/18/2026
+
+import math
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from Body import Body
+from Seed import Seed
+
+# Vectorized generators of starting bodies for large runs, each making the positions, momenta and masses of all of its bodies as arrays
+# Random numbers come from NumPy Generators seeded from a Seed, with a separate stream for each generator and for each chunk of
+# 'chunkSize' bodies, so the chunks can be made in any order (or at the same time on several threads) and the bodies come out the same
+# Lengths are in pixels, masses in kg and speeds in m/s (the momenta returned are mass * velocity, like BodySystem.vec)
+class InitialConditions:
+	chunkSize = 1 << 16
+	massRange = (8*10**22, 4*10**23) # the same as the random preset's
+
+	# The generator of random numbers for one chunk of bodies of a generator
+	@staticmethod
+	def rng(seed, name, chunk):
+		seed = seed if isinstance(seed, Seed) else Seed(seed)
+		return np.random.default_rng(np.random.SeedSequence(seed.seed, spawn_key = (zlib.crc32(name.encode()), chunk)))
+
+	# Makes 'count' bodies with the named generator (box, disk, plummer or rings), returning (pos, vec, mass) arrays
+	# params are passed on to the generator, and with workers above 1 the chunks are made on that many threads
+	@staticmethod
+	def generate(name, seed, count, workers = None, **params):
+		generator = getattr(InitialConditions, name)
+		seed = seed if isinstance(seed, Seed) else Seed(seed)
+		chunks = [(k, start, min(InitialConditions.chunkSize, count - start)) for k, start in enumerate(range(0, count, InitialConditions.chunkSize))]
+		make = lambda chunk: generator(InitialConditions.rng(seed, name, chunk[0]), chunk[1], chunk[2], count, **params)
+		if workers is not None and workers > 1 and len(chunks) > 1:
+			with ThreadPoolExecutor(workers) as pool:
+				parts = list(pool.map(make, chunks))
+		else:
+			parts = [make(chunk) for chunk in chunks]
+		if len(parts) == 0:
+			return np.zeros((0, 2)), np.zeros((0, 2)), np.zeros(0)
+		return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+	# The masses of a chunk, spread evenly over massRange
+	@staticmethod
+	def masses(rng, count, massRange):
+		return rng.uniform(massRange[0], massRange[1], count)
+
+	# Puts a body of mass centralMass sitting still at center before the first chunk's bodies (when centralMass is above 0)
+	@staticmethod
+	def withCentralBody(start, center, centralMass, pos, vec, mass):
+		if start != 0 or centralMass <= 0:
+			return pos, vec, mass
+		return np.concatenate(([center], pos)).astype(float), np.concatenate((np.zeros((1, 2)), vec)), np.concatenate(([centralMass], mass))
+
+	# Bodies spread evenly over a box, moving in random directions at up to maxSpeed (still by default, like the random preset)
+	@staticmethod
+	def box(rng, start, count, total, center = (400, 400), size = (800, 800), massRange = None, maxSpeed = 0):
+		massRange = InitialConditions.massRange if massRange is None else massRange
+		pos = np.asarray(center, dtype = float) + (rng.random((count, 2)) - 0.5)*np.asarray(size, dtype = float)
+		mass = InitialConditions.masses(rng, count, massRange)
+		angle = rng.uniform(0, 2*math.pi, count)
+		speed = rng.uniform(0, maxSpeed, count)
+		vec = np.stack((np.cos(angle), np.sin(angle)), axis = 1)*(speed*mass)[:, None]
+		return pos, vec, mass
+
+	# A disk with surface density falling off as exp(-r/scaleLength), every body on a circular orbit (counterclockwise)
+	# The orbits are worked out from the mass inside them (treated as if it were all at the center), including any centralMass
+	@staticmethod
+	def disk(rng, start, count, total, center = (400, 400), scaleLength = 100, massRange = None, centralMass = 0):
+		massRange = InitialConditions.massRange if massRange is None else massRange
+		# r*exp(-r/h) is a gamma distribution with shape 2
+		r = rng.gamma(2, scaleLength, count)
+		angle = rng.uniform(0, 2*math.pi, count)
+		mass = InitialConditions.masses(rng, count, massRange)
+		x = r/scaleLength
+		inside = centralMass + total*(massRange[0] + massRange[1])/2*(1 - (1 + x)*np.exp(-x))
+		speed = np.sqrt(Body.G*inside/np.maximum(r*Body.mpp, 1))
+		direction = np.stack((np.cos(angle), np.sin(angle)), axis = 1)
+		pos = np.asarray(center, dtype = float) + direction*r[:, None]
+		vec = np.stack((-direction[:, 1], direction[:, 0]), axis = 1)*(speed*mass)[:, None]
+		return InitialConditions.withCentralBody(start, center, centralMass, pos, vec, mass)
+
+	# A Plummer sphere (cut off at maxRadius scale radii), with its speeds drawn from its distribution function,
+	# seen from above (the sphere's positions and velocities are projected onto the screen)
+	@staticmethod
+	def plummer(rng, start, count, total, center = (400, 400), scaleRadius = 100, massRange = None, maxRadius = 10):
+		massRange = InitialConditions.massRange if massRange is None else massRange
+		totalMass = total*(massRange[0] + massRange[1])/2
+		# the radius that encloses a uniformly drawn fraction of the mass
+		maxFraction = (maxRadius**2/(maxRadius**2 + 1))**1.5
+		fraction = rng.uniform(0, maxFraction, count)
+		r = scaleRadius/np.sqrt(np.maximum(fraction, 1e-300)**(-2/3) - 1)
+		pos = np.asarray(center, dtype = float) + InitialConditions.isotropic(rng, count)*r[:, None]
+		# speeds as a fraction q of the escape speed, drawn from g(q) = q^2 (1 - q^2)^3.5 by rejection (Aarseth, Henon and Wielen)
+		q = np.zeros(count)
+		remaining = np.arange(count)
+		while len(remaining) > 0:
+			x, y = rng.random(len(remaining)), rng.uniform(0, 0.1, len(remaining))
+			accepted = y < x*x*(1 - x*x)**3.5
+			q[remaining[accepted]] = x[accepted]
+			remaining = remaining[~accepted]
+		escape = np.sqrt(2*Body.G*totalMass/(scaleRadius*Body.mpp))*(1 + (r/scaleRadius)**2)**-0.25
+		mass = InitialConditions.masses(rng, count, massRange)
+		vec = InitialConditions.isotropic(rng, count)*(q*escape*mass)[:, None]
+		return pos, vec, mass
+
+	# Debris on circular orbits in rings around a central mass, the bodies taking turns between the rings
+	# Each body is spread out from its ring's radius by a normal distribution 'width' wide
+	@staticmethod
+	def rings(rng, start, count, total, center = (400, 400), radii = (150, 250, 350), width = 6, massRange = None, centralMass = 5.972*10**24):
+		massRange = InitialConditions.massRange if massRange is None else massRange
+		ring = np.arange(start, start + count) % len(radii)
+		r = np.maximum(np.asarray(radii, dtype = float)[ring] + rng.normal(0, width, count), 1)
+		angle = rng.uniform(0, 2*math.pi, count)
+		mass = InitialConditions.masses(rng, count, massRange)
+		speed = np.sqrt(Body.G*centralMass/(r*Body.mpp))
+		direction = np.stack((np.cos(angle), np.sin(angle)), axis = 1)
+		pos = np.asarray(center, dtype = float) + direction*r[:, None]
+		vec = np.stack((-direction[:, 1], direction[:, 0]), axis = 1)*(speed*mass)[:, None]
+		return InitialConditions.withCentralBody(start, center, centralMass, pos, vec, mass)
+
+	# The x and y of directions drawn evenly over a sphere (so their length is the cosine of the angle out of the screen)
+	@staticmethod
+	def isotropic(rng, count):
+		z = rng.uniform(-1, 1, count)
+		angle = rng.uniform(0, 2*math.pi, count)
+		across = np.sqrt(1 - z*z)
+		return np.stack((across*np.cos(angle), across*np.sin(angle)), axis = 1)
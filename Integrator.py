@@ -0,0 +1,298 @@
+# agent
+# 10/18/2026
+
+import math
+import numpy as np
+from Body import Body
+
+# Moves the bodies of a Simulation forward by one frame (Body.spf seconds)
+# Positions are in pixels and momenta in kg*m/s like everywhere else, so velocities (pixels/s) are vec/(mass*mpp)
+# Collisions are handled once per frame, after the bodies have been moved
+class Integrator:
+	name = None
+	order = 1
+	maxSubsteps = 1000
+	stateFields = () # attributes carried from one frame to the next, which are saved in checkpoints
+
+	# tolerance is the error allowed per frame: with it a frame is split into as many substeps as it needs,
+	# and without it (None) every frame is a single step
+	def __init__(self, tolerance = None):
+		self.tolerance = tolerance
+		self.substepsTaken = 0 # substeps taken during the last frame
+
+	# Returns an integrator from its name ("euler", "leapfrog", "yoshida", "rk45", ...)
+	@staticmethod
+	def named(name, tolerance = None):
+		for cls in Integrator.__subclasses__():
+			if cls.name == name:
+				return cls(tolerance)
+		raise ValueError("Unknown integrator: {}".format(name))
+
+	# What is needed to make an integrator that carries on exactly like this one
+	def getState(self):
+		state = {"name": self.name, "tolerance": self.tolerance}
+		for field in self.stateFields:
+			value = getattr(self, field)
+			state[field] = value.copy() if isinstance(value, np.ndarray) else value
+		return state
+
+	# Makes an integrator from a getState
+	@staticmethod
+	def fromState(state):
+		integrator = Integrator.named(state["name"], state["tolerance"])
+		for field in integrator.stateFields:
+			if field in state:
+				value = state[field]
+				setattr(integrator, field, value.copy() if isinstance(value, np.ndarray) else value)
+		return integrator
+
+	def step(self, sim):
+		system = sim.system
+		rows = system.liveRows()
+		self.advance(system, rows, Body.spf)
+		sim.collide()
+
+	# Moves the given rows forward by dt seconds, splitting it into substeps to meet the tolerance
+	# Fixed bodies (and bodies that have not been released) have no acceleration and no momentum, so they stay put
+	def advance(self, system, rows, dt):
+		system.vec[rows[system.fixed[rows]]] = 0
+		n = 1 if self.tolerance is None else self.findSubsteps(system, rows, self.accelerations(system, rows), dt)
+		for _ in range(n):
+			self.substep(system, rows, dt/n)
+		self.substepsTaken = n
+
+	# One substep of length dt (implemented by each integrator)
+	def substep(self, system, rows, dt):
+		raise NotImplementedError
+
+	# Accelerations (pixels/s^2) of the given rows, reusing the last ones when nothing has changed since
+	def accelerations(self, system, rows):
+		if system.accValid:
+			return system.acc[rows]
+		return Body.findSystemAccelerations(system, rows)
+
+	# How many substeps a frame needs for the tolerance
+	# Each body's timescale is how long it takes for its acceleration to change its speed significantly
+	# (|v|/|a|, plus the time to fall across its own radius so that bodies at rest still get one),
+	# and an order p method needs steps of about tolerance^(1/p) of the shortest timescale
+	def findSubsteps(self, system, rows, acc, dt):
+		if self.tolerance is None or len(rows) == 0:
+			return 1
+		a = np.sqrt((acc**2).sum(axis = 1))
+		pulled = a > 0
+		if not pulled.any():
+			return 1
+		rows, a = rows[pulled], a[pulled]
+		v = np.sqrt((system.vec[rows]**2).sum(axis = 1))/(system.mass[rows]*Body.mpp)
+		timescale = (v + np.sqrt(a*system.displayRad[rows]))/a
+		maxStep = self.tolerance**(1/self.order) * timescale.min()
+		return int(min(max(1, math.ceil(dt/maxStep)), self.maxSubsteps))
+
+	@staticmethod
+	def drift(system, rows, dt):
+		system.pos[rows] += system.vec[rows]/(system.mass[rows, None]*Body.mpp)*dt
+		system.accValid = False
+
+	@staticmethod
+	def kick(system, rows, acc, dt):
+		system.vec[rows] += acc*(system.mass[rows, None]*Body.mpp*dt)
+
+# The original scheme: move every body, handle collisions, then apply a frame of gravity
+# (the gravity is applied after the positions move, so this is a semi-implicit/symplectic Euler step)
+class Euler(Integrator):
+	name = "euler"
+
+	def step(self, sim):
+		system = sim.system
+		rows = system.liveRows()
+		Body.updateSystem(system, rows)
+		system.accValid = False
+		sim.collide()
+		rows = system.liveRows()
+		system.grav[rows] = 0
+		Body.applySystemGravity(system, rows[system.released[rows]])
+		self.substepsTaken = 1
+
+# Leapfrog (kick-drift-kick, which is the same as velocity Verlet)
+# Time-reversible and symplectic, so orbits stay closed with much larger steps than Euler
+class Leapfrog(Integrator):
+	name = "leapfrog"
+	order = 2
+
+	def substep(self, system, rows, dt):
+		Integrator.kick(system, rows, self.accelerations(system, rows), dt/2)
+		Integrator.drift(system, rows, dt)
+		Integrator.kick(system, rows, self.accelerations(system, rows), dt/2)
+
+# Yoshida's 4th order composition of three leapfrog steps
+class Yoshida(Integrator):
+	name = "yoshida"
+	order = 4
+	w1 = 1/(2 - 2**(1/3))
+	w0 = -2**(1/3)/(2 - 2**(1/3))
+	driftWeights = (w1/2, (w0 + w1)/2, (w0 + w1)/2, w1/2)
+	kickWeights = (w1, w0, w1)
+
+	def substep(self, system, rows, dt):
+		for i in range(3):
+			Integrator.drift(system, rows, Yoshida.driftWeights[i]*dt)
+			Integrator.kick(system, rows, self.accelerations(system, rows), Yoshida.kickWeights[i]*dt)
+		Integrator.drift(system, rows, Yoshida.driftWeights[3]*dt)
+
+# Dormand-Prince 5(4) with adaptive steps
+# The step size is kept between frames and adjusted so that the estimated error of each step stays within the tolerance
+class RK45(Integrator):
+	name = "rk45"
+	order = 5
+	defaultTolerance = 1e-8
+	safety = 0.9
+	c = (0, 1/5, 3/10, 4/5, 8/9, 1, 1)
+	a = ((), (1/5,), (3/40, 9/40), (44/45, -56/15, 32/9), (19372/6561, -25360/2187, 64448/6561, -212/729), \
+		(9017/3168, -355/33, 46732/5247, 49/176, -5103/18656), (35/384, 0, 500/1113, 125/192, -2187/6784, 11/84))
+	b = (35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0)
+	bStar = (5179/57600, 0, 7571/16695, 393/640, -92097/339200, 187/2100, 1/40)
+	stateFields = ("h",)
+
+	def __init__(self, tolerance = None):
+		Integrator.__init__(self, RK45.defaultTolerance if tolerance is None else tolerance)
+		self.h = None # the current step size (seconds)
+
+	# The state is the positions and velocities of the moving bodies, and the derivative is their velocities and accelerations
+	def derivative(self, system, rows, moving, position, pos, vel):
+		system.pos[moving] = pos
+		system.accValid = False
+		acc = self.accelerations(system, rows)[position]
+		return vel, acc
+
+	def advance(self, system, rows, dt):
+		system.vec[rows[system.fixed[rows]]] = 0
+		moving = rows[~system.fixed[rows]]
+		position = np.isin(rows, moving)
+		mass = system.mass[moving, None]
+		pos = system.pos[moving].copy()
+		vel = system.vec[moving]/(mass*Body.mpp)
+		h = dt if self.h is None else min(self.h, dt)
+		t, taken = 0.0, 0
+		while t < dt and taken < self.maxSubsteps:
+			h = min(h, dt - t)
+			kPos, kVel = [], []
+			for stage in range(7):
+				p = pos + h*sum(w*k for w, k in zip(RK45.a[stage], kPos)) if stage > 0 else pos
+				v = vel + h*sum(w*k for w, k in zip(RK45.a[stage], kVel)) if stage > 0 else vel
+				dp, dv = self.derivative(system, rows, moving, position, p, v)
+				kPos.append(dp)
+				kVel.append(dv)
+			newPos = pos + h*sum(w*k for w, k in zip(RK45.b, kPos))
+			newVel = vel + h*sum(w*k for w, k in zip(RK45.b, kVel))
+			errPos = h*sum((w - ws)*k for w, ws, k in zip(RK45.b, RK45.bStar, kPos))
+			errVel = h*sum((w - ws)*k for w, ws, k in zip(RK45.b, RK45.bStar, kVel))
+			# error relative to the size of each component and how much it changes over the step
+			scalePos = self.tolerance*(np.abs(pos) + np.abs(h*kPos[0])) + 1e-300
+			scaleVel = self.tolerance*(np.abs(vel) + np.abs(h*kVel[0])) + 1e-300
+			err = max(np.abs(errPos/scalePos).max(initial = 0), np.abs(errVel/scaleVel).max(initial = 0))
+			if err <= 1:
+				t += h
+				pos, vel = newPos, newVel
+				taken += 1
+			h *= min(5, max(0.2, RK45.safety*(err if err > 0 else 1e-10)**(-1/RK45.order)))
+		self.h = h
+		system.pos[moving] = pos
+		system.vec[moving] = vel*mass*Body.mpp
+		system.accValid = False
+		self.substepsTaken = taken
+
+# Hierarchical (block) timesteps
+# Each body steps with its own timestep, Body.spf/2^level, picked from how quickly its acceleration is changing
+# (|a|/|jerk|, with the jerk estimated from its last two accelerations)
+# On each substep only the bodies whose step ends there are "active": the rest are predicted to that time from their last state,
+# and forces are only found for the active bodies, so the cost follows the number of fast bodies rather than all of them
+# Every body is back in sync at the end of each frame
+class BlockTimestep(Integrator):
+	name = "block"
+	order = 2
+	maxLevel = 10 # the finest timestep is Body.spf/2^maxLevel
+	defaultTolerance = 1e-2
+	stateFields = ("lastRows", "lastJerk", "levelCounts")
+
+	def __init__(self, tolerance = None):
+		Integrator.__init__(self, BlockTimestep.defaultTolerance if tolerance is None else tolerance)
+		self.lastRows = None # the rows the jerk was found for
+		self.lastJerk = None
+		self.levelCounts = np.zeros(BlockTimestep.maxLevel+1, dtype = np.intp) # number of bodies on each level at the end of the last frame
+		self.forceEvaluations = 0 # number of single-body force evaluations during the last frame
+
+	# The level (0 to maxLevel) each body needs for its timescale
+	def findLevels(self, dt, acc, jerk, vel, rad):
+		a = np.sqrt((acc**2).sum(axis = 1))
+		timescale = np.full(len(a), np.inf)
+		pulled = a > 0
+		v = np.sqrt((vel**2).sum(axis = 1))
+		timescale[pulled] = (v[pulled] + np.sqrt(a[pulled]*rad[pulled]))/a[pulled]
+		if jerk is not None:
+			j = np.sqrt((jerk**2).sum(axis = 1))
+			known = pulled & (j > 0)
+			timescale[known] = a[known]/j[known]
+		wanted = dt/(self.tolerance**(1/self.order)*timescale)
+		levels = np.zeros(len(a), dtype = np.intp)
+		finer = wanted > 1
+		levels[finer] = np.ceil(np.log2(wanted[finer]))
+		return np.clip(levels, 0, BlockTimestep.maxLevel)
+
+	def advance(self, system, rows, dt):
+		system.vec[rows[system.fixed[rows]]] = 0
+		released = system.released[rows]
+		acc = self.accelerations(system, rows)[released]
+		# the jerk is kept for every live row, but only the released ones are stepped
+		jerk = self.lastJerk[released] if system.accValid and self.lastRows is not None and np.array_equal(self.lastRows, rows) else None
+		rows = rows[released]
+		moving = ~system.fixed[rows]
+		mass = system.mass[rows]
+		pos = system.pos[rows].copy()
+		vel = system.vec[rows]/(mass[:, None]*Body.mpp)
+		if jerk is None:
+			jerk = np.zeros_like(acc)
+			levels = self.findLevels(dt, acc, None, vel, system.displayRad[rows])
+		else:
+			levels = self.findLevels(dt, acc, jerk, vel, system.displayRad[rows])
+		levels[~moving] = 0
+		# time is counted in ticks of the finest timestep
+		L = BlockTimestep.maxLevel
+		ticks = 1 << L
+		tick = dt/ticks
+		last = np.zeros(len(rows), dtype = np.int64)
+		self.forceEvaluations = 0
+		substeps = 0
+		while moving.any():
+			following = last + (1 << (L - levels))
+			t = following[moving].min()
+			active = np.flatnonzero(moving & (following == t))
+			# predicting every body to the current time
+			h = ((t - last)*tick)[:, None]
+			predicted = pos + vel*h + 0.5*acc*h**2
+			newAcc = Body.findSystemSums(system, rows, predicted, active) * (Body.G / Body.mpp**3)
+			h = h[active]
+			vel[active] += 0.5*(acc[active] + newAcc)*h
+			pos[active] = predicted[active]
+			jerk[active] = (newAcc - acc[active])/h
+			acc[active] = newAcc
+			last[active] = t
+			self.forceEvaluations += len(active)
+			substeps += 1
+			if t == ticks:
+				break
+			# a body can always move to a finer level, but only to a coarser one when the current time is on that level's grid
+			wanted = self.findLevels(dt, newAcc, jerk[active], vel[active], system.displayRad[rows[active]])
+			coarsest = L - (int(t) & -int(t)).bit_length() + 1
+			levels[active] = np.where(wanted < levels[active], np.maximum(wanted, coarsest), wanted)
+		system.pos[rows] = pos
+		system.vec[rows[moving]] = vel[moving]*(mass[moving, None]*Body.mpp)
+		# every body finished on the last tick, so the accelerations match the new positions
+		system.acc[rows] = acc
+		system.grav[rows] = acc*(mass*Body.mpp*Body.spf)[:, None]
+		system.gravSources = rows
+		system.accValid = True
+		self.lastRows = system.liveRows()
+		self.lastJerk = np.zeros((len(self.lastRows), 2))
+		self.lastJerk[system.released[self.lastRows]] = jerk
+		self.levelCounts = np.bincount(levels, minlength = L+1)
+		self.substepsTaken = substeps
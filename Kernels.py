@@ -0,0 +1,152 @@
+# agent
+# 10/18/2026
+
+import warnings
+import numpy as np
+
+# numba is optional: without it (or when backend is "numpy") everything runs on the NumPy versions
+try:
+	import numba
+except ImportError:
+	numba = None
+
+# Compiled versions of the hottest loops (the pairwise gravity sum and the collision test), used in place of the NumPy versions
+# when numba is installed
+# The gravity loop runs in parallel over the targets and keeps its sums in registers, so it needs no (targets x sources) temporaries
+# The first time they are needed they are compiled (and cached on disk by numba) and checked against the NumPy versions,
+# and if they do not agree they are turned off with a warning
+class Kernels:
+	backend = "auto" # "auto" uses the compiled kernels when numba is installed, "numpy" never does
+	checked = None # None before the self check, then whether it passed
+	tolerance = 1e-9 # largest relative difference from the NumPy gravity sum allowed by the self check
+	reducedTolerance = 1e-4 # the same for the float32 gravity sum (which is checked against the float64 one)
+
+	# Whether the compiled kernels should be used
+	@staticmethod
+	def ready():
+		if Kernels.backend == "numpy" or numba is None:
+			return False
+		if Kernels.checked is None:
+			Kernels.checked = Kernels.selfCheck()
+		return Kernels.checked
+
+	# The name of the backend in use
+	@staticmethod
+	def active():
+		return "numba" if Kernels.ready() else "numpy"
+
+	# Same as BodySystem.pairwiseAccelerations
+	# When the positions are float32, each pair is worked out in float32 (the sums are float64 either way)
+	@staticmethod
+	def pairwiseAccelerations(targetPos, sourcePos, sourceMass, potential = False):
+		acc = np.zeros((len(targetPos), 2))
+		pot = np.zeros(len(targetPos))
+		if targetPos.dtype == np.float32:
+			pairwiseKernel32(np.ascontiguousarray(targetPos), np.ascontiguousarray(sourcePos[:, 0]), np.ascontiguousarray(sourcePos[:, 1]), \
+				np.ascontiguousarray(sourceMass, dtype = np.float32), acc, pot, potential)
+		else:
+			pairwiseKernel(np.ascontiguousarray(targetPos, dtype = np.float64), np.ascontiguousarray(sourcePos, dtype = np.float64), \
+				np.ascontiguousarray(sourceMass, dtype = np.float64), acc, pot, potential)
+		return (acc, pot) if potential else acc
+
+	# Same as Body.absorbingPairs
+	@staticmethod
+	def absorbingPairs(pos, rad, mass, i, j, factor):
+		larger = np.empty(len(i), dtype = np.intp)
+		smaller = np.empty(len(i), dtype = np.intp)
+		count = absorbingPairsKernel(np.ascontiguousarray(pos, dtype = np.float64), np.ascontiguousarray(rad, dtype = np.float64), \
+			np.ascontiguousarray(mass, dtype = np.float64), i.astype(np.intp), j.astype(np.intp), factor, larger, smaller)
+		return larger[:count], smaller[:count]
+
+	# Compiles the kernels and compares them with the NumPy versions on random bodies (including two in the same place)
+	# Returns whether they agree
+	@staticmethod
+	def selfCheck():
+		from BodySystem import BodySystem
+		from Body import Body
+		rng = np.random.default_rng(0)
+		pos = rng.uniform(0, 800, (300, 2))
+		pos[1] = pos[0]
+		mass = rng.uniform(8*10**22, 4*10**23, 300)
+		rad = Body.findDisplayRadius(mass)*rng.uniform(1, 20, 300)
+		try:
+			acc, pot = Kernels.pairwiseAccelerations(pos[:100], pos, mass, potential = True)
+			expectedAcc, expectedPot = BodySystem.numpyPairwiseAccelerations(pos[:100], pos, mass, potential = True)
+			i, j = np.triu_indices(len(mass), 1)
+			reducedAcc, reducedPot = Kernels.pairwiseAccelerations(pos[:100].astype(np.float32), pos.astype(np.float32), \
+				mass.astype(np.float32), potential = True)
+			larger, smaller = Kernels.absorbingPairs(pos, rad, mass, i, j, Body.collisionDistanceFactor)
+			expectedLarger, expectedSmaller = Body.numpyAbsorbingPairs(pos, rad, mass, i, j)
+		except Exception as e:
+			warnings.warn("Compiled kernels failed ({}), using NumPy".format(e))
+			return False
+		scale = np.abs(expectedAcc).max()
+		matches = np.abs(acc - expectedAcc).max() <= Kernels.tolerance*scale and \
+			np.abs(pot - expectedPot).max() <= Kernels.tolerance*np.abs(expectedPot).max() and \
+			np.abs(reducedAcc - expectedAcc).max() <= Kernels.reducedTolerance*scale and \
+			np.abs(reducedPot - expectedPot).max() <= Kernels.reducedTolerance*np.abs(expectedPot).max() and \
+			np.array_equal(larger, expectedLarger) and np.array_equal(smaller, expectedSmaller)
+		if not matches:
+			warnings.warn("Compiled kernels do not match the NumPy versions, using NumPy")
+		return bool(matches)
+
+if numba is not None:
+	@numba.njit(parallel = True, cache = True)
+	def pairwiseKernel(targetPos, sourcePos, sourceMass, acc, pot, potential):
+		for t in numba.prange(targetPos.shape[0]):
+			x, y = targetPos[t, 0], targetPos[t, 1]
+			ax, ay, p = 0.0, 0.0, 0.0
+			for s in range(sourcePos.shape[0]):
+				dx = sourcePos[s, 0] - x
+				dy = sourcePos[s, 1] - y
+				r2 = dx*dx + dy*dy
+				if r2 > 0:
+					inverse = 1/np.sqrt(r2)
+					weight = sourceMass[s]*inverse*inverse*inverse
+					ax += weight*dx
+					ay += weight*dy
+					if potential:
+						p += sourceMass[s]*inverse
+			acc[t, 0] = ax
+			acc[t, 1] = ay
+			pot[t] = p
+
+	# pairwiseKernel for float32 positions and masses (with float64 sums)
+	# The sources' x and y are separate arrays, coincident points are skipped with a select instead of a branch, and fastmath lets the sums
+	# be reordered, which together let the loop over the sources be vectorized (several times faster than the float64 kernel)
+	@numba.njit(parallel = True, fastmath = True, cache = True)
+	def pairwiseKernel32(targetPos, sourceX, sourceY, sourceMass, acc, pot, potential):
+		one, zero = np.float32(1), np.float32(0)
+		for t in numba.prange(targetPos.shape[0]):
+			x, y = targetPos[t, 0], targetPos[t, 1]
+			ax, ay, p = 0.0, 0.0, 0.0
+			for s in range(sourceX.shape[0]):
+				dx = sourceX[s] - x
+				dy = sourceY[s] - y
+				r2 = dx*dx + dy*dy
+				inverse = one/np.sqrt(r2) if r2 > zero else zero
+				weight = sourceMass[s]*inverse*inverse*inverse
+				ax += weight*dx
+				ay += weight*dy
+				if potential:
+					p += sourceMass[s]*inverse
+			acc[t, 0] = ax
+			acc[t, 1] = ay
+			pot[t] = p
+
+	@numba.njit(cache = True)
+	def absorbingPairsKernel(pos, rad, mass, i, j, factor, larger, smaller):
+		count = 0
+		for k in range(len(i)):
+			a, b = i[k], j[k]
+			dx = pos[b, 0] - pos[a, 0]
+			dy = pos[b, 1] - pos[a, 1]
+			dist = np.sqrt(dx*dx + dy*dy)
+			# the second body absorbing the first takes precedence, like in Body.absorbingPairs
+			if dist <= rad[b] + rad[a]*factor and mass[b] >= mass[a]:
+				larger[count], smaller[count] = b, a
+				count += 1
+			elif dist <= rad[a] + rad[b]*factor and mass[a] >= mass[b]:
+				larger[count], smaller[count] = a, b
+				count += 1
+		return count
@@ -0,0 +1,122 @@
+# agent
+# 10/18/2026
+
+import collections
+import numpy as np
+import pygame
+from Renderer import Renderer
+
+# Keeps the surfaces that a font renders, so the same text (or character) is only rendered once
+# The least recently used surfaces are dropped once there are more than 'capacity' of them
+class TextCache:
+	def __init__(self, font, capacity = 256):
+		self.font = font
+		self.capacity = capacity
+		self.surfaces = collections.OrderedDict()
+
+	def render(self, text, color):
+		key = (text, tuple(color))
+		surface = self.surfaces.get(key)
+		if surface is None:
+			surface = self.font.render(text, 1, color)
+			self.surfaces[key] = surface
+			if len(self.surfaces) > self.capacity:
+				self.surfaces.popitem(last = False)
+		else:
+			self.surfaces.move_to_end(key)
+		return surface
+
+	# Draws text that does not change often (like the seed) from one cached surface, returning the rectangle drawn over
+	def draw(self, screen, text, pos, color):
+		return screen.blit(self.render(text, color), pos)
+
+	# Draws text that changes all the time (like the frame counter) a character at a time, so only the characters need caching
+	def drawGlyphs(self, screen, text, pos, color):
+		x, y = pos
+		rects = []
+		for character in text:
+			glyph = self.render(character, color)
+			rects.append(screen.blit(glyph, (x, y)))
+			x += glyph.get_width()
+		return Renderer.union(rects)
+
+# The background with the fixed bodies drawn on it, kept on its own surface and copied to the screen at the start of each frame
+# (only over what was drawn on top of it, when the rest of the screen still shows it)
+# Fixed bodies never move, so it is only drawn again when the camera moves or the fixed bodies change (are added, merged or removed)
+class StaticLayer:
+	def __init__(self, size, color):
+		self.surface = pygame.Surface(size)
+		self.color = color
+		self.key = None # what the layer was last drawn for
+
+	# Draws the layer again if it is out of date, returning whether it was
+	def update(self, camera, system, rows):
+		fixed = rows[system.fixed[rows]]
+		key = (camera.version, system.id[fixed].tobytes(), system.pos[fixed].tobytes(), system.displayRad[fixed].tobytes())
+		if key == self.key:
+			return False
+		self.key = key
+		self.surface.fill(self.color)
+		Renderer.drawBodies(self.surface, camera, system, fixed)
+		return True
+
+	# Copies the layer onto the screen, only over the given rectangles (what was drawn on top of it last frame) unless rects is None
+	def draw(self, screen, rects = None):
+		if rects is None:
+			return screen.blit(self.surface, (0, 0))
+		return Renderer.union([screen.blit(self.surface, rect, rect) for rect in rects])
+
+# The parts of the screen that changed this frame, so only those are sent to the display
+# What was drawn last frame is counted too, since it has to be covered up again
+# The screen is split into square tiles, and every tile that something was drawn over is dirty, so that any number of small rectangles
+# becomes at most one rectangle per run of dirty tiles along each row
+# When the whole screen changed (or the dirty tiles cover too much of it for it to be worth it) the whole display is updated
+class DirtyRects:
+	tileSize = 32
+	maxFraction = 0.6 # of the screen's area
+
+	def __init__(self, size):
+		self.size = size
+		self.shape = (-(-size[1]//DirtyRects.tileSize), -(-size[0]//DirtyRects.tileSize)) # tile rows and columns
+		self.current = np.zeros(self.shape, dtype = bool)
+		self.previous = np.zeros(self.shape, dtype = bool)
+		self.full = True
+
+	# Marks what was drawn over (a rectangle, a list of them, or None) as dirty, returning it
+	def add(self, rects):
+		if rects is None:
+			return rects
+		tile = DirtyRects.tileSize
+		for rect in (rects if isinstance(rects, list) else [rects]):
+			if rect is None:
+				continue
+			rect = rect.clip((0, 0) + tuple(self.size))
+			if rect.width > 0 and rect.height > 0:
+				self.current[rect.top//tile:(rect.bottom - 1)//tile + 1, rect.left//tile:(rect.right - 1)//tile + 1] = True
+		return rects
+
+	# Makes the next update cover the whole screen
+	def invalidate(self):
+		self.full = True
+
+	# The rectangles drawn over last frame (which a StaticLayer has to cover up), or None when the whole screen is to be drawn again
+	def stale(self):
+		return None if self.full else self.rectangles(self.previous)
+
+	# The dirty tiles as one rectangle per run of them along each row
+	def rectangles(self, tiles):
+		tile = DirtyRects.tileSize
+		rects = []
+		for row in np.flatnonzero(tiles.any(axis = 1)):
+			edges = np.flatnonzero(np.diff(np.concatenate(([False], tiles[row], [False])).astype(np.int8)))
+			for start, stop in zip(edges[::2].tolist(), edges[1::2].tolist()):
+				rects.append(pygame.Rect(start*tile, row*tile, (stop - start)*tile, tile).clip((0, 0) + tuple(self.size)))
+		return rects
+
+	def update(self):
+		dirty = self.previous | self.current
+		if self.full or dirty.mean() > DirtyRects.maxFraction:
+			pygame.display.update()
+		elif dirty.any():
+			pygame.display.update(self.rectangles(dirty))
+		self.previous, self.current, self.full = self.current, np.zeros(self.shape, dtype = bool), False
@@ -0,0 +1,313 @@
+# agent
+# 10/18/2026
+
+import math
+import numpy as np
+from BodySystem import BodySystem
+from SpatialHash import SpatialHash
+
+# Particle-mesh gravity for very large numbers of bodies
+# Mass is spread onto a square grid over the bodies (cloud-in-cell), the grid is convolved with the force of a point mass using FFTs,
+# and each body gets the grid's acceleration interpolated back from the cells around it
+# The cost is O(n + g^2 log g) for a g x g grid, but forces closer than a couple of cells are smoothed out,
+# and with this force law (1/r^2 between bodies on a plane) close neighbors make up much of the force on a body
+# So by default the force is split in two: the grid only carries a smoothed long-range part,
+# and the rest is summed directly between bodies closer than a few cells (P3M)
+# It always works in float64 (the precision of a BodySystem only changes direct gravity)
+class ParticleMesh:
+	gridSize = None # cells along each side (None picks a power of two from how crowded the bodies are, see findGridSize)
+	minGridSize = 64
+	maxGridSize = 2048
+	shortRange = True # whether close pairs are corrected by direct summation (without it the error is tens of percent)
+	splitRadius = 1.25 # scale of the long/short range split (cells)
+	cutoff = 4.5 # short range forces are summed out to this many split radii (past it they are below ~1e-4 of the total)
+	# the most close neighbors the short range sum should have per body on average, which the grid size is picked to keep to
+	# When the grid cannot be fine enough for that (it is capped at maxGridSize, or its size was given), the cutoff is brought in
+	# instead, but never below minCutoff split radii, where the error starts to grow quickly
+	maxNeighbors = 64
+	minCutoff = 3.5
+	densityBins = 64 # bins along each side of the histogram used to find how crowded the bodies are
+	boxPercentile = 0.5 # the grid covers the box of all but this percent of the bodies on each side (see findBox)
+	boxMargin = 0.25 # and this much of the box's width more on each side
+	kernels = {} # FFTs of the force kernel for each (gridSize, shortRange), since they only depend on those
+
+	def __init__(self, positions, masses, gridSize = None):
+		self.positions = positions
+		self.masses = masses
+		gridSize = ParticleMesh.gridSize if gridSize is None else gridSize
+		self.origin, extent = ParticleMesh.findBox(positions)
+		# the few bodies outside the box are left off the grid and summed directly instead
+		outside = ((positions < self.origin) | (positions > self.origin + extent)).any(axis = 1) if len(masses) > 0 else np.zeros(0, dtype = bool)
+		self.outliers = np.flatnonzero(outside)
+		self.meshRows = np.flatnonzero(~outside)
+		density = ParticleMesh.localDensity(positions[self.meshRows], self.origin, extent)
+		self.gridSize = ParticleMesh.findGridSize(density, extent) if gridSize is None else gridSize
+		n = self.gridSize
+		# the bodies span n - 1 cells, so the cell above the highest one still falls on the grid
+		self.cellSize = extent*(1 + 1e-9)/(n - 1)
+		self.cutoff = ParticleMesh.findCutoff(density, self.cellSize)
+		self.density = ParticleMesh.deposit(positions[self.meshRows], masses[self.meshRows], self.origin, self.cellSize, (n, n))
+		self.accX, self.accY = self.solve()
+
+	# The corner and side of the square the grid covers: the box holding all but boxPercentile percent of the bodies on each side,
+	# widened by boxMargin of its size, so that a body that has escaped far away does not stretch the cells over empty space
+	@staticmethod
+	def findBox(positions):
+		if len(positions) == 0:
+			return np.zeros(2), 1e-12
+		lo = np.percentile(positions, ParticleMesh.boxPercentile, axis = 0)
+		hi = np.percentile(positions, 100 - ParticleMesh.boxPercentile, axis = 0)
+		width = float((hi - lo).max())
+		return lo - ParticleMesh.boxMargin*width, max(width*(1 + 2*ParticleMesh.boxMargin), 1e-12)
+
+	# How many bodies there are per unit of area around the average body (so clumped bodies count as more crowded than the same
+	# number spread evenly), from a histogram over the box
+	@staticmethod
+	def localDensity(positions, origin, extent):
+		if len(positions) == 0:
+			return 0.0
+		bins = ParticleMesh.densityBins
+		cells = np.clip(((positions - origin)/extent*bins).astype(np.int64), 0, bins - 1)
+		counts = np.bincount(cells[:, 0]*bins + cells[:, 1], minlength = bins*bins).astype(float)
+		return float((counts**2).sum()/len(positions))/(extent/bins)**2
+
+	# The smallest power of two grid whose cells are small enough that the bodies have at most maxNeighbors within the cutoff
+	# (on average, at the given density)
+	@staticmethod
+	def findGridSize(density, extent):
+		reach = ParticleMesh.cutoff*ParticleMesh.splitRadius*extent*math.sqrt(math.pi*density/ParticleMesh.maxNeighbors)
+		size = 2**math.ceil(math.log2(max(reach + 1, 1)))
+		return int(min(max(size, ParticleMesh.minGridSize), ParticleMesh.maxGridSize))
+
+	# The cutoff (in split radii) for cells of the given size: ParticleMesh.cutoff, brought in (down to minCutoff) as far as is needed
+	# to keep to maxNeighbors
+	@staticmethod
+	def findCutoff(density, cellSize):
+		if density <= 0:
+			return ParticleMesh.cutoff
+		reach = math.sqrt(ParticleMesh.maxNeighbors/(math.pi*density))/(ParticleMesh.splitRadius*cellSize)
+		return min(ParticleMesh.cutoff, max(reach, ParticleMesh.minCutoff))
+
+	# Spreads each body's mass over the four cells around it (cloud-in-cell), returning the mass in each cell
+	# Bodies that are not entirely on the grid are left out
+	@staticmethod
+	def deposit(positions, masses, origin, cellSize, shape):
+		cells, weights, inside = ParticleMesh.cloudInCell(positions, origin, cellSize, shape)
+		grid = np.bincount(cells.ravel(), weights = (weights*masses[inside, None]).ravel(), minlength = shape[0]*shape[1])
+		return grid.reshape(shape)
+
+	# The flat indices of the four cells around each position on the grid and the share of it that goes to each,
+	# for the positions that are on the grid (returned as a mask)
+	@staticmethod
+	def cloudInCell(positions, origin, cellSize, shape):
+		u = (positions - origin)/cellSize
+		base = np.floor(u).astype(np.int64)
+		inside = (base[:, 0] >= 0) & (base[:, 0] < shape[0] - 1) & (base[:, 1] >= 0) & (base[:, 1] < shape[1] - 1)
+		base, f = base[inside], u[inside] - base[inside]
+		i, j = base[:, 0], base[:, 1]
+		cells = np.stack((i*shape[1] + j, i*shape[1] + j + 1, (i + 1)*shape[1] + j, (i + 1)*shape[1] + j + 1), axis = 1)
+		fx, fy = f[:, 0], f[:, 1]
+		weights = np.stack(((1 - fx)*(1 - fy), (1 - fx)*fy, fx*(1 - fy), fx*fy), axis = 1)
+		return cells, weights, inside
+
+	# The FFTs of the x and y force kernels and the potential kernel on a grid twice the size (the zero padding keeps the grid from
+	# wrapping around onto itself)
+	# The kernels are in cell units: the acceleration (and potential) a unit mass one cell away causes, before dividing by cellSize^2
+	# (and cellSize)
+	@staticmethod
+	def kernel(n, shortRange):
+		key = (n, shortRange)
+		if key not in ParticleMesh.kernels:
+			offsets = np.arange(2*n)
+			offsets = np.where(offsets < n, offsets, offsets - 2*n).astype(float)
+			dx, dy = np.meshgrid(offsets, offsets, indexing = "ij")
+			r = np.sqrt(dx*dx + dy*dy)
+			weight = np.zeros_like(r)
+			np.power(r, -3, out = weight, where = r > 0)
+			if shortRange:
+				weight *= 1 - ParticleMesh.shortRangeFraction(r, ParticleMesh.splitRadius)
+			# the force on a cell points from it towards the source, which is at minus the offset
+			ParticleMesh.kernels[key] = (np.fft.rfft2(-dx*weight), np.fft.rfft2(-dy*weight), \
+				np.fft.rfft2(ParticleMesh.potentialKernel(r, shortRange)))
+		return ParticleMesh.kernels[key]
+
+	# The potential the grid carries from a unit mass r cells away: 1/r, less the short range part (see shortRangePotential)
+	# Without the short range part, a body's own cell is left out as it is for the force, and with it the smoothed potential
+	# stays finite there
+	@staticmethod
+	def potentialKernel(r, shortRange):
+		r = np.asarray(r, dtype = float)
+		weight = np.zeros_like(r)
+		np.power(r, -1, out = weight, where = r > 0)
+		if shortRange:
+			rs = ParticleMesh.splitRadius
+			weight = np.where(r > 0, weight*(1 - ParticleMesh.shortRangePotential(r, rs)), 1/(rs*math.sqrt(math.pi)))
+		return weight
+
+	# The share of the potential of a point mass at distance r that is left to the direct sum, the counterpart of shortRangeFraction
+	@staticmethod
+	def shortRangePotential(r, rs):
+		return ParticleMesh.erfc(r/(2*rs))
+
+	# How much of the force between two bodies at distance r is left to the direct sum (the rest is carried by the grid)
+	# It is the force of a point mass minus that of a Gaussian cloud with the same mass, as a fraction of the point mass's
+	@staticmethod
+	def shortRangeFraction(r, rs):
+		x = r/(2*rs)
+		return ParticleMesh.erfc(x) + r/(rs*math.sqrt(math.pi))*np.exp(-x*x)
+
+	# The complementary error function (Abramowitz and Stegun 7.1.26, accurate to about 1e-7), for x >= 0
+	@staticmethod
+	def erfc(x):
+		t = 1/(1 + 0.3275911*x)
+		poly = t*(0.254829592 + t*(-0.284496736 + t*(1.421413741 + t*(-1.453152027 + t*1.061405429))))
+		return poly*np.exp(-x*x)
+
+	# The acceleration (sum of mass * displacement / distance^3) at every cell of the grid
+	def solve(self):
+		n = self.gridSize
+		kx, ky = ParticleMesh.kernel(n, ParticleMesh.shortRange)[:2]
+		padded = np.zeros((2*n, 2*n))
+		padded[:n, :n] = self.density
+		densityFFT = np.fft.rfft2(padded)
+		accX = np.fft.irfft2(densityFFT*kx, s = padded.shape)[:n, :n]/self.cellSize**2
+		accY = np.fft.irfft2(densityFFT*ky, s = padded.shape)[:n, :n]/self.cellSize**2
+		self.densityFFT = densityFFT
+		self.potentialGrid = None
+		return accX, accY
+
+	# The potential (sum of mass / distance) at every cell of the grid, only found the first time it is asked for
+	def potentials(self):
+		if self.potentialGrid is None:
+			n = self.gridSize
+			kp = ParticleMesh.kernel(n, ParticleMesh.shortRange)[2]
+			self.potentialGrid = np.fft.irfft2(self.densityFFT*kp, s = (2*n, 2*n))[:n, :n]/self.cellSize
+		return self.potentialGrid
+
+	# The part of the grid's potential at each body that comes from its own mass, which is spread over the same four cells it is read from
+	# weights are the cloud-in-cell weights of the bodies, and the (4 x 4) kernel between those cells is the same for every body
+	def selfPotentials(self, weights, masses):
+		corners = np.array([[0, 0], [0, 1], [1, 0], [1, 1]])
+		between = np.sqrt(((corners[:, None, :] - corners[None, :, :])**2).sum(axis = 2))
+		kernel = ParticleMesh.potentialKernel(between, ParticleMesh.shortRange)
+		return masses*((weights @ kernel)*weights).sum(axis = 1)/self.cellSize
+
+	# Returns the sum of (mass * displacement / distance^3) acting on each target, like BodySystem.pairwiseAccelerations
+	# targets are indices into the positions the mesh was built from
+	# The pull of the bodies off the grid is summed directly, and so is all of the pull on them
+	# When potential is true, the sums of (mass / distance) are returned as well, found from the grid in the same way
+	def accelerations(self, targets, potential = False):
+		targets = np.asarray(targets, dtype = np.intp)
+		acc = np.zeros((len(targets), 2))
+		pot = np.zeros(len(targets))
+		if len(targets) == 0:
+			return (acc, pot) if potential else acc
+		onMesh = np.ones(len(targets), dtype = bool)
+		if len(self.outliers) > 0:
+			onMesh[np.isin(targets, self.outliers)] = False
+		inner = targets[onMesh]
+		shape = (self.gridSize, self.gridSize)
+		cells, weights, inside = ParticleMesh.cloudInCell(self.positions[inner], self.origin, self.cellSize, shape)
+		meshAcc = np.zeros((len(inner), 2))
+		meshAcc[inside, 0] = (self.accX.ravel()[cells]*weights).sum(axis = 1)
+		meshAcc[inside, 1] = (self.accY.ravel()[cells]*weights).sum(axis = 1)
+		meshPot = np.zeros(len(inner))
+		if potential:
+			meshPot[inside] = (self.potentials().ravel()[cells]*weights).sum(axis = 1) - \
+				self.selfPotentials(weights, self.masses[inner[inside]])
+		if ParticleMesh.shortRange:
+			shortAcc, shortPot = self.shortRangeAccelerations(inner, potential = True)
+			meshAcc += shortAcc
+			meshPot += shortPot
+		if len(self.outliers) > 0:
+			outAcc, outPot = BodySystem.pairwiseAccelerations(self.positions[inner], self.positions[self.outliers], \
+				self.masses[self.outliers], potential = True, precision = "float64")
+			meshAcc += outAcc
+			meshPot += outPot
+			acc[~onMesh], pot[~onMesh] = BodySystem.pairwiseAccelerations(self.positions[targets[~onMesh]], self.positions, \
+				self.masses, potential = True, precision = "float64")
+		acc[onMesh] = meshAcc
+		pot[onMesh] = meshPot
+		return (acc, pot) if potential else acc
+
+	# The short range part of the force on each target, summed directly over the bodies on the grid that are close enough
+	# When most of the bodies are targets, each close pair is found once and counted for both bodies, and otherwise only the
+	# bodies around the targets are looked at
+	# When potential is true, the short range part of the potential is returned as well
+	def shortRangeAccelerations(self, targets, potential = False):
+		pos, mass, rows = self.positions, self.masses, self.meshRows
+		rs = ParticleMesh.splitRadius*self.cellSize
+		reach = self.cutoff*rs
+		acc = np.zeros((len(targets), 2))
+		pot = np.zeros(len(targets))
+		if len(targets) == 0:
+			return (acc, pot) if potential else acc
+		# the pairs are summed a chunk at a time, so the temporaries stay small however many there are
+		symmetric = 2*len(targets) >= len(rows)
+		if symmetric:
+			chunks = SpatialHash.candidatePairChunks(pos[rows], reach, BodySystem.tileElements)
+			acc = np.zeros((len(mass), 2))
+			pot = np.zeros(len(mass))
+		else:
+			chunks = SpatialHash.queryPairChunks(pos[targets], pos[rows], reach, BodySystem.tileElements)
+		for i, j in chunks:
+			if symmetric:
+				i, j = rows[i], rows[j]
+				d = pos[j] - pos[i]
+			else:
+				j = rows[j]
+				d = pos[j] - pos[targets[i]]
+			r = np.sqrt((d**2).sum(axis = 1))
+			close = (r > 0) & (r < reach)
+			i, j, d, r = i[close], j[close], d[close], r[close]
+			weight = ParticleMesh.shortRangeFraction(r, rs)/r**3
+			for k in range(2):
+				acc[:, k] += np.bincount(i, weights = mass[j]*weight*d[:, k], minlength = len(acc))
+				if symmetric:
+					acc[:, k] -= np.bincount(j, weights = mass[i]*weight*d[:, k], minlength = len(acc))
+			if potential:
+				potWeight = ParticleMesh.shortRangePotential(r, rs)/r
+				pot += np.bincount(i, weights = mass[j]*potWeight, minlength = len(pot))
+				if symmetric:
+					pot += np.bincount(j, weights = mass[i]*potWeight, minlength = len(pot))
+		if symmetric:
+			acc, pot = acc[targets], pot[targets]
+		return (acc, pot) if potential else acc
+
+	# Compares mesh accelerations against direct summation for a random sample of bodies, like BarnesHut.forceError
+	@staticmethod
+	def forceError(positions, masses, sample = 100, rng = None, gridSize = None):
+		rng = np.random.default_rng() if rng is None else rng
+		n = len(masses)
+		if n < 2:
+			return {"gridSize": gridSize, "sample": 0, "median": 0.0, "p99": 0.0, "max": 0.0}
+		targets = rng.choice(n, size = min(sample, n), replace = False)
+		mesh = ParticleMesh(positions, masses, gridSize)
+		approx = mesh.accelerations(targets)
+		direct = BodySystem.pairwiseAccelerations(positions[targets], positions, masses, precision = "float64")
+		norm = np.sqrt((direct**2).sum(axis = 1))
+		err = np.sqrt(((approx - direct)**2).sum(axis = 1)) / np.where(norm > 0, norm, 1)
+		return {"gridSize": mesh.gridSize, "sample": len(targets), "median": float(np.median(err)), \
+			"p99": float(np.percentile(err, 99)), "max": float(err.max())}
+
+# Prints the force error and time for a few grid sizes on a random cloud, with and without the short range correction
+if __name__ == "__main__":
+	import argparse
+	import time
+	parser = argparse.ArgumentParser(description = "Particle-mesh force error against direct summation")
+	parser.add_argument("--bodies", type = int, default = 100000)
+	parser.add_argument("--sample", type = int, default = 200)
+	parser.add_argument("--grids", type = int, nargs = "+", default = [128, 256, 512])
+	args = parser.parse_args()
+	rng = np.random.default_rng(0)
+	positions = rng.uniform(0, 800, (args.bodies, 2))
+	masses = rng.uniform(8*10**22, 4*10**23, args.bodies)
+	for shortRange in (False, True):
+		ParticleMesh.shortRange = shortRange
+		for grid in args.grids:
+			startTime = time.perf_counter()
+			ParticleMesh(positions, masses, grid).accelerations(np.arange(args.bodies))
+			elapsed = time.perf_counter() - startTime
+			err = ParticleMesh.forceError(positions, masses, args.sample, rng, grid)
+			print("grid {:4d}{}: {:.3f} s, median error {:.2e}, p99 {:.2e}, max {:.2e}".format(grid, \
+				" + short range" if shortRange else "", elapsed, err["median"], err["p99"], err["max"]))
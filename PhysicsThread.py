@@ -0,0 +1,78 @@
+# agent
+# 10/18/2026
+
+import queue
+import threading
+import time
+
+# A consistent copy of a simulation's state for drawing
+class Snapshot:
+	def __init__(self, system, frame, stepsPerSecond):
+		self.system = system # a BodySystem holding copies of the live bodies
+		self.frame = frame
+		self.stepsPerSecond = stepsPerSecond
+
+# Runs a Simulation on its own thread, so drawing and input handling never wait on a slow physics step
+# The simulation is only ever touched by this thread: other threads post commands (callables) that it runs between steps,
+# and read the latest Snapshot it has published (each one is built privately and then swapped in, so it is never half written)
+class PhysicsThread(threading.Thread):
+	# stepsPerFrame is how many physics steps are taken per displayed frame (the time warp), and fps is the display rate
+	def __init__(self, sim, stepsPerFrame = 1, fps = 60):
+		threading.Thread.__init__(self, daemon = True)
+		self.sim = sim
+		self.stepsPerFrame = stepsPerFrame
+		self.fps = fps
+		self.paused = False
+		self.commands = queue.Queue()
+		self.stopped = threading.Event()
+		self.stepsPerSecond = 0.0
+		self.front = None
+		self.publish()
+
+	# Runs fn(sim) on the physics thread before its next step
+	def post(self, fn):
+		self.commands.put(fn)
+
+	def stop(self):
+		self.stopped.set()
+
+	# The most recent snapshot
+	def latest(self):
+		return self.front
+
+	def runCommands(self):
+		ran = False
+		while True:
+			try:
+				fn = self.commands.get_nowait()
+			except queue.Empty:
+				return ran
+			fn(self.sim)
+			ran = True
+
+	def publish(self):
+		system = self.sim.system
+		self.front = Snapshot(system.snapshot(system.liveRows()), self.sim.frame, self.stepsPerSecond)
+
+	def run(self):
+		frameTime = 1/self.fps
+		while not self.stopped.is_set():
+			startTime = time.perf_counter()
+			changed = self.runCommands()
+			if self.paused:
+				if changed:
+					self.publish()
+				self.stopped.wait(frameTime)
+				continue
+			steps = 0
+			for _ in range(max(1, int(self.stepsPerFrame))):
+				if (self.runCommands() and self.paused) or self.sim.halted():
+					break
+				self.sim.step()
+				steps += 1
+			elapsed = time.perf_counter() - startTime
+			self.stepsPerSecond = steps/max(elapsed, frameTime)
+			self.publish()
+			# keeping to the time warp when the physics is faster than needed
+			if elapsed < frameTime:
+				self.stopped.wait(frameTime - elapsed)
@@ -0,0 +1,156 @@
+# agent
+# 10/18/2026
+
+import collections
+import contextlib
+import csv
+import json
+import threading
+import time
+import numpy as np
+
+# Times the phases of each frame (moving the bodies, collisions, gravity, drawing, ...) and counts the work done in them
+# The code being measured calls Profiler.phase and Profiler.count, which do nothing unless a profiler has been made active,
+# so they can stay in place for good
+# Phases can be nested, and each phase's time leaves out the time spent in the phases inside it
+class Profiler:
+	active = None # the profiler that is recording (None when profiling is off)
+	off = contextlib.nullcontext()
+
+	# window is how many of the most recent frames the rolling statistics cover
+	# traceLength is how many frames are kept for writing out as a trace (0 keeps none)
+	def __init__(self, window = 300, traceLength = 100000):
+		self.window = window
+		self.lock = threading.Lock()
+		self.local = threading.local() # each thread's stack of open phases
+		self.times = {} # seconds spent in each phase during the current frame
+		self.counts = {} # counts for the current frame
+		self.history = {} # the last 'window' values of each phase time and count
+		self.trace = collections.deque(maxlen = traceLength) if traceLength > 0 else None
+		self.frame = 0
+		self.frameStart = time.perf_counter()
+
+	# Makes this the profiler that Profiler.phase and Profiler.count record into
+	def start(self):
+		Profiler.active = self
+		self.frameStart = time.perf_counter()
+		return self
+
+	def stop(self):
+		if Profiler.active is self:
+			Profiler.active = None
+		return self
+
+	# 'with Profiler.phase("gravity"):' times the block as part of the named phase
+	@staticmethod
+	def phase(name):
+		profiler = Profiler.active
+		if profiler is None:
+			return Profiler.off
+		return PhaseTimer(profiler, name)
+
+	# Adds n to a count for the current frame
+	@staticmethod
+	def count(name, n = 1):
+		profiler = Profiler.active
+		if profiler is not None:
+			profiler.add(profiler.counts, name, n)
+
+	def add(self, totals, name, value):
+		with self.lock:
+			totals[name] = totals.get(name, 0) + value
+
+	# Ends the current frame, adding its times and counts to the statistics (and to the trace)
+	# bodies is how many bodies there were, for the throughput
+	def endFrame(self, bodies = 0):
+		now = time.perf_counter()
+		with self.lock:
+			times, counts = self.times, self.counts
+			self.times, self.counts = {}, {}
+		elapsed = now - self.frameStart
+		self.frameStart = now
+		# bodies stepped per second of wall time (a frame can take several physics steps)
+		throughput = bodies*counts.get("steps", 1)/elapsed if elapsed > 0 else 0.0
+		record = {"frame": self.frame, "bodies": bodies, "frame ms": elapsed*1000, "bodies/s": throughput}
+		record.update({name + " ms": t*1000 for name, t in times.items()})
+		record.update(counts)
+		for name, value in record.items():
+			if name == "frame":
+				continue
+			if name not in self.history:
+				self.history[name] = collections.deque(maxlen = self.window)
+			self.history[name].append(value)
+		if self.trace is not None:
+			self.trace.append(record)
+		self.frame += 1
+		return record
+
+	# Rolling statistics of each time and count over the window, as {name: {"mean", "p50", "p95", "p99", "max"}}
+	def summary(self):
+		stats = {}
+		for name, values in list(self.history.items()):
+			values = np.array(values)
+			if len(values) == 0:
+				continue
+			p50, p95, p99 = np.percentile(values, (50, 95, 99))
+			stats[name] = {"mean": float(values.mean()), "p50": float(p50), "p95": float(p95), "p99": float(p99), "max": float(values.max())}
+		return stats
+
+	# The lines of text shown by the overlay
+	def overlayLines(self):
+		stats = self.summary()
+		lines = []
+		for name in ("frame ms",) + tuple(sorted(n for n in stats if n.endswith(" ms") and n != "frame ms")):
+			if name in stats:
+				s = stats[name]
+				lines.append("{:<16}{:8.2f}{:8.2f}{:8.2f}".format(name, s["p50"], s["p95"], s["p99"]))
+		for name in sorted(n for n in stats if not n.endswith(" ms")):
+			lines.append("{:<16}{:>24,.0f}".format(name, stats[name]["mean"]))
+		return lines
+
+	# Writes the trace to a .csv or .json file (picked by the extension)
+	def write(self, path):
+		records = list(self.trace) if self.trace is not None else []
+		if path.endswith(".json"):
+			with open(path, "w") as f:
+				json.dump({"frames": records, "summary": self.summary()}, f, indent = 1)
+			return path
+		fields = []
+		for record in records:
+			fields += [name for name in record if name not in fields]
+		with open(path, "w", newline = "") as f:
+			writer = csv.DictWriter(f, fieldnames = fields, restval = 0)
+			writer.writeheader()
+			writer.writerows(records)
+		return path
+
+# Times one use of a phase (made by Profiler.phase)
+class PhaseTimer:
+	def __init__(self, profiler, name):
+		self.profiler = profiler
+		self.name = name
+
+	def __enter__(self):
+		stack = getattr(self.profiler.local, "stack", None)
+		if stack is None:
+			stack = self.profiler.local.stack = []
+		now = time.perf_counter()
+		# pausing the phase this one is inside of
+		if stack:
+			stack[-1].pause(now)
+		self.resumed = now
+		self.elapsed = 0.0
+		stack.append(self)
+		return self
+
+	def __exit__(self, *exc):
+		stack = self.profiler.local.stack
+		now = time.perf_counter()
+		stack.pop()
+		self.profiler.add(self.profiler.times, self.name, self.elapsed + now - self.resumed)
+		if stack:
+			stack[-1].resumed = now
+		return False
+
+	def pause(self, now):
+		self.elapsed += now - self.resumed
@@ -0,0 +1,188 @@
+# agent
+# 10/18/2026
+
+import json
+import os
+import numpy as np
+from Body import Body
+from BodySystem import BodySystem
+from PhysicsThread import Snapshot
+
+# Streams the state of a Simulation into a recording: a folder of append-only binary columns that a Recording reads back with memory maps
+# Each recorded frame adds one row per live body to every column, and a row to the frame index saying where that frame's rows start,
+# so any frame can be found without reading the ones before it
+# A recording cut off part way through (by a crash) can still be read up to the last frame whose rows all made it to disk
+# Resetting the simulation sends its frame and body ids back, so the recording starts a new segment there: its frames carry on from the
+# last one recorded and its ids from the highest one recorded, so both only ever go up through the recording
+class Recorder:
+	# name: (dtype, values per row)
+	columns = {"id": ("<i8", 1), "pos": ("<f8", 2), "vec": ("<f8", 2), "mass": ("<f8", 1), "fixed": ("u1", 1), "released": ("u1", 1)}
+	indexDtype = np.dtype([("frame", "<i8"), ("start", "<i8"), ("count", "<i8")])
+	mergeDtype = np.dtype([("frame", "<i8"), ("survivor", "<i8"), ("absorbed", "<i8")]) # ids of the bodies
+
+	# every is how many steps go between recorded frames, and flushEvery how many recorded frames go between flushes to disk
+	def __init__(self, path, sim = None, every = 1, flushEvery = 100):
+		self.path = path
+		self.every = every
+		self.flushEvery = flushEvery
+		os.makedirs(path, exist_ok = True)
+		with open(os.path.join(path, "meta.json"), "w") as f:
+			json.dump({"seed": None if sim is None else sim.seed.raw, "every": every,
+				"columns": {name: list(c) for name, c in Recorder.columns.items()}, "spf": Body.spf, "mpp": Body.mpp}, f)
+		# starting over if there was already a recording here
+		self.files = {name: open(os.path.join(path, name + ".bin"), "wb") for name in Recorder.columns}
+		self.index = open(os.path.join(path, "index.bin"), "wb")
+		self.merges = open(os.path.join(path, "merges.bin"), "wb")
+		self.rows = 0 # body rows written so far
+		self.frames = 0 # frames written so far
+		self.lastFrame = None # the last simulation frame seen
+		self.frameOffset = 0 # added to simulation frames and ids to give the recording's (they go up at every reset)
+		self.idOffset = 0
+		self.maxId = -1 # the highest id written so far
+
+	# Adds the simulation's current state (and the merges of its last step) to the recording, if it is on a recorded frame
+	def record(self, sim):
+		system = sim.system
+		if self.lastFrame is not None and sim.frame <= self.lastFrame:
+			# the simulation was reset (or went back some other way), so a new segment starts
+			self.frameOffset += self.lastFrame + 1 - sim.frame
+			self.idOffset = self.maxId + 1
+		self.lastFrame = sim.frame
+		frame = sim.frame + self.frameOffset
+		survivors, absorbed = sim.lastMerges
+		if len(absorbed) > 0:
+			events = np.zeros(len(absorbed), dtype = Recorder.mergeDtype)
+			events["frame"] = frame
+			events["survivor"] = system.id[survivors] + self.idOffset
+			events["absorbed"] = system.id[absorbed] + self.idOffset
+			events.tofile(self.merges)
+			self.maxId = max(self.maxId, int(events["survivor"].max()), int(events["absorbed"].max()))
+		if sim.frame % self.every != 0:
+			return
+		rows = system.liveRows()
+		for name, (dtype, _) in Recorder.columns.items():
+			values = getattr(system, name)[rows]
+			if name == "id":
+				values = values + self.idOffset
+				self.maxId = max(self.maxId, int(values.max()) if len(values) > 0 else -1)
+			values.astype(dtype).tofile(self.files[name])
+		np.array([(frame, self.rows, len(rows))], dtype = Recorder.indexDtype).tofile(self.index)
+		self.rows += len(rows)
+		self.frames += 1
+		if self.frames % self.flushEvery == 0:
+			self.flush()
+
+	def flush(self):
+		for f in list(self.files.values()) + [self.index, self.merges]:
+			f.flush()
+
+	def close(self):
+		self.flush()
+		for f in list(self.files.values()) + [self.index, self.merges]:
+			f.close()
+
+# A recording made by a Recorder, read through memory maps so only the frames that are looked at are loaded
+class Recording:
+	def __init__(self, path):
+		self.path = path
+		with open(os.path.join(path, "meta.json")) as f:
+			self.meta = json.load(f)
+		self.seed = self.meta["seed"]
+		self.refresh()
+
+	# Maps the files again (to see frames recorded since the recording was opened)
+	def refresh(self):
+		self.columns = {name: self.map(name + ".bin", np.dtype(dtype), width) for name, (dtype, width) in self.meta["columns"].items()}
+		self.mergeEvents = self.map("merges.bin", Recorder.mergeDtype)
+		# only the frames whose rows are in every column are used
+		index = self.map("index.bin", Recorder.indexDtype)
+		available = min(len(column) for column in self.columns.values())
+		self.index = index[:np.searchsorted(index["start"] + index["count"], available, side = "right")]
+		return self
+
+	def map(self, name, dtype, width = 1):
+		filename = os.path.join(self.path, name)
+		rows = os.path.getsize(filename)//(np.dtype(dtype).itemsize*width)
+		if rows == 0:
+			return np.zeros((0, width) if width > 1 else 0, dtype = dtype)
+		return np.memmap(filename, dtype = dtype, mode = "r", shape = (rows, width) if width > 1 else (rows,))
+
+	def frameCount(self):
+		return len(self.index)
+
+	# The frame that the k-th recorded frame was taken on (the simulation's frame, carried on past any resets)
+	def frameNumber(self, k):
+		return int(self.index["frame"][k])
+
+	# The recorded rows of the k-th recorded frame of a column
+	def column(self, name, k):
+		start, count = int(self.index["start"][k]), int(self.index["count"][k])
+		return self.columns[name][start:start + count]
+
+	# The merges that happened up to and including simulation frame 'frame', as an array of (frame, survivor, absorbed)
+	def mergesUntil(self, frame):
+		return self.mergeEvents[:np.searchsorted(self.mergeEvents["frame"], frame, side = "right")]
+
+	# The bodies of the k-th recorded frame as a BodySystem (which can be drawn like a live one)
+	# With trailLength, each body's trail is filled in with its positions over up to that many earlier recorded frames
+	def systemAt(self, k, trailLength = 0):
+		ids = np.asarray(self.column("id", k))
+		system = BodySystem(len(ids))
+		n = len(ids)
+		system.count = n
+		system.views = [None]*n
+		system.alive[:n] = True
+		system.id[:n] = ids
+		system.pos[:n] = self.column("pos", k)
+		system.vec[:n] = self.column("vec", k)
+		system.mass[:n] = self.column("mass", k)
+		system.fixed[:n] = self.column("fixed", k).astype(bool)
+		system.released[:n] = self.column("released", k).astype(bool)
+		system.displayRad[:n] = Body.findDisplayRadius(system.mass[:n])
+		system.nextId = int(ids.max()) + 1 if n > 0 else 0
+		if trailLength > 0 and n > 0:
+			system.resizeTrails(trailLength)
+			# ids only ever go up down the rows of a frame (rows keep the order bodies were added in), so they can be matched with a binary search
+			for j in range(max(0, k - trailLength), k):
+				pastIds = np.asarray(self.column("id", j))
+				at = np.minimum(np.searchsorted(pastIds, ids), len(pastIds) - 1)
+				present = np.flatnonzero(pastIds[at] == ids) if len(pastIds) > 0 else np.zeros(0, dtype = np.intp)
+				system.trail[present, system.trailCount[present] % trailLength] = self.column("pos", j)[at[present]]
+				system.trailCount[present] += 1
+		return system
+
+# Plays a Recording back in the viewer, handing out snapshots of the current frame like a PhysicsThread does
+# Seeking to a frame only reads that frame (and the frames of its trails), so it takes the same time anywhere in the recording
+class Replay:
+	def __init__(self, recording, trailLength = 0):
+		self.recording = recording
+		self.trailLength = trailLength
+		self.position = 0 # the recorded frame being shown
+		self.paused = False
+		self.stepsPerFrame = 1 # recorded frames moved forward per displayed frame
+		self.front = None
+		self.seek(0)
+
+	# Moves to the k-th recorded frame (kept within the recording)
+	def seek(self, k):
+		if k >= self.recording.frameCount() - 1:
+			# picking up frames recorded since the last look, when the recording is still being written
+			self.recording.refresh()
+		k = min(max(int(k), 0), max(self.recording.frameCount() - 1, 0))
+		if self.front is not None and k == self.position:
+			return self
+		self.position = k
+		if self.recording.frameCount() == 0:
+			self.front = Snapshot(BodySystem(), 0, 0.0)
+		else:
+			self.front = Snapshot(self.recording.systemAt(k, self.trailLength), self.recording.frameNumber(k), 0.0)
+		return self
+
+	# Moves forward by a displayed frame's worth of recorded frames (unless paused)
+	def advance(self):
+		if not self.paused:
+			self.seek(self.position + self.stepsPerFrame)
+		return self
+
+	def latest(self):
+		return self.front
@@ -0,0 +1,149 @@
+# agent
+# 10/18/2026
+
+import math
+import numpy as np
+import pygame
+from Body import Body
+from Diagnostics import Diagnostics
+from ParticleMesh import ParticleMesh
+
+# Draws the bodies of a BodySystem (or anything with the same arrays) through a Camera
+# Everything is mapped to the screen and culled as arrays before any pygame call is made, so only what can be seen gets drawn,
+# and bodies smaller than a pixel are collapsed into one pixel sprite per occupied pixel
+# Each draw function returns the screen rectangle it drew over (None if it drew nothing), for updating only that part of the display
+# Those that draw many things (drawBodies, drawTrails, drawSegments and drawPixels) return a list of rectangles instead, one for each
+# thing or small cluster of pixels, so that bodies spread over the screen do not make the whole of it dirty
+class Renderer:
+	lodRadius = 1 # bodies with a smaller radius than this on screen (pixels) are drawn as single pixels
+	pixelCluster = 16 # single pixels are reported as one rectangle per square of this many screen pixels that they fall in
+	densityCell = 4 # screen pixels per cell of the density heatmap
+	# the heatmap's colors, from the background (empty) through red and orange to white (densest)
+	densityColors = np.stack([np.interp(np.linspace(0, 1, 256), (0, 0.35, 0.7, 1), channel) for channel in \
+		((30, 200, 255, 255), (30, 30, 160, 255), (30, 20, 40, 255))], axis = 1).astype(np.uint8)
+
+	# rows are the rows of the system to draw
+	# with skipFixed, fixed bodies are left out (but not their vectors), for when they are already on a StaticLayer
+	@staticmethod
+	def drawBodies(screen, camera, system, rows, drawVec = False, drawGrav = False, drawAgg = False, drawTrail = False, skipFixed = False):
+		rects = []
+		if drawTrail:
+			rects += Renderer.drawTrails(screen, camera, system, rows)
+		pos, rad = system.pos[rows], system.displayRad[rows]
+		visible = camera.visible(pos, rad)
+		shown = rows[visible]
+		screenPos = camera.worldToScreen(pos[visible])
+		screenRad = rad[visible]*camera.zoom
+		fixed = system.fixed[shown]
+		if skipFixed:
+			screenPos, screenRad, fixed = screenPos[~fixed], screenRad[~fixed], fixed[~fixed]
+		big = screenRad >= Renderer.lodRadius
+		for p, r, f in zip(screenPos[big].tolist(), screenRad[big].tolist(), fixed[big].tolist()):
+			rects.append(pygame.draw.circle(screen, Body.fixedColor if f else Body.color, p, r))
+		rects += Renderer.drawPixels(screen, screenPos[~big], fixed[~big])
+		if drawVec:
+			moving = system.vec[rows]/Body.mpp/system.mass[rows, None]*Body.vectorDisplayFactor
+			rects += Renderer.drawSegments(screen, camera, Body.vecColor, pos, pos + moving)
+		# the individual gravity vectors are only drawn for the bodies on screen
+		if drawGrav:
+			for row in shown[np.isin(shown, system.gravSources)]:
+				gVecs = Body.findGravVecs(system, row)
+				if len(gVecs) > 0:
+					start = np.broadcast_to(system.pos[row], gVecs.shape)
+					rects += Renderer.drawSegments(screen, camera, Body.gravColor, start, start + gVecs/Body.spf/Body.mpp*Body.gravDisplayFactor)
+		if drawAgg:
+			agg = rows[np.isin(rows, system.gravSources)]
+			start = system.pos[agg]
+			rects += Renderer.drawSegments(screen, camera, Body.aggGravColor, start, \
+				start + system.grav[agg]/Body.spf/Body.mpp*Body.gravDisplayFactor)
+		return rects
+
+	# The smallest rectangle covering all of the given ones (None entries are skipped)
+	@staticmethod
+	def union(rects):
+		rects = [rect for rect in rects if rect is not None]
+		if len(rects) == 0:
+			return None
+		return rects[0].unionall(rects[1:])
+
+	# Draws a batch of world line segments, skipping the ones that are off screen or shorter than a pixel
+	@staticmethod
+	def drawSegments(screen, camera, color, start, end):
+		visible = camera.segmentsVisible(start, end) & (((end - start)**2).sum(axis = 1)*camera.zoom**2 >= 1)
+		return [pygame.draw.line(screen, color, a, b) for a, b in \
+			zip(camera.worldToScreen(start[visible]).tolist(), camera.worldToScreen(end[visible]).tolist())]
+
+	# Draws a world path (an array of points) as connected lines, unless none of it can be on screen
+	@staticmethod
+	def drawPath(screen, camera, color, points):
+		if len(points) < 2:
+			return None
+		left, top, right, bottom = camera.worldBounds()
+		low, high = points.min(axis = 0), points.max(axis = 0)
+		if high[0] < left or low[0] > right or high[1] < top or low[1] > bottom:
+			return None
+		return pygame.draw.lines(screen, color, False, camera.worldToScreen(points).tolist())
+
+	# Draws bodies that are smaller than a pixel, once per occupied pixel
+	@staticmethod
+	def drawPixels(screen, screenPos, fixed):
+		if len(screenPos) == 0:
+			return []
+		width, height = screen.get_size()
+		pixels = np.floor(screenPos).astype(np.int64)
+		inside = (pixels[:, 0] >= 0) & (pixels[:, 0] < width) & (pixels[:, 1] >= 0) & (pixels[:, 1] < height)
+		pixels, fixed = pixels[inside], fixed[inside]
+		if len(pixels) == 0:
+			return []
+		for isFixed in (False, True):
+			group = pixels[fixed == isFixed]
+			if len(group) == 0:
+				continue
+			group = np.unique(group, axis = 0)
+			color = screen.map_rgb(Body.fixedColor if isFixed else Body.color)
+			surfaceArray = pygame.surfarray.pixels2d(screen)
+			surfaceArray[group[:, 0], group[:, 1]] = color
+			del surfaceArray
+		# the box around the pixels in each cluster
+		size = Renderer.pixelCluster
+		clusters = pixels // size
+		keys = clusters[:, 0]*(height//size + 1) + clusters[:, 1]
+		unique, which = np.unique(keys, return_inverse = True)
+		low = np.full((len(unique), 2), np.iinfo(np.int64).max)
+		high = np.full((len(unique), 2), -1)
+		np.minimum.at(low, which, pixels)
+		np.maximum.at(high, which, pixels)
+		return [pygame.Rect(x0, y0, x1 - x0 + 1, y1 - y0 + 1) for (x0, y0), (x1, y1) in zip(low.tolist(), high.tolist())]
+
+	# Draws the trail of each of the rows whose trail crosses the screen
+	@staticmethod
+	def drawTrails(screen, camera, system, rows):
+		rects = [Renderer.drawPath(screen, camera, Body.trailColor, \
+			np.vstack((system.trailPoints(row, Body.max_trail_length), system.pos[row]))) for row in rows[system.trailCount[rows] > 0]]
+		return [rect for rect in rects if rect is not None]
+
+	# Draws the mass of the bodies as a heatmap over the screen instead of drawing each body (for when there are far too many to see)
+	# Mass is spread over the cells with the same cloud-in-cell weights the particle mesh uses, and colored on a log scale
+	@staticmethod
+	def drawDensity(screen, camera, system, rows):
+		width, height = screen.get_size()
+		cell = Renderer.densityCell
+		shape = (width//cell + 2, height//cell + 2)
+		# the cell corners are offset by half a cell, so that each cell's mass is drawn centered on where it was deposited
+		origin = camera.screenToWorld((-cell/2, -cell/2))
+		grid = ParticleMesh.deposit(system.pos[rows], system.mass[rows], origin, cell/camera.zoom, shape)
+		filled = grid > 0
+		if not filled.any():
+			return None
+		level = np.log1p(grid/grid[filled].min())
+		colors = Renderer.densityColors[(level*(255/level.max())).astype(np.intp)]
+		surface = pygame.transform.scale(pygame.surfarray.make_surface(colors), (shape[0]*cell, shape[1]*cell))
+		return screen.blit(surface, (0, 0))
+
+	@staticmethod
+	def drawCenterOfMass(screen, camera, system, rows):
+		centerOfMassPos, totalMass = Diagnostics.centerOfMass(system, rows)
+		if totalMass <= 0:
+			return None
+		centerOfMassRad = (3*(totalMass/Body.density)/(4*math.pi))**(1/3)/Body.mpp
+		return pygame.draw.circle(screen, Body.centerOfMassColor, camera.worldToScreen(centerOfMassPos).tolist(), centerOfMassRad*camera.zoom)
@@ -0,0 +1,103 @@
+# agent
+# 10/18/2026
+
+import json
+import os
+import numpy as np
+from Body import Body
+
+# The starting bodies of a run (and how to draw them), saved in one binary file that is read through memory maps
+# The file is a magic string, the length of a JSON header, the header, and then one array per column, each starting on a multiple of
+# 'alignment' bytes so that it can be mapped straight from the file
+# The header holds the units the bodies were saved in, the display settings, the seed, and where each column is and its dtype and shape
+# Positions and radii are in pixels of the saved meters per pixel (they are scaled when it is not Body.mpp), and masses (kg) and
+# momenta (kg*m/s) do not depend on the units
+class Scenario:
+	magic = b"ORBITSCN"
+	version = 1
+	alignment = 64
+	# name: (dtype, values per row)
+	columns = {"pos": ("<f8", 2), "vec": ("<f8", 2), "mass": ("<f8", 1), "displayRad": ("<f8", 1), "fixed": ("u1", 1), "released": ("u1", 1)}
+	# the display settings, in the order Gravity.py keeps them
+	displayNames = ("vectors", "gravity", "netGravity", "trails", "centerOfMass")
+
+	def __init__(self, path):
+		self.path = path
+		with open(path, "rb") as f:
+			if f.read(len(Scenario.magic)) != Scenario.magic:
+				raise ValueError("{} is not a scenario file".format(path))
+			length = int(np.frombuffer(f.read(8), dtype = "<u8")[0])
+			self.header = json.loads(f.read(length).decode())
+		if self.header["version"] != Scenario.version:
+			raise ValueError("Unsupported scenario version {} in {}".format(self.header["version"], path))
+		self.count = self.header["count"]
+		self.seed = self.header["seed"]
+		self.units = self.header["units"]
+		self.display = self.header["display"]
+		self.arrays = {name: self.map(column) for name, column in self.header["columns"].items()}
+
+	def map(self, column):
+		if self.count == 0:
+			return np.zeros(column["shape"], dtype = column["dtype"])
+		return np.memmap(self.path, dtype = column["dtype"], mode = "r", offset = column["offset"], shape = tuple(column["shape"]))
+
+	# The display settings as Gravity.py's list of flags
+	def displayInfo(self):
+		return [bool(self.display.get(name, False)) for name in Scenario.displayNames]
+
+	# The bodies as arrays of (positions, momenta, masses, radii, fixed, released) in the current units
+	# The arrays are the mapped columns themselves when nothing needs converting, so they should be copied before being changed
+	def bodies(self):
+		scale = self.units["mpp"]/Body.mpp
+		pos, rad = self.arrays["pos"], self.arrays["displayRad"]
+		if scale != 1:
+			pos, rad = pos*scale, rad*scale
+		return pos, self.arrays["vec"], self.arrays["mass"], rad, self.arrays["fixed"].view(bool), self.arrays["released"].view(bool)
+
+	# Saves the live bodies of a Simulation (display is a dictionary of the displayNames to draw, or Gravity.py's list of flags)
+	# The file is written next to the old one and then moved over it, so a scenario is never left half written
+	@staticmethod
+	def save(path, sim, display = None):
+		system = sim.system
+		rows = system.liveRows()
+		if display is None:
+			display = {}
+		elif not isinstance(display, dict):
+			display = dict(zip(Scenario.displayNames, display))
+		arrays = {"pos": system.pos[rows], "vec": system.vec[rows], "mass": system.mass[rows], "displayRad": system.displayRad[rows], \
+			"fixed": system.fixed[rows], "released": system.released[rows]}
+		header = {"version": Scenario.version, "count": len(rows), "seed": sim.seed.raw, "units": {"mpp": Body.mpp, "spf": Body.spf},
+			"display": {name: bool(display.get(name, False)) for name in Scenario.displayNames}, "columns": {}}
+		# the offsets depend on the length of the header, which depends on the offsets, so they are worked out again until the
+		# header they are written into is as long as the one they were worked out from
+		prefix = len(Scenario.magic) + 8
+		while True:
+			headerBytes = json.dumps(header).encode()
+			offset = Scenario.aligned(prefix + len(headerBytes))
+			for name, (dtype, width) in Scenario.columns.items():
+				shape = [len(rows), width] if width > 1 else [len(rows)]
+				header["columns"][name] = {"dtype": dtype, "shape": shape, "offset": offset}
+				offset = Scenario.aligned(offset + len(rows)*width*np.dtype(dtype).itemsize)
+			if len(json.dumps(header).encode()) == len(headerBytes):
+				break
+		headerBytes = json.dumps(header).encode()
+		directory = os.path.dirname(os.path.abspath(path))
+		temp = os.path.join(directory, ".{}.{}.tmp".format(os.path.basename(path), os.getpid()))
+		try:
+			with open(temp, "wb") as f:
+				f.write(Scenario.magic)
+				f.write(np.array(len(headerBytes), dtype = "<u8").tobytes())
+				f.write(headerBytes)
+				for name, (dtype, width) in Scenario.columns.items():
+					f.write(b"\0"*(header["columns"][name]["offset"] - f.tell()))
+					np.ascontiguousarray(arrays[name], dtype = dtype).tofile(f)
+			os.replace(temp, path)
+		finally:
+			if os.path.exists(temp):
+				os.remove(temp)
+		return path
+
+	# The first multiple of 'alignment' at or after n
+	@staticmethod
+	def aligned(n):
+		return -(-n//Scenario.alignment)*Scenario.alignment
@@ -13,16 +13,14 @@ class Seed:
 			seed = Seed.generateRandom()
 		self.raw = seed
 		self.seed = Seed.parse(seed)
+	# the number made by writing out each character of the seed (digits as themselves and anything else as its character code)
 	@ staticmethod
 	def parse(seedString):
-		numString = ""
-		for i in range(len(seedString)):
-			intVal = seedString[i] if seedString[i].isdigit() else str(ord(seedString[i]))
-			numString += intVal
-		return int(numString)
+		return int("".join(c if c.isdigit() else str(ord(c)) for c in seedString))
+	# rng can be a random.Random, so that seeds can be generated reproducibly
 	@staticmethod
-	def generateRandom():
+	def generateRandom(rng = random):
 		seedString = ""
 		for i in range(Seed.length):
-			seedString += chr(Seed.components[random.randint(0, len(Seed.components)-1)])
+			seedString += chr(Seed.components[rng.randint(0, len(Seed.components)-1)])
 		return seedString
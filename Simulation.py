@@ -0,0 +1,407 @@
+# agent
+# 10/18/2026
+
+import math
+import random
+import numpy as np
+from Body import Body
+from BodySystem import BodySystem
+from Diagnostics import Diagnostics
+from Integrator import Integrator
+from Kernels import Kernels
+from Profiler import Profiler
+from Seed import Seed
+
+# The physics of a run, without any drawing (so it does not need pygame or tkinter)
+# Bodies live in the simulation's BodySystem, and 'bodies' gives Body views of the ones that are still around
+class Simulation:
+	screenWidth = 800
+	screenHeight = 800
+
+	randomNumBodies = 120
+	randomMassRange = (8*10**22, 4*10**23)
+
+	# the presets (the same values as the options in the preset dialog)
+	NONE, RANDOM, CIRCULAR_ORBIT, OSCILLATION = 0, 1, 2, 3
+
+	# seed can be a Seed, a seed string, or None (for a random one)
+	# srf is the surface that the body views draw onto (None when running headless)
+	# integrator is an Integrator or the name of one ("euler" is the original scheme)
+	def __init__(self, seed = None, srf = None, integrator = "euler"):
+		self.seed = seed if isinstance(seed, Seed) else Seed(seed)
+		self.rng = random.Random(self.seed.seed)
+		self.srf = srf
+		self.system = BodySystem()
+		self.frame = 0
+		self.recordTrails = False # whether the bodies' trails are recorded
+		self.lastMerges = (np.zeros(0, dtype = np.intp), np.zeros(0, dtype = np.intp)) # rows of (survivors, absorbed) from the last step
+		self.initialState = None
+		self.integrator = Integrator.named(integrator) if isinstance(integrator, str) else integrator
+		# when true, the total energy is found after every step, and how much it changed is kept in
+		# energyError (relative change over the last step) and energyDrift (relative change since the start or the last merge)
+		self.trackEnergy = False
+		self.energy = None
+		self.energyReference = None
+		self.energyError = 0.0
+		self.energyDrift = 0.0
+		self.recorder = None # a Recorder that every step is written to (None when the run is not being recorded)
+		self.streamer = None # a StreamServer that every step is published to (None when the run is not being streamed)
+		self.streams = [] # the StateStreams of the running stream() generators, which every step's merges are collected into
+		self.diagnostics = None # a Diagnostics that checks the conserved quantities every few frames (None when they are not being checked)
+		self._bodies = None
+
+	# Body views of every body that is still in the simulation (in the order they were added)
+	@property
+	def bodies(self):
+		if self._bodies is None:
+			self._bodies = [Body.viewOf(self.system, row, self.srf) for row in self.system.liveRows()]
+		return self._bodies
+
+	# Adds a body and returns its view
+	def addBody(self, pos, vec, mass, released = False, fixed = False):
+		body = Body(pos, vec, mass, self.srf, released, fixed, system = self.system)
+		if self._bodies is not None:
+			self._bodies.append(body)
+		return body
+
+	# Removes every body
+	def clear(self):
+		self.system.remove(self.system.liveRows())
+		self.system.compact()
+		self._bodies = None
+		return self
+
+	# PRESETS
+	def loadPreset(self, presetVal, numBodies = None):
+		self.clear()
+		self.frame = 0
+		# random
+		if presetVal == Simulation.RANDOM:
+			self.generateRandomBodies(Simulation.randomNumBodies if numBodies is None else int(numBodies), Simulation.randomMassRange)
+		# circular orbit (Earth and moon)
+		elif presetVal == Simulation.CIRCULAR_ORBIT:
+			dist = 384.4
+			mass1, mass2 = 5.972*10**24, 7.3477*10**22
+			magnitude2 = math.sqrt((Body.G*(mass1+mass2))/(dist*Body.mpp))*mass2
+			pos1 = (400, 400)
+			pos2 = (pos1[0]+dist, pos1[1])
+			angle2 = Body.findRadianAngleFromCoords(pos1, pos2) + math.pi/2
+			self.addBody((400, 400), [0, 0], mass1, released = True, fixed = True)
+			self.addBody((400+dist, 400), Body.findVectorFromMagnitudeAndAngle(magnitude2, angle2), mass2, released = True)
+		# oscellation
+		elif presetVal == Simulation.OSCILLATION:
+			oscMass = 500 * 10**24
+			self.addBody((200, 400), [0, 0], oscMass, released = True, fixed = True)
+			self.addBody((600, 400), [0, 0], oscMass, released = True, fixed = True)
+			self.addBody((400, 100), [0, 0], 3 * 10**24, released = True)
+		self.markInitialState()
+		return self
+
+	# planet formation
+	# the numbers are drawn in the same order as when each body was added on its own, so a seed still gives the same bodies
+	def generateRandomBodies(self, numBodies, massRange):
+		values = [(self.rng.randint(0, Simulation.screenWidth), self.rng.randint(0, Simulation.screenHeight), \
+			self.rng.randint(massRange[0], massRange[1])) for _ in range(numBodies)]
+		values = np.array(values, dtype = float).reshape(-1, 3)
+		# radii worked out one at a time like Body.setMass does (NumPy's power can differ from Python's in the last bit)
+		radii = [Body.findDisplayRadius(mass) for mass in values[:, 2].tolist()]
+		self.system.addMany(values[:, :2], 0, values[:, 2], radii, released = True)
+		self._bodies = None
+		return self
+
+	# Loads bodies made by one of the generators in InitialConditions (box, disk, plummer or rings) from the simulation's seed
+	# params are passed on to the generator, and workers is how many threads make the bodies (the bodies are the same either way)
+	def loadGenerated(self, name, numBodies, workers = None, **params):
+		from InitialConditions import InitialConditions
+		self.clear()
+		self.frame = 0
+		pos, vec, mass = InitialConditions.generate(name, self.seed, numBodies, workers, **params)
+		self.system.addMany(pos, vec, mass, Body.findDisplayRadius(mass), released = True)
+		self._bodies = None
+		self.markInitialState()
+		return self
+
+	# Loads the bodies of a Scenario (see Scenario.py), copied straight from its mapped columns
+	def loadScenario(self, scenario):
+		self.clear()
+		self.frame = 0
+		pos, vec, mass, rad, fixed, released = scenario.bodies()
+		self.system.addMany(pos, vec, mass, rad, released, fixed)
+		self._bodies = None
+		self.markInitialState()
+		return self
+
+	# Remembers the current state as the one that reset goes back to
+	def markInitialState(self):
+		self.initialState = self.getState(initial = False)
+		return self
+
+	# Goes back to the state saved by markInitialState (bodies added since then are dropped, merged bodies come back,
+	# and the frame, random numbers and integrator go back too)
+	def reset(self):
+		if self.initialState is None:
+			self.clear()
+			self.frame = 0
+			return self
+		return self.setState(self.initialState)
+
+	# Everything needed to carry on the run exactly from where it is (Checkpoint saves these to files)
+	# The settings of the run (recordTrails, trackEnergy, the recorder) are not part of it
+	def getState(self, initial = True):
+		rngVersion, rngState, rngGauss = self.rng.getstate()
+		state = {
+			"system": self.system.getState(),
+			"frame": self.frame,
+			"seed": self.seed.raw,
+			"rng": {"version": rngVersion, "state": np.array(rngState, dtype = np.int64), "gauss": rngGauss},
+			"integrator": self.integrator.getState(),
+			"lastMerges": {"survivors": self.lastMerges[0].copy(), "absorbed": self.lastMerges[1].copy()},
+			"energy": {"energy": self.energy, "reference": self.energyReference, "error": self.energyError, "drift": self.energyDrift},
+		}
+		if initial and self.initialState is not None:
+			state["initialState"] = self.initialState
+		return state
+
+	# Puts the simulation in a state from getState
+	# The bodies go into a new BodySystem, so views of the old bodies are left out of the simulation (like removed bodies)
+	def setState(self, state):
+		self.system = BodySystem.fromState(state["system"])
+		self._bodies = None
+		self.frame = int(state["frame"])
+		self.seed = Seed(state["seed"])
+		rng = state["rng"]
+		self.rng.setstate((int(rng["version"]), tuple(int(v) for v in rng["state"]), rng["gauss"]))
+		self.integrator = Integrator.fromState(state["integrator"])
+		self.lastMerges = (np.asarray(state["lastMerges"]["survivors"], dtype = np.intp), np.asarray(state["lastMerges"]["absorbed"], dtype = np.intp))
+		energy = state["energy"]
+		self.energy, self.energyReference, self.energyError, self.energyDrift = energy["energy"], energy["reference"], energy["error"], energy["drift"]
+		if "initialState" in state:
+			self.initialState = state["initialState"]
+		return self
+
+	# Advances the simulation by n frames (stopping early if the diagnostics raise an alarm and are set to stop the run)
+	def step(self, n = 1):
+		system = self.system
+		for _ in range(n):
+			if self.halted():
+				break
+			if self.recordTrails:
+				with Profiler.phase("trails"):
+					self.appendTrails()
+			# the energy is found from the potential of the step's gravity pass where it can be
+			system.wantPotential = self.trackEnergy or (self.diagnostics is not None and self.diagnostics.due(self.frame + 1))
+			# the integrator's own work (gravity and collisions are timed as phases of their own)
+			with Profiler.phase("update"):
+				self.integrator.step(self)
+			self.frame += 1
+			Profiler.count("steps")
+			if self.trackEnergy:
+				with Profiler.phase("energy"):
+					self.updateEnergy()
+			if self.diagnostics is not None:
+				with Profiler.phase("diagnostics"):
+					self.diagnostics.update(self)
+			# recording before compacting, since the merges are kept as rows
+			if self.recorder is not None:
+				with Profiler.phase("record"):
+					self.recorder.record(self)
+			if self.streamer is not None:
+				with Profiler.phase("stream"):
+					self.streamer.publish(self)
+			for stream in self.streams:
+				stream.collect(self)
+			# dropping the rows of absorbed bodies once they are the majority
+			if 2*len(system.liveRows()) < system.count:
+				system.compact()
+		return self
+
+	# Whether the diagnostics have raised an alarm and stopped the run (it does not step any further)
+	def halted(self):
+		return self.diagnostics is not None and self.diagnostics.halted
+
+	# Runs the simulation, yielding its state every 'every' frames (for the given number of frames, or for good when frames is None)
+	# Each state is a full snapshot, or with deltas only what changed since the one before (see StateStream), starting with a snapshot
+	# The simulation only moves on when the next state is asked for, and the stream ends early if the diagnostics stop the run
+	def stream(self, every = 1, deltas = False, frames = None):
+		from Stream import StateStream
+		stream = StateStream()
+		yield stream.message(self)
+		end = None if frames is None else self.frame + frames
+		# the merges are collected by step, before the rows they are kept as can be moved by compacting
+		self.streams.append(stream)
+		try:
+			while (end is None or self.frame < end) and not self.halted():
+				self.step()
+				# the frame the run stopped on is always sent
+				if self.frame % every == 0 or self.halted():
+					message = stream.message(self)
+					yield message if deltas else stream.snapshot
+		finally:
+			self.streams.remove(stream)
+
+	# Handles collisions between the bodies (called by the integrator once the bodies have moved)
+	def collide(self):
+		self.lastMerges = Body.collideSystem(self.system, self.system.liveRows())
+		if len(self.lastMerges[1]) > 0:
+			self._bodies = None
+
+	# The total (kinetic + potential) energy of the released bodies (J)
+	def findEnergy(self):
+		return Diagnostics.measure(self.system)["energy"]
+
+	def updateEnergy(self):
+		energy = self.findEnergy()
+		previous = self.energy
+		# merges are inelastic, so the drift is measured again from the first step after one
+		if previous is None or len(self.lastMerges[1]) > 0:
+			self.energyReference = energy
+			self.energyError = 0.0
+		else:
+			self.energyError = (energy - previous)/abs(previous) if previous != 0 else 0.0
+		self.energy = energy
+		self.energyDrift = (energy - self.energyReference)/abs(self.energyReference) if self.energyReference != 0 else 0.0
+
+	# Runs for the given number of frames (as fast as possible)
+	def run(self, frames):
+		return self.step(frames)
+
+	# Adds the current position of each body to its trail
+	def appendTrails(self):
+		self.system.appendTrails(self.system.liveRows(), Body.max_trail_length)
+
+# Runs a preset headless for a number of frames
+if __name__ == "__main__":
+	import argparse
+	import time
+	import warnings
+	from Recorder import Recorder
+	from Checkpoint import Checkpoint
+	from Scenario import Scenario
+	from Stream import StreamServer
+	parser = argparse.ArgumentParser(description = "Run an orbit simulation without a window")
+	parser.add_argument("--preset", type = int, default = Simulation.RANDOM, \
+		help = "0: none, 1: random (0 momentum), 2: circular orbit, 3: oscellation")
+	parser.add_argument("--bodies", type = int, default = Simulation.randomNumBodies, help = "number of bodies for the random preset")
+	parser.add_argument("--seed", default = None, help = "seed string for the random preset")
+	parser.add_argument("--generator", choices = ["box", "disk", "plummer", "rings"], default = None, \
+		help = "make the bodies with this generator from InitialConditions.py (instead of loading a preset)")
+	parser.add_argument("--workers", type = int, default = None, help = "threads used by the generator")
+	parser.add_argument("--scenario", default = None, help = "load the bodies from this scenario file (see Scenario.py) instead of a preset")
+	parser.add_argument("--save-scenario", default = None, help = "save the starting bodies to this scenario file (with --frames 0, just make it)")
+	parser.add_argument("--frames", type = int, default = 500)
+	parser.add_argument("--gravity", choices = ["direct", "tree", "pm"], default = None, \
+		help = "how gravity is found (by default the checkpoint's when resuming, or {})".format(Body.gravityMode))
+	parser.add_argument("--theta", type = float, default = None, \
+		help = "Barnes-Hut opening angle (by default the checkpoint's when resuming, or {})".format(Body.theta))
+	parser.add_argument("--fixed-field", action = "store_true", help = "read the pull of fixed bodies from a cached field instead of summing it every frame")
+	parser.add_argument("--precision", choices = ["float64", "float32"], default = None, \
+		help = "float32 sums gravity faster and stores derived values in half the memory, at the cost of accuracy (by default the checkpoint's when resuming)")
+	parser.add_argument("--kernels", choices = ["auto", "numpy"], default = Kernels.backend, help = "\"auto\" uses the compiled kernels when numba is installed")
+	parser.add_argument("--integrator", choices = ["euler", "leapfrog", "yoshida", "rk45", "block"], default = "euler")
+	parser.add_argument("--tolerance", type = float, default = None, help = "error tolerance per frame for the integrator")
+	parser.add_argument("--spf", type = float, default = None, help = "seconds per frame (by default the checkpoint's or scenario's, or {})".format(Body.spf))
+	parser.add_argument("--energy", action = "store_true", help = "report the energy error")
+	parser.add_argument("--diagnostics", type = int, default = None, metavar = "EVERY", \
+		help = "check the energy, momentum and angular momentum every this many frames, and report when they drift")
+	parser.add_argument("--max-energy-drift", type = float, default = Diagnostics.maxEnergyDrift)
+	parser.add_argument("--max-momentum-drift", type = float, default = Diagnostics.maxMomentumDrift)
+	parser.add_argument("--max-angular-drift", type = float, default = Diagnostics.maxAngularDrift)
+	parser.add_argument("--stop-on-drift", action = "store_true", help = "stop the run at the first drift alarm")
+	parser.add_argument("--profile", default = None, help = "time each phase of every frame and write the trace to this .csv or .json file")
+	parser.add_argument("--record", default = None, help = "record the run into this folder (it can be replayed with Gravity.py --replay)")
+	parser.add_argument("--record-every", type = int, default = 1, help = "frames between recorded frames")
+	parser.add_argument("--stream", type = int, default = None, metavar = "PORT", help = "serve the state of the run on this local port")
+	parser.add_argument("--stream-every", type = int, default = 1, help = "frames between streamed states")
+	parser.add_argument("--stream-format", choices = ["ndjson", "binary"], default = "ndjson")
+	parser.add_argument("--stream-wait", action = "store_true", help = "wait for a subscriber before starting")
+	parser.add_argument("--checkpoint", default = None, \
+		help = "save the state to this file every --checkpoint-every frames and at the end ({frame} in it is replaced by the frame)")
+	parser.add_argument("--checkpoint-every", type = int, default = 1000)
+	parser.add_argument("--resume", default = None, \
+		help = "carry on from this checkpoint (with a {frame} field, from the latest one) instead of loading a preset")
+	args = parser.parse_args()
+	scenario = Scenario(args.scenario) if args.scenario else None
+	resumePath = None
+	if args.resume:
+		resumePath = Checkpoint.latest(args.resume)
+		if resumePath is None:
+			parser.error("no checkpoint found at {}".format(args.resume))
+	# a checkpoint carries on with the physics it was saved with, so settings given for it have to match
+	saved = Checkpoint.savedSettings(resumePath) if resumePath is not None else None
+	if saved is not None:
+		for flag, name in (("gravity", "gravityMode"), ("theta", "theta"), ("precision", "precision"), ("spf", "spf")):
+			if getattr(args, flag) is not None and getattr(args, flag) != saved[name]:
+				parser.error("--{} {} does not match the {} that {} was saved with".format(flag, getattr(args, flag), saved[name], resumePath))
+	if args.spf is None:
+		args.spf = scenario.units["spf"] if scenario is not None else Body.spf
+	Body.gravityMode = Body.gravityMode if args.gravity is None else args.gravity
+	Body.theta = Body.theta if args.theta is None else args.theta
+	Body.spf = args.spf
+	Kernels.backend = args.kernels
+	Body.cacheFixedField = args.fixed_field
+	BodySystem.precision = BodySystem.precision if args.precision is None else args.precision
+	# the tree and particle mesh always work in float64
+	if BodySystem.precision == "float32" and Body.gravityMode != "direct":
+		warnings.warn("--precision float32 only changes how direct gravity is summed, so with --gravity {} it only halves the memory of the stored values".format(Body.gravityMode))
+	if resumePath is not None:
+		sim = Checkpoint.load(resumePath)
+		print("Resuming from frame {} of {}".format(sim.frame, resumePath))
+	else:
+		seed = args.seed or (scenario.seed if scenario is not None else None)
+		sim = Simulation(seed[:Seed.length] if seed else None, integrator = Integrator.named(args.integrator, args.tolerance))
+		if scenario is not None:
+			sim.loadScenario(scenario)
+		elif args.generator is not None:
+			sim.loadGenerated(args.generator, args.bodies, args.workers)
+		else:
+			sim.loadPreset(args.preset, args.bodies)
+	if args.save_scenario:
+		print("Scenario saved to {}".format(Scenario.save(args.save_scenario, sim)))
+	sim.trackEnergy = args.energy
+	if args.diagnostics is not None:
+		sim.diagnostics = Diagnostics(args.diagnostics, args.max_energy_drift, args.max_momentum_drift, args.max_angular_drift, args.stop_on_drift)
+	if args.record:
+		sim.recorder = Recorder(args.record, sim, args.record_every)
+		sim.recorder.record(sim)
+	if args.stream is not None:
+		sim.streamer = StreamServer(args.stream, format = args.stream_format, every = args.stream_every)
+		if args.stream_wait:
+			print("Waiting for a subscriber on port {}".format(sim.streamer.port))
+			sim.streamer.waitForSubscriber()
+	profiler = Profiler().start() if args.profile else None
+	startFrame = sim.frame
+	startTime = time.perf_counter()
+	if profiler is None and args.checkpoint is None:
+		sim.run(args.frames)
+	else:
+		for _ in range(args.frames):
+			sim.step()
+			if sim.halted():
+				break
+			if profiler is not None:
+				profiler.endFrame(len(sim.system.liveRows()))
+			if args.checkpoint is not None and sim.frame % args.checkpoint_every == 0:
+				Checkpoint.save(sim, args.checkpoint.format(frame = sim.frame))
+	elapsed = time.perf_counter() - startTime
+	if sim.recorder is not None:
+		sim.recorder.close()
+	if sim.streamer is not None:
+		sim.streamer.close()
+	if args.checkpoint is not None:
+		print("Checkpoint saved to {}".format(Checkpoint.save(sim, args.checkpoint.format(frame = sim.frame))))
+	print("Seed: {}".format(sim.seed.raw))
+	print("Frames: {} in {:.3f} s ({:.1f} frames/s)".format(sim.frame, elapsed, (sim.frame - startFrame)/elapsed if elapsed > 0 else float("inf")))
+	print("Bodies: {}".format(len(sim.system.liveRows())))
+	if args.energy:
+		print("Energy error: {:.3e} over the last frame, {:.3e} in total".format(sim.energyError, sim.energyDrift))
+	if sim.diagnostics is not None:
+		print("Drift: " + ", ".join("{} {:.3e}".format(quantity, drift) for quantity, drift in sim.diagnostics.drift.items()))
+		for alarm in sim.diagnostics.alarms:
+			print("ALARM {}".format(alarm))
+		if sim.diagnostics.halted:
+			print("Stopped early at frame {}".format(sim.frame))
+	if profiler is not None:
+		print("{:<16}{:>8}{:>8}{:>8}".format("", "p50", "p95", "p99"))
+		for line in profiler.overlayLines():
+			print(line)
+		print("Trace written to {}".format(profiler.stop().write(args.profile)))
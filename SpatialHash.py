@@ -0,0 +1,124 @@
+# agent
+# 10/18/2026
+
+import numpy as np
+
+# Uniform grid broad phase
+# Positions are hashed into square cells, and only bodies in the same or neighboring cells are paired up,
+# so finding everything that is close costs roughly O(n log n) instead of O(n^2)
+class SpatialHash:
+	# the cell itself and the neighbors "after" it (so each pair of cells is only visited once)
+	neighborOffsets = [(0, 0), (1, -1), (1, 0), (1, 1), (0, 1)]
+
+	# Returns two arrays (i, j), with i < j, of every pair of positions that may be within cellSize of each other
+	# Every pair that really is within cellSize is included (along with some that are farther apart)
+	@staticmethod
+	def candidatePairs(pos, cellSize):
+		return SpatialHash.concatenate(SpatialHash.candidatePairChunks(pos, cellSize))
+
+	# The pairs of candidatePairs, a chunk of at most about maxPairs at a time (all at once when it is None),
+	# so that the work done on them never needs temporaries bigger than that
+	@staticmethod
+	def candidatePairChunks(pos, cellSize, maxPairs = None):
+		n = len(pos)
+		if n < 2:
+			return
+		cells = np.floor(pos / cellSize).astype(np.int64)
+		cells -= cells.min(axis = 0)
+		# leaving a spare column on each side of y so that neighbor offsets never wrap onto another x column
+		cells[:, 1] += 1
+		width = int(cells[:, 1].max()) + 2
+		keys = cells[:, 0] * width + cells[:, 1]
+		order = np.argsort(keys, kind = 'stable')
+		sortedKeys = keys[order]
+		for dx, dy in SpatialHash.neighborOffsets:
+			target = sortedKeys + dx*width + dy
+			lo = np.searchsorted(sortedKeys, target, 'left')
+			hi = np.searchsorted(sortedKeys, target, 'right')
+			if dx == 0 and dy == 0:
+				# only pairing with the bodies later in the same cell
+				lo = np.arange(n) + 1
+			counts = np.maximum(hi - lo, 0)
+			for first, last in SpatialHash.chunkRanges(counts, maxPairs):
+				i, j = SpatialHash.expand(np.arange(first, last), lo[first:last], counts[first:last])
+				i, j = order[i], order[j]
+				yield np.minimum(i, j), np.maximum(i, j)
+
+	# Returns two arrays (q, j) pairing each of the query positions with every one of pos that may be within cellSize of it
+	# Only pos is hashed, and each query looks in its own cell and the eight around it, so a few queries with a large
+	# cellSize cost about as much as the bodies near them instead of every body
+	@staticmethod
+	def queryPairs(queries, pos, cellSize):
+		return SpatialHash.concatenate(SpatialHash.queryPairChunks(queries, pos, cellSize))
+
+	# The pairs of queryPairs, a chunk of at most about maxPairs at a time, like candidatePairChunks
+	@staticmethod
+	def queryPairChunks(queries, pos, cellSize, maxPairs = None):
+		if len(queries) == 0 or len(pos) == 0:
+			return
+		origin = np.minimum(queries.min(axis = 0), pos.min(axis = 0))
+		cells = np.floor((pos - origin) / cellSize).astype(np.int64)
+		queryCells = np.floor((queries - origin) / cellSize).astype(np.int64)
+		# a spare column on each side of y, as in candidatePairs
+		cells[:, 1] += 1
+		queryCells[:, 1] += 1
+		width = int(max(cells[:, 1].max(), queryCells[:, 1].max())) + 2
+		keys = cells[:, 0] * width + cells[:, 1]
+		queryKeys = queryCells[:, 0] * width + queryCells[:, 1]
+		order = np.argsort(keys, kind = 'stable')
+		sortedKeys = keys[order]
+		for dx in (-1, 0, 1):
+			for dy in (-1, 0, 1):
+				target = queryKeys + dx*width + dy
+				lo = np.searchsorted(sortedKeys, target, 'left')
+				hi = np.searchsorted(sortedKeys, target, 'right')
+				counts = hi - lo
+				for first, last in SpatialHash.chunkRanges(counts, maxPairs):
+					q, j = SpatialHash.expand(np.arange(first, last), lo[first:last], counts[first:last])
+					yield q, order[j]
+
+	# Pairs each of 'items' with the counts[k] sorted positions starting at lo[k]
+	@staticmethod
+	def expand(items, lo, counts):
+		total = int(counts.sum())
+		offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+		return np.repeat(items, counts), np.repeat(lo, counts) + offsets
+
+	# Splits items into runs (first, last) whose counts add up to at most about maxPairs (one run when it is None)
+	@staticmethod
+	def chunkRanges(counts, maxPairs):
+		if maxPairs is None or len(counts) == 0:
+			return [(0, len(counts))]
+		ends = np.cumsum(counts)
+		bounds = np.searchsorted(ends, np.arange(maxPairs, int(ends[-1]), maxPairs), 'right')
+		bounds = np.unique(np.concatenate(([0], bounds, [len(counts)])))
+		return list(zip(bounds[:-1], bounds[1:]))
+
+	# Joins chunks of pairs back into two arrays
+	@staticmethod
+	def concatenate(chunks):
+		chunks = list(chunks)
+		if len(chunks) == 0:
+			return np.zeros(0, dtype = np.intp), np.zeros(0, dtype = np.intp)
+		return np.concatenate([a for a, _ in chunks]), np.concatenate([b for _, b in chunks])
+
+	# Groups items connected by the given edges (a, b), returning a label for each item
+	# Every item in a group ends up with the same label (the smallest item in the group)
+	@staticmethod
+	def connectedLabels(n, a, b):
+		labels = np.arange(n)
+		if len(a) == 0:
+			return labels
+		while True:
+			low = np.minimum(labels[a], labels[b])
+			previous = labels.copy()
+			np.minimum.at(labels, a, low)
+			np.minimum.at(labels, b, low)
+			# pointer jumping, so that long chains collapse quickly
+			while True:
+				jumped = labels[labels]
+				if np.array_equal(jumped, labels):
+					break
+				labels = jumped
+			if np.array_equal(labels, previous):
+				return labels
@@ -0,0 +1,228 @@
+# agent
+# 10/18/2026
+
+import collections
+import json
+import socket
+import struct
+import threading
+import numpy as np
+from Recorder import Recorder
+
+# Turns the state of a running Simulation into messages for other programs
+# A message is a full snapshot of the bodies, or a delta with only the bodies that changed since the last message,
+# the ids of the ones that are gone, and the merges in between
+# Messages are dictionaries: {"type": "snapshot" or "delta", "frame", "bodies": {column: array}, "removed": ids, "merges": (k, 3) array}
+# where the columns are those of a recording (see Recorder.columns) and each merge is (frame, survivor id, absorbed id)
+class StateStream:
+	def __init__(self):
+		self.previous = None # the columns of the last message (None before the first)
+		self.merges = [] # (k, 3) arrays of the merges since the last message
+		self.snapshot = None # the last message as a full snapshot
+
+	# Keeps the merges of the simulation's last step (called after every step, so the merges between messages are not lost)
+	def collect(self, sim):
+		survivors, absorbed = sim.lastMerges
+		if len(absorbed) > 0:
+			ids = sim.system.id
+			self.merges.append(np.stack((np.full(len(absorbed), sim.frame), ids[survivors], ids[absorbed]), axis = 1).astype("<i8"))
+
+	# Starts over, so that the next message is a snapshot
+	def reset(self):
+		self.previous = None
+		self.merges = []
+		return self
+
+	# The simulation's current state as a delta against the last message (a snapshot if there was none)
+	# The same state as a snapshot is left in 'snapshot'
+	def message(self, sim):
+		system = sim.system
+		rows = system.liveRows()
+		current = {name: getattr(system, name)[rows].astype(dtype) for name, (dtype, _) in Recorder.columns.items()}
+		merges = np.concatenate(self.merges) if self.merges else np.zeros((0, 3), dtype = "<i8")
+		previous, self.previous, self.merges = self.previous, current, []
+		self.snapshot = {"type": "snapshot", "frame": sim.frame, "bodies": current, "removed": np.zeros(0, dtype = "<i8"), "merges": merges}
+		if previous is None:
+			return self.snapshot
+		# the bodies that were in the last message and have not changed at all are left out
+		_, now, before = np.intersect1d(current["id"], previous["id"], assume_unique = True, return_indices = True)
+		same = np.ones(len(now), dtype = bool)
+		for name in Recorder.columns:
+			same &= (current[name][now] == previous[name][before]).reshape(len(now), -1).all(axis = 1)
+		changed = np.ones(len(rows), dtype = bool)
+		changed[now[same]] = False
+		return {"type": "delta", "frame": sim.frame, "bodies": {name: column[changed] for name, column in current.items()}, \
+			"removed": np.setdiff1d(previous["id"], current["id"], assume_unique = True), "merges": merges}
+
+	# A message as a line of JSON
+	@staticmethod
+	def toJSON(message):
+		return (json.dumps({"type": message["type"], "frame": message["frame"], \
+			"bodies": {name: column.tolist() for name, column in message["bodies"].items()}, \
+			"removed": message["removed"].tolist(), "merges": message["merges"].tolist()}) + "\n").encode()
+
+	@staticmethod
+	def fromJSON(line):
+		data = json.loads(line)
+		bodies = {name: np.array(data["bodies"][name], dtype = dtype).reshape(-1, width) if width > 1 else \
+			np.array(data["bodies"][name], dtype = dtype) for name, (dtype, width) in Recorder.columns.items()}
+		return {"type": data["type"], "frame": data["frame"], "bodies": bodies, \
+			"removed": np.array(data["removed"], dtype = "<i8"), "merges": np.array(data["merges"], dtype = "<i8").reshape(-1, 3)}
+
+	# A message as binary: the lengths of a JSON header and of the data (two little-endian uint32s), the header, and then the raw arrays
+	# The header has the type, the frame, and the name, dtype and shape of each array in the order they come in
+	@staticmethod
+	def toBinary(message):
+		arrays = [("bodies." + name, column) for name, column in message["bodies"].items()]
+		arrays += [("removed", message["removed"]), ("merges", message["merges"])]
+		header = json.dumps({"type": message["type"], "frame": message["frame"], \
+			"arrays": [[name, array.dtype.str, list(array.shape)] for name, array in arrays]}).encode()
+		data = b"".join(np.ascontiguousarray(array).tobytes() for _, array in arrays)
+		return struct.pack("<II", len(header), len(data)) + header + data
+
+	@staticmethod
+	def fromBinary(header, data):
+		header = json.loads(header)
+		message = {"type": header["type"], "frame": header["frame"], "bodies": {}}
+		offset = 0
+		for name, dtype, shape in header["arrays"]:
+			dtype = np.dtype(dtype)
+			size = dtype.itemsize*int(np.prod(shape))
+			array = np.frombuffer(data, dtype = dtype, count = int(np.prod(shape)), offset = offset).reshape(shape)
+			offset += size
+			if name.startswith("bodies."):
+				message["bodies"][name[len("bodies."):]] = array
+			else:
+				message[name] = array
+		return message
+
+# Serves a running simulation's messages (see StateStream) to programs that connect to it over a local socket, as NDJSON or binary
+# It is set as a Simulation's 'streamer', and publishes every 'every' frames
+# Sending never waits: each subscriber has its own queue and thread, and one that falls more than 'queueLength' messages behind
+# has what it was not sent yet dropped and is sent a snapshot next (since it can no longer follow the deltas), so a slow subscriber
+# only misses frames and never holds up the simulation
+class StreamServer:
+	formats = {"ndjson": StateStream.toJSON, "binary": StateStream.toBinary}
+
+	# port 0 picks a free port (see 'port')
+	def __init__(self, port = 0, host = "127.0.0.1", format = "ndjson", every = 1, queueLength = 64):
+		if format not in StreamServer.formats:
+			raise ValueError("Unknown stream format: {}".format(format))
+		self.format = format
+		self.every = every
+		self.queueLength = queueLength
+		self.stream = StateStream()
+		self.subscribers = []
+		self.lock = threading.Lock()
+		self.joined = threading.Event() # set once someone has subscribed
+		self.listener = socket.create_server((host, port))
+		self.port = self.listener.getsockname()[1]
+		threading.Thread(target = self.accept, daemon = True).start()
+
+	def accept(self):
+		while True:
+			try:
+				connection, _ = self.listener.accept()
+			except OSError:
+				return
+			connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+			with self.lock:
+				self.subscribers.append(Subscriber(connection, self.queueLength))
+			self.joined.set()
+
+	# Waits until someone has subscribed (returns whether anyone has)
+	def waitForSubscriber(self, timeout = None):
+		return self.joined.wait(timeout)
+
+	# Called by the simulation after every step
+	def publish(self, sim):
+		self.stream.collect(sim)
+		if sim.frame % self.every != 0:
+			return
+		with self.lock:
+			self.subscribers = [subscriber for subscriber in self.subscribers if subscriber.open]
+			subscribers = list(self.subscribers)
+		if len(subscribers) == 0:
+			self.stream.reset()
+			return
+		delta = self.stream.message(sim)
+		encode = StreamServer.formats[self.format]
+		# each kind of message is only encoded once, however many subscribers get it
+		encoded = {}
+		for subscriber in subscribers:
+			message = self.stream.snapshot if subscriber.needsSnapshot else delta
+			if message["type"] not in encoded:
+				encoded[message["type"]] = encode(message)
+			subscriber.send(encoded[message["type"]], message["type"] == "snapshot")
+
+	def close(self):
+		self.listener.close()
+		with self.lock:
+			for subscriber in self.subscribers:
+				subscriber.close()
+			self.subscribers = []
+
+	# Yields the messages served by a StreamServer (as dictionaries of arrays, like StateStream makes) until it closes
+	@staticmethod
+	def subscribe(port, host = "127.0.0.1", format = "ndjson"):
+		with socket.create_connection((host, port)) as connection:
+			f = connection.makefile("rb")
+			while True:
+				if format == "ndjson":
+					line = f.readline()
+					if not line:
+						return
+					yield StateStream.fromJSON(line)
+				else:
+					lengths = f.read(8)
+					if len(lengths) < 8:
+						return
+					headerLength, dataLength = struct.unpack("<II", lengths)
+					yield StateStream.fromBinary(f.read(headerLength), f.read(dataLength))
+
+# One connection to a StreamServer, with its own queue of encoded messages and a thread that sends them
+class Subscriber:
+	def __init__(self, connection, queueLength):
+		self.connection = connection
+		self.queueLength = queueLength
+		self.queue = collections.deque()
+		self.ready = threading.Condition()
+		self.needsSnapshot = True # whether the next message has to be a snapshot
+		self.dropped = 0 # messages dropped because the subscriber was too slow
+		self.open = True
+		threading.Thread(target = self.run, daemon = True).start()
+
+	# Queues a message without waiting
+	def send(self, data, snapshot):
+		with self.ready:
+			if len(self.queue) >= self.queueLength:
+				self.dropped += len(self.queue)
+				self.queue.clear()
+				self.needsSnapshot = True
+			if self.needsSnapshot and not snapshot:
+				self.dropped += 1
+				return
+			self.queue.append(data)
+			self.needsSnapshot = False
+			self.ready.notify()
+
+	def run(self):
+		try:
+			while True:
+				with self.ready:
+					while len(self.queue) == 0 and self.open:
+						self.ready.wait()
+					if not self.open:
+						return
+					data = self.queue.popleft()
+				self.connection.sendall(data)
+		except OSError:
+			pass
+		finally:
+			self.close()
+
+	def close(self):
+		with self.ready:
+			self.open = False
+			self.ready.notify()
+		self.connection.close()
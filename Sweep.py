@@ -0,0 +1,237 @@
+# agent
+# 10/18/2026
+
+import csv
+import importlib
+import math
+import multiprocessing
+import os
+import random
+import time
+import numpy as np
+from Ensemble import Ensemble
+from Seed import Seed
+from Simulation import Simulation
+
+# Scores the state of a run (higher is better)
+# Scorers work on the arrays of the bodies that are left, so they can be used on any kind of run
+class Scorer:
+	# pos: (n, 2) display positions, mass: (n,) masses
+	def score(self, pos, mass):
+		raise NotImplementedError
+
+	# An upper bound on any score the run could still reach, used to stop runs early
+	# The default never stops anything
+	def bound(self, pos, mass):
+		return math.inf
+
+# Rewards bodies that end up near (but not inside) the most massive body
+class EvaluateState(Scorer):
+	maxDist = 450 # bodies farther than this from the most massive one are not counted
+	maxValue = 100 # what a single body can add at most
+
+	def score(self, pos, mass):
+		if len(mass) == 0:
+			return 0.0
+		maxBody = int(np.argmax(mass))
+		dist = np.sqrt(((pos - pos[maxBody])**2).sum(axis = 1))
+		counted = dist <= EvaluateState.maxDist
+		counted[maxBody] = False
+		dist = dist[counted]
+		return float(((2025**(-1))*dist**2-0.444*dist+100).sum())
+
+	# bodies only ever merge, so there can never be more bodies to count than there are now
+	def bound(self, pos, mass):
+		return EvaluateState.maxValue*max(len(mass)-1, 0)
+
+# Rewards runs that keep many bodies
+class BodyCount(Scorer):
+	def score(self, pos, mass):
+		return float(len(mass))
+
+	def bound(self, pos, mass):
+		return float(len(mass))
+
+# Runs many independent random-preset simulations (seeds x body counts x mass ranges) over a process pool
+# and keeps the best 'top' of them
+# With 'batch', each worker runs that many seeds (with the same body count and mass range) together as an Ensemble,
+# which is much faster when the runs only have tens of bodies
+class Sweep:
+	scorers = {"evaluateState": EvaluateState, "bodyCount": BodyCount}
+	# 'frames' is how many frames the run was asked for, and 'stoppedAt' is where it ended (earlier when it was pruned)
+	fields = ["seed", "bodies", "massMin", "massMax", "frames", "stoppedAt", "score", "status", "elapsed"]
+	checkEvery = 50 # how many frames a run goes between checks of whether it can still make the top
+	# how the workers are started: from a fork server where there is one, since a worker forked from a process that has started threads
+	# (like the thread pool of the compiled kernels) can deadlock
+	startMethod = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else None
+
+	def __init__(self, seeds, numBodies, massRanges, frames = 500, scorer = "evaluateState", top = 3, workers = None, out = None, batch = None):
+		self.jobs = [(seed, n, tuple(massRange), frames) for seed in seeds for n in numBodies for massRange in massRanges]
+		self.batch = batch
+		self.scorer = scorer
+		self.top = top
+		self.workers = workers or os.cpu_count()
+		self.out = out
+		self.results = [] # one dictionary per finished run (with the keys in 'fields')
+
+	# Returns a scorer from its name in 'scorers', or from a "module:attribute" path
+	@staticmethod
+	def findScorer(name):
+		if name in Sweep.scorers:
+			return Sweep.scorers[name]()
+		moduleName, _, attribute = name.partition(":")
+		return getattr(importlib.import_module(moduleName), attribute)()
+
+	# Deterministically makes 'count' seed strings from a master seed
+	@staticmethod
+	def generateSeeds(count, master = None):
+		rng = random.Random(master)
+		return [Seed.generateRandom(rng) for _ in range(count)]
+
+	@staticmethod
+	def key(seed, numBodies, massRange, frames):
+		return (seed, int(numBodies), int(massRange[0]), int(massRange[1]), int(frames))
+
+	# The score a run needs to beat to make the top (minus infinity until there are enough finished runs)
+	def threshold(self):
+		scores = sorted((r["score"] for r in self.results if r["status"] == "done"), reverse = True)
+		return scores[self.top-1] if len(scores) >= self.top else -math.inf
+
+	def best(self):
+		done = [r for r in self.results if r["status"] == "done"]
+		return sorted(done, key = lambda r: r["score"], reverse = True)[:self.top]
+
+	# Loads the results already written to 'out', so that those runs are skipped
+	def loadPartial(self):
+		if self.out is None or not os.path.exists(self.out):
+			return self
+		with open(self.out, newline = "") as f:
+			for row in csv.DictReader(f):
+				for name in ("bodies", "massMin", "massMax", "frames", "stoppedAt"):
+					row[name] = int(row[name])
+				row["score"], row["elapsed"] = float(row["score"]), float(row["elapsed"])
+				self.results.append(row)
+		return self
+
+	def run(self):
+		self.loadPartial()
+		finished = {Sweep.key(r["seed"], r["bodies"], (r["massMin"], r["massMax"]), r["frames"]) for r in self.results}
+		jobs = [job for job in self.jobs if Sweep.key(*job) not in finished]
+		context = multiprocessing.get_context(Sweep.startMethod)
+		if Sweep.startMethod == "forkserver":
+			# so that each worker does not have to import everything again
+			context.set_forkserver_preload(["Sweep"])
+		# shared with the workers so that they can stop runs that cannot make the top
+		threshold = context.Value("d", self.threshold())
+		writer, f = None, None
+		if self.out is not None:
+			newFile = not os.path.exists(self.out) or os.path.getsize(self.out) == 0
+			f = open(self.out, "a", newline = "")
+			writer = csv.DictWriter(f, fieldnames = Sweep.fields)
+			if newFile:
+				writer.writeheader()
+		if self.batch:
+			# the jobs in a batch share everything but the seed
+			groups = {}
+			for job in jobs:
+				groups.setdefault(job[1:], []).append(job)
+			work = [group[k:k + self.batch] for group in groups.values() for k in range(0, len(group), self.batch)]
+			runner = Sweep.runBatch
+		else:
+			work, runner = jobs, Sweep.runJob
+		try:
+			with context.Pool(self.workers, initializer = Sweep.initWorker, initargs = (threshold, self.scorer)) as pool:
+				for results in pool.imap_unordered(runner, work, chunksize = max(1, len(work) // (self.workers*16))):
+					for result in (results if self.batch else [results]):
+						self.results.append(result)
+						if writer is not None:
+							writer.writerow(result)
+					threshold.value = self.threshold()
+					if f is not None:
+						f.flush()
+		finally:
+			if f is not None:
+				f.close()
+		return self.best()
+
+	# state of each worker process
+	workerThreshold = None
+	workerScorer = None
+
+	@staticmethod
+	def initWorker(threshold, scorer):
+		Sweep.workerThreshold = threshold
+		Sweep.workerScorer = Sweep.findScorer(scorer)
+
+	# Runs one job in a worker, returning its row of the results table
+	@staticmethod
+	def runJob(job):
+		seed, numBodies, massRange, frames = job
+		startTime = time.perf_counter()
+		sim = Simulation(seed)
+		sim.generateRandomBodies(numBodies, massRange)
+		scorer = Sweep.workerScorer
+		status = "done"
+		while sim.frame < frames:
+			sim.step(min(Sweep.checkEvery, frames - sim.frame))
+			if sim.frame < frames:
+				rows = sim.system.liveRows()
+				if scorer.bound(sim.system.pos[rows], sim.system.mass[rows]) <= Sweep.workerThreshold.value:
+					status = "pruned"
+					break
+		rows = sim.system.liveRows()
+		return Sweep.result(job, sim.frame, scorer.score(sim.system.pos[rows], sim.system.mass[rows]), status, time.perf_counter() - startTime)
+
+	# Runs a batch of jobs (that only differ in their seed) together as an Ensemble in a worker, returning their rows of the results table
+	# Runs that cannot make the top are taken out of the ensemble as they are found
+	# Each run's elapsed time is its share of the batch's
+	@staticmethod
+	def runBatch(jobs):
+		startTime = time.perf_counter()
+		_, numBodies, massRange, frames = jobs[0]
+		ensemble = Ensemble.fromSeeds([job[0] for job in jobs], numBodies, massRange)
+		scorer = Sweep.workerScorer
+		running = list(jobs) # the jobs of the systems still in the ensemble (in the same order)
+		finished = [] # (job, stoppedAt, score, status)
+		while ensemble.frame < frames and len(running) > 0:
+			ensemble.step(min(Sweep.checkEvery, frames - ensemble.frame))
+			if ensemble.frame < frames:
+				pruned = np.array([scorer.bound(*ensemble.bodiesOf(s)) <= Sweep.workerThreshold.value for s in range(len(running))], dtype = bool)
+				finished += [(job, ensemble.frame, scorer.score(*ensemble.bodiesOf(s)), "pruned") for s, job in enumerate(running) if pruned[s]]
+				running = [job for s, job in enumerate(running) if not pruned[s]]
+				ensemble.select(~pruned)
+		finished += [(job, ensemble.frame, score, "done") for job, score in zip(running, ensemble.scores(scorer))]
+		elapsed = (time.perf_counter() - startTime)/len(jobs)
+		return [Sweep.result(job, stoppedAt, score, status, elapsed) for job, stoppedAt, score, status in finished]
+
+	# A row of the results table
+	@staticmethod
+	def result(job, stoppedAt, score, status, elapsed):
+		seed, numBodies, massRange, frames = job
+		return {"seed": seed, "bodies": numBodies, "massMin": massRange[0], "massMax": massRange[1], "frames": frames, "stoppedAt": stoppedAt, \
+			"score": score, "status": status, "elapsed": round(elapsed, 4)}
+
+# Parses a mass range written as "min:max" (e.g. 8e22:4e23)
+def parseMassRange(text):
+	low, high = text.split(":")
+	return (int(float(low)), int(float(high)))
+
+if __name__ == "__main__":
+	import argparse
+	parser = argparse.ArgumentParser(description = "Search random-preset seeds for the best scoring runs")
+	parser.add_argument("--seeds", nargs = "+", default = None, help = "seed strings to try")
+	parser.add_argument("--count", type = int, default = 100, help = "number of seeds to generate when --seeds is not given")
+	parser.add_argument("--master", default = None, help = "master seed for generating seeds")
+	parser.add_argument("--bodies", type = int, nargs = "+", default = [Simulation.randomNumBodies])
+	parser.add_argument("--mass-ranges", type = parseMassRange, nargs = "+", default = [Simulation.randomMassRange])
+	parser.add_argument("--frames", type = int, default = 500)
+	parser.add_argument("--scorer", default = "evaluateState", help = "a name from Sweep.scorers or a module:Class path")
+	parser.add_argument("--top", type = int, default = 3)
+	parser.add_argument("--workers", type = int, default = None)
+	parser.add_argument("--out", default = "sweep.csv", help = "results table (runs already in it are skipped)")
+	parser.add_argument("--batch", type = int, default = None, help = "seeds run together in one array pass by each worker (see Ensemble.py)")
+	args = parser.parse_args()
+	seeds = args.seeds if args.seeds else Sweep.generateSeeds(args.count, args.master)
+	sweep = Sweep(seeds, args.bodies, args.mass_ranges, args.frames, args.scorer, args.top, args.workers, args.out, args.batch)
+	for place, result in enumerate(sweep.run(), 1):
+		print("{}: {} ({} bodies, {:.3g}-{:.3g} kg) {}".format(place, result["seed"], result["bodies"], result["massMin"], result["massMax"], result["score"]))
@@ -0,0 +1,158 @@
+# agent
+# 10/18/2026
+
+import threading
+import time
+import numpy as np
+from Body import Body
+from BodySystem import BodySystem
+
+# A path worked out by a TrajectoryPreview
+class Path:
+	def __init__(self, generation, points, framesPerStep, hit, moving = True):
+		self.generation = generation # of the request it is for
+		self.points = points # world positions, one per step (starting from where the body is launched)
+		self.framesPerStep = framesPerStep
+		self.hit = hit # whether the path ends by running into a body
+		self.moving = moving # whether the other bodies were moved too (or held where they are)
+
+# Predicts where a body that is being aimed will go once it is launched, on its own thread so aiming stays smooth
+# The body is moved through the bodies of a snapshot with the same steps as the euler integrator, until it runs into one of them
+# or 'horizon' frames have passed, and the other bodies are moved along with it (pulling on each other and feeling its pull,
+# but not running into each other)
+# Each prediction is worked out a few times, taking 'passes' frames per step, so a rough path shows up straight away and is refined after
+# Moving the other bodies costs (steps x bodies^2), so a pass that would sum more than moveBudget interactions for them holds them
+# where they are instead (see Path.moving), and is only shown when the passes before it did the same
+# Asking for a new prediction (or cancelling) drops the one being worked on
+# When the fixed bodies have a cached FixedField (see Body.cacheFixedField), their pull is read from it instead of being summed each step
+class TrajectoryPreview(threading.Thread):
+	horizon = 1500 # frames
+	passes = (16, 4, 1) # frames per step of each pass, coarsest first
+	checkEvery = 32 # steps between checks for a newer request (which is also when the other threads get a turn)
+	moveBudget = 2*10**7
+	color = (110, 170, 255)
+
+	def __init__(self, horizon = None):
+		threading.Thread.__init__(self, daemon = True)
+		self.horizon = TrajectoryPreview.horizon if horizon is None else horizon
+		self.ready = threading.Condition()
+		self.request = None # the prediction waiting to be worked on
+		self.generation = 0 # goes up with every request, so work on an older one can tell it is out of date
+		self.result = None # the latest Path
+		self.done = 0 # the last request that has been refined as far as it goes
+		self.stopped = False
+
+	# Asks for the path of a body (of mass and radius rad) launched from pos with momentum vec, through the bodies of 'system'
+	# system has to stay the same while it is being used (like a Snapshot's)
+	def predict(self, system, pos, vec, mass, rad):
+		with self.ready:
+			self.generation += 1
+			self.request = (self.generation, system, pos, vec, mass, rad)
+			self.ready.notify()
+
+	def cancel(self):
+		with self.ready:
+			self.generation += 1
+			self.request = None
+			self.result = None
+
+	def stop(self):
+		with self.ready:
+			self.stopped = True
+			self.ready.notify()
+
+	# The latest path (which is for an earlier request until the first pass of the current one is done), or None
+	def latest(self):
+		return self.result
+
+	# Whether the current request has been refined as far as it goes
+	def finished(self):
+		result = self.result
+		return result is not None and result.generation == self.generation and self.done == self.generation
+
+	def run(self):
+		while True:
+			with self.ready:
+				while self.request is None and not self.stopped:
+					self.ready.wait()
+				if self.stopped:
+					return
+				request, self.request = self.request, None
+			for frames in self.passes:
+				path = self.path(*request, frames)
+				with self.ready:
+					if path is None or request[0] != self.generation:
+						break
+					# a finer path with the other bodies held still is worse than a coarser one with them moving
+					if self.result is not None and self.result.generation == request[0] and self.result.moving and not path.moving:
+						path = None
+					else:
+						self.result = path
+				if path is None:
+					break
+			with self.ready:
+				if request[0] == self.generation:
+					self.done = request[0]
+
+	# The path with steps of 'frames' frames, or None if a newer request came in while it was being worked out
+	def path(self, generation, system, pos, vec, mass, rad, frames):
+		rows = system.liveRows()
+		rows = rows[system.released[rows]]
+		fixed = system.fixed[rows]
+		field = system.fixedField if Body.cacheFixedField and fixed.any() else None
+		# the field is only used if it was made for the snapshot's fixed bodies as they are
+		if field is not None:
+			fixedRows = rows[fixed][np.argsort(system.id[rows[fixed]], kind = 'stable')]
+			masses = field.massesOf(system.id[fixedRows], system.pos[fixedRows], system.mass[fixedRows])
+			if masses is None or not np.array_equal(masses, field.currentMasses()):
+				field = None
+		sources = np.flatnonzero(~fixed) if field is not None else np.arange(len(rows))
+		sm = system.mass[rows[sources]]
+		steps = max(1, self.horizon//frames)
+		moving = steps*len(rows)**2 <= self.moveBudget
+		# positions and velocities (pixels per frame) of the other bodies, and the ones that move
+		others = system.pos[rows].copy()
+		otherVel = system.vec[rows]/(system.mass[rows]*Body.mpp/Body.spf)[:, None]
+		free = np.flatnonzero(~fixed) if moving else np.zeros(0, dtype = np.intp)
+		# the body runs into another when either could absorb the other (see Body.absorbingPairs)
+		otherRad = system.displayRad[rows]
+		reach = np.maximum(otherRad + rad*Body.collisionDistanceFactor, rad + otherRad*Body.collisionDistanceFactor)
+		reach2 = reach*reach
+		# velocity in pixels per frame, and what a sum of (mass * displacement / distance^3) does to it over a step
+		x, y = float(pos[0]), float(pos[1])
+		vx, vy = vec[0]/mass/Body.mpp*Body.spf, vec[1]/mass/Body.mpp*Body.spf
+		kick = Body.G/Body.mpp**3*Body.spf**2*frames
+		points = np.empty((steps + 1, 2))
+		points[0] = x, y
+		hit = False
+		for step in range(1, steps + 1):
+			if step % self.checkEvery == 0:
+				if generation != self.generation:
+					return None
+				time.sleep(0)
+			x += vx*frames
+			y += vy*frames
+			points[step] = x, y
+			others[free] += otherVel[free]*frames
+			dx, dy = others[:, 0] - x, others[:, 1] - y
+			r2 = dx*dx + dy*dy
+			if (r2 <= reach2).any():
+				hit = True
+				break
+			weight = 1/(r2*np.sqrt(r2))
+			ax, ay = (sm*weight[sources]*dx[sources]).sum(), (sm*weight[sources]*dy[sources]).sum()
+			if field is not None:
+				fieldAcc = field.accelerations((x, y))[0]
+				ax, ay = ax + fieldAcc[0], ay + fieldAcc[1]
+			if len(free) > 0:
+				# the other bodies pull on each other (the fixed ones through the field when there is one), and the body pulls on them
+				otherAcc = np.zeros((len(rows), 2))
+				otherAcc[sources] = BodySystem.pairwiseAccelerations(others[sources], others[sources], sm, precision = system.precision)
+				if field is not None:
+					otherAcc[free] += field.accelerations(others[free])
+				otherAcc[:, 0] -= mass*weight*dx
+				otherAcc[:, 1] -= mass*weight*dy
+				otherVel[free] += otherAcc[free]*kick
+			vx += ax*kick
+			vy += ay*kick
+		return Path(generation, points[:step + 1], frames, hit, moving)
@@ -0,0 +1,36 @@
+# agent
+# 10/18/2026
+
+from Body import Body
+
+# The natural units of the simulation: a length of one pixel (Body.mpp meters), a time of one frame (Body.spf seconds),
+# and the mass that makes G equal to 1 in them
+# In these units the acceleration of a body (pixels/frame^2) is just the sum of (mass * displacement / distance^3) over the others,
+# and masses are a few to a few thousand instead of around 10^23 kg, so the values that come up are small enough to work with in float32
+# (see BodySystem.precision)
+# They are worked out from Body's constants each time, so they follow changes to them (like --spf)
+class Units:
+	# meters
+	@staticmethod
+	def length():
+		return Body.mpp
+
+	# seconds
+	@staticmethod
+	def time():
+		return Body.spf
+
+	# kg
+	@staticmethod
+	def mass():
+		return Body.mpp**3/(Body.G*Body.spf**2)
+
+	# kg*m/s (what a BodySystem's 'vec' is in)
+	@staticmethod
+	def momentum():
+		return Units.mass()*Units.length()/Units.time()
+
+	# J
+	@staticmethod
+	def energy():
+		return Units.mass()*(Units.length()/Units.time())**2
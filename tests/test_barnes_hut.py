@@ -0,0 +1,47 @@
+import numpy as np
+from BarnesHut import BarnesHut
+from Body import Body
+from BodySystem import BodySystem
+
+
+def randomCloud(n, seed):
+	rng = np.random.default_rng(seed)
+	pos = rng.uniform(0, 800, (n, 2))
+	# a tight clump as well, so that the tree has to go deep
+	pos[:n // 4] = rng.normal(400, 0.5, (n // 4, 2))
+	mass = rng.uniform(8e22, 4e23, n)
+	return pos, mass
+
+
+def test_tree_matches_direct_at_zero_theta():
+	for seed, n in [(0, 2), (1, 50), (2, 400)]:
+		pos, mass = randomCloud(n, seed)
+		tree = BarnesHut(pos, mass).accelerations(np.arange(n), 0)
+		direct = BodySystem.pairwiseAccelerations(pos, pos, mass)
+		assert np.allclose(tree, direct, rtol = 1e-9, atol = 0)
+
+
+def test_tree_matches_direct_for_some_targets():
+	pos, mass = randomCloud(300, 3)
+	targets = np.array([0, 7, 150, 299])
+	tree = BarnesHut(pos, mass).accelerations(targets, 0)
+	direct = BodySystem.pairwiseAccelerations(pos[targets], pos, mass)
+	assert np.allclose(tree, direct, rtol = 1e-9, atol = 0)
+
+
+def test_tree_error_shrinks_with_theta():
+	pos, mass = randomCloud(2000, 4)
+	errors = [BarnesHut.forceError(pos, mass, theta, 200, np.random.default_rng(5)) for theta in (1.0, 0.5, 0.2)]
+	assert errors[1]["median"] < 1e-2
+	assert errors[2]["median"] < errors[1]["median"] < errors[0]["median"]
+
+
+def test_tree_gravity_mode():
+	pos, mass = randomCloud(500, 6)
+	mode, theta = Body.gravityMode, Body.theta
+	try:
+		Body.gravityMode, Body.theta = "tree", 0
+		acc = Body.findAccelerations(pos, mass)
+	finally:
+		Body.gravityMode, Body.theta = mode, theta
+	assert np.allclose(acc, BodySystem.pairwiseAccelerations(pos, pos, mass), rtol = 1e-9, atol = 0)
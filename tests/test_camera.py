@@ -0,0 +1,66 @@
+import numpy as np
+import pygame
+from Body import Body
+from BodySystem import BodySystem
+from Camera import Camera
+from Renderer import Renderer
+
+
+def test_screen_and_world_round_trip():
+	camera = Camera(800, 600, (-120, 40), 2.5)
+	world = np.array([[0, 0], [13.25, -7.5], [400, 300]])
+	assert np.allclose(camera.screenToWorld(camera.worldToScreen(world)), world)
+	assert np.allclose(camera.worldToScreen((-120, 40)), (0, 0))
+
+
+def test_zoom_keeps_the_point_under_the_mouse():
+	camera = Camera(800, 600)
+	mouse = (250, 410)
+	anchor = camera.screenToWorld(mouse)
+	for factor in (1.25, 1.25, 0.5, 3):
+		camera.zoomAt(factor, mouse)
+		assert np.allclose(camera.screenToWorld(mouse), anchor)
+	camera.zoomAt(10**6, mouse)
+	assert camera.zoom == Camera.maxZoom
+	camera.zoomAt(10**-9, mouse)
+	assert camera.zoom == Camera.minZoom
+
+
+def test_pan_moves_by_screen_pixels():
+	camera = Camera(800, 600, zoom = 4)
+	version = camera.version
+	camera.pan(40, -8)
+	assert np.allclose(camera.pos, (10, -2))
+	assert camera.version > version
+
+
+def test_culling():
+	camera = Camera(100, 100, (0, 0), 1)
+	pos = np.array([[50, 50], [-5, 50], [-5, 50], [150, 150], [50, 104]], dtype = float)
+	rad = np.array([1, 1, 10, 1, 5], dtype = float)
+	assert camera.visible(pos, rad).tolist() == [True, False, True, False, True]
+	start = np.array([[-50, -50], [-50, 50], [200, 0]], dtype = float)
+	end = np.array([[-10, -10], [150, 50], [300, 100]], dtype = float)
+	assert camera.segmentsVisible(start, end).tolist() == [False, True, False]
+
+
+def test_renderer_draws_only_what_is_on_screen():
+	system = BodySystem()
+	system.add((20, 30), (0, 0), 1e23, 3)
+	system.add((500, 500), (0, 0), 1e23, 3)
+	system.add((70, 10), (0, 0), 1e23, 0.1) # smaller than a pixel
+	system.add((80, 80), (0, 0), 1e23, 3, fixed = True)
+	screen = pygame.Surface((100, 100))
+	camera = Camera(100, 100)
+	Renderer.drawBodies(screen, camera, system, system.liveRows())
+	assert screen.get_at((20, 30))[:3] == Body.color
+	assert screen.get_at((70, 10))[:3] == Body.color
+	assert screen.get_at((80, 80))[:3] == Body.fixedColor
+	assert screen.get_at((50, 50))[:3] == (0, 0, 0)
+	# zooming in around the first body moves it to the middle of the screen
+	camera.zoomAt(2, camera.worldToScreen((20, 30)))
+	camera.pan(*(camera.worldToScreen((20, 30)) - (50, 50)))
+	screen.fill((0, 0, 0))
+	Renderer.drawBodies(screen, camera, system, system.liveRows())
+	assert screen.get_at((50, 50))[:3] == Body.color
+	assert screen.get_at((55, 50))[:3] == Body.color # the radius is doubled too
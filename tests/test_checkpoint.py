@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from Body import Body
+from BodySystem import BodySystem
+from Checkpoint import Checkpoint
+from Simulation import Simulation
+
+
+@pytest.fixture
+def settings():
+	saved = Checkpoint.settings()
+	yield
+	Checkpoint.applySettings(saved)
+
+
+def assertSameBodies(a, b):
+	rowsA, rowsB = a.system.liveRows(), b.system.liveRows()
+	for name in ("pos", "vec", "mass", "displayRad", "id"):
+		assert np.array_equal(getattr(a.system, name)[rowsA], getattr(b.system, name)[rowsB]), name
+
+
+@pytest.mark.parametrize("integrator", ["euler", "leapfrog", "block"])
+def test_round_trip_is_bit_exact(tmp_path, settings, integrator):
+	sim = Simulation("abc123", integrator = integrator)
+	sim.loadPreset(Simulation.RANDOM, 60)
+	sim.step(20)
+	path = Checkpoint.save(sim, str(tmp_path/"run.npz"))
+	resumed = Checkpoint.load(path)
+	assert resumed.frame == sim.frame
+	assertSameBodies(sim, resumed)
+	sim.step(30)
+	resumed.step(30)
+	assertSameBodies(sim, resumed)
+
+
+def test_settings_are_restored(tmp_path, settings):
+	Body.spf, Body.gravityMode, Body.theta = 600, "tree", 0.3
+	BodySystem.precision = "float32"
+	sim = Simulation("abc123").loadPreset(Simulation.CIRCULAR_ORBIT)
+	path = Checkpoint.save(sim, str(tmp_path/"run.npz"))
+	Body.spf, Body.gravityMode, Body.theta = 1200, "direct", 0.5
+	BodySystem.precision = "float64"
+	assert Checkpoint.savedSettings(path)["gravityMode"] == "tree"
+	Checkpoint.load(path)
+	assert (Body.spf, Body.gravityMode, Body.theta, BodySystem.precision) == (600, "tree", 0.3, "float32")
@@ -0,0 +1,43 @@
+import numpy as np
+from Body import Body
+from BodySystem import BodySystem
+
+
+def bruteForcePairs(system, rows):
+	pos, rad, mass = system.pos[rows], system.displayRad[rows], system.mass[rows]
+	i, j = np.triu_indices(len(rows), 1)
+	return Body.numpyAbsorbingPairs(pos, rad, mass, i, j)
+
+
+def randomSystem(n, seed, bigCount = 0):
+	rng = np.random.default_rng(seed)
+	system = BodySystem()
+	mass = rng.uniform(1e22, 1e24, n)
+	rad = rng.uniform(0.5, 3, n)
+	# a spread of much bigger bodies, some far bigger than the rest
+	rad[:bigCount] = rng.uniform(5, 200, bigCount)
+	mass[:bigCount] *= 100
+	system.addMany(rng.uniform(0, 800, (n, 2)), 0, mass, rad, released = True)
+	return system
+
+
+def asSet(pairs):
+	return set(zip(pairs[0].tolist(), pairs[1].tolist()))
+
+
+def test_broad_phase_matches_brute_force():
+	for seed, n, bigCount in [(0, 50, 0), (1, 300, 0), (2, 2000, 30), (3, 500, 100)]:
+		system = randomSystem(n, seed, bigCount)
+		rows = system.liveRows()
+		found = Body.findCollidingPairs(system, rows)
+		expected = bruteForcePairs(system, rows)
+		assert len(found[0]) == len(expected[0])
+		assert asSet(found) == asSet(expected)
+
+
+def test_broad_phase_with_one_huge_body():
+	system = randomSystem(1000, 4)
+	system.displayRad[0] = 1000
+	system.mass[0] = 1e30
+	rows = system.liveRows()
+	assert asSet(Body.findCollidingPairs(system, rows)) == asSet(bruteForcePairs(system, rows))
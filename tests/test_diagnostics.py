@@ -0,0 +1,27 @@
+import numpy as np
+from BarnesHut import BarnesHut
+from BodySystem import BodySystem
+from Diagnostics import Diagnostics
+from ParticleMesh import ParticleMesh
+from Simulation import Simulation
+
+
+def test_stream_ends_when_the_diagnostics_stop_the_run():
+	sim = Simulation("abc123")
+	sim.loadPreset(Simulation.CIRCULAR_ORBIT)
+	sim.diagnostics = Diagnostics(10, maxEnergyDrift = 1e-30, stop = True)
+	states = list(sim.stream(every = 3, frames = 100))
+	assert sim.halted()
+	assert sim.frame < 100
+	# the first state, then one every 3 frames, then the frame the run stopped on
+	assert len(states) == 1 + sim.frame//3 + (sim.frame % 3 != 0)
+
+
+def test_tree_and_mesh_find_the_potential_in_the_same_pass():
+	rng = np.random.default_rng(0)
+	pos, mass = rng.uniform(0, 800, (3000, 2)), rng.uniform(8e22, 4e23, 3000)
+	direct = BodySystem.pairwiseAccelerations(pos, pos, mass, potential = True)[1]
+	tree = BarnesHut(pos, mass).accelerations(np.arange(300), 0.0, potential = True)[1]
+	assert np.allclose(tree, direct[:300], rtol = 1e-12, atol = 0)
+	mesh = ParticleMesh(pos, mass).accelerations(np.arange(3000), potential = True)[1]
+	assert abs((mass*mesh).sum()/(mass*direct).sum() - 1) < 1e-3
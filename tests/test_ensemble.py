@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from Ensemble import Ensemble
+from Simulation import Simulation
+from Sweep import Sweep, EvaluateState
+
+SEEDS = ["ensembleA", "ensembleB", "ensembleC", "ensembleD", "ensembleE", "ensembleF"]
+MASS_RANGE = (8*10**22, 4*10**23)
+
+
+def sortedBodies(pos, mass):
+	order = np.lexsort((pos[:, 1], pos[:, 0], mass))
+	return pos[order], mass[order]
+
+
+def test_each_system_matches_its_own_simulation():
+	ensemble = Ensemble.fromSeeds(SEEDS, 40, MASS_RANGE)
+	sims = [Simulation(seed).generateRandomBodies(40, MASS_RANGE) for seed in SEEDS]
+	ensemble.step(150)
+	merged = False
+	for s, sim in enumerate(sims):
+		sim.step(150)
+		rows = sim.system.liveRows()
+		pos, mass = sortedBodies(*ensemble.bodiesOf(s))
+		expectedPos, expectedMass = sortedBodies(sim.system.pos[rows], sim.system.mass[rows])
+		assert len(mass) == len(expectedMass)
+		assert np.allclose(mass, expectedMass, rtol = 1e-12, atol = 0)
+		assert np.allclose(pos, expectedPos, rtol = 0, atol = 1e-6)
+		merged |= len(mass) < 40
+	assert merged
+	assert ensemble.frame == 150
+
+
+def test_select_keeps_the_chosen_systems():
+	ensemble = Ensemble.fromSeeds(SEEDS, 20, MASS_RANGE)
+	ensemble.step(10)
+	before = [ensemble.bodiesOf(s) for s in range(ensemble.systemCount())]
+	keep = np.array([True, False, True, False, False, True])
+	ensemble.select(keep)
+	assert ensemble.systemCount() == 3
+	assert ensemble.seeds == [seed for seed, k in zip(SEEDS, keep) if k]
+	for s, old in enumerate(np.flatnonzero(keep)):
+		assert np.array_equal(ensemble.bodiesOf(s)[0], before[old][0])
+
+
+def test_batched_sweep_scores_match_the_serial_ones():
+	serial = Sweep(SEEDS, [30], [MASS_RANGE], frames = 80, top = len(SEEDS) + 1, workers = 2)
+	batched = Sweep(SEEDS, [30], [MASS_RANGE], frames = 80, top = len(SEEDS) + 1, workers = 2, batch = 4)
+	serial.run()
+	batched.run()
+	expected = {r["seed"]: r["score"] for r in serial.results}
+	scores = {r["seed"]: r["score"] for r in batched.results}
+	assert scores.keys() == expected.keys()
+	for seed in SEEDS:
+		assert scores[seed] == pytest.approx(expected[seed], rel = 1e-9, abs = 1e-9)
+	assert all(r["status"] == "done" and r["stoppedAt"] == 80 for r in batched.results)
+	assert [r["seed"] for r in batched.best()] == [r["seed"] for r in serial.best()]
+	# and the same as the ensemble's own scores
+	ensemble = Ensemble.fromSeeds(SEEDS, 30, MASS_RANGE).step(80)
+	for seed, score in zip(SEEDS, ensemble.scores(EvaluateState())):
+		assert score == pytest.approx(expected[seed], rel = 1e-9, abs = 1e-9)
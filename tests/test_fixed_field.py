@@ -0,0 +1,51 @@
+import numpy as np
+from BodySystem import BodySystem
+from FixedField import FixedField
+
+
+def systemWithFixedBodies():
+	rng = np.random.default_rng(0)
+	system = BodySystem()
+	system.addMany(rng.uniform(0, 800, (40, 2)), 0, rng.uniform(1e23, 1e25, 40), 2.0, released = True, fixed = True)
+	system.addMany(rng.uniform(0, 800, (200, 2)), 0, np.full(200, 1e22), 1.0, released = True)
+	return system
+
+
+def test_snapshot_keeps_the_field_it_was_taken_with():
+	system = systemWithFixedBodies()
+	rows = system.liveRows()
+	fixed, free = rows[system.fixed[rows]], rows[~system.fixed[rows]]
+	field = FixedField.of(system, fixed, system.pos[free])
+	snapshot = system.snapshot(rows)
+	before = snapshot.fixedField.accelerations(snapshot.pos[free])
+	# a fixed body absorbing another gives a new version, and leaves the snapshot's alone
+	system.mass[fixed[0]] *= 2
+	updated = FixedField.of(system, fixed, system.pos[free])
+	assert updated is not field and updated.version == field.version + 1
+	assert np.array_equal(snapshot.fixedField.accelerations(snapshot.pos[free]), before)
+	expected = BodySystem.pairwiseAccelerations(system.pos[free], system.pos[fixed], system.mass[fixed])
+	err = np.sqrt(((updated.accelerations(system.pos[free]) - expected)**2).sum(axis = 1))/np.sqrt((expected**2).sum(axis = 1))
+	assert err.max() < 1e-2
+	# asking again without changes keeps the same version
+	assert FixedField.of(system, fixed, system.pos[free]) is updated
+
+
+def test_removed_fixed_bodies_do_not_make_a_new_grid():
+	system = systemWithFixedBodies()
+	rows = system.liveRows()
+	fixed, free = rows[system.fixed[rows]], rows[~system.fixed[rows]]
+	field = FixedField.of(system, fixed, system.pos[free])
+	# the first fixed body is absorbed by the second
+	system.mass[fixed[1]] += system.mass[fixed[0]]
+	updated = FixedField.of(system, fixed[1:], system.pos[free])
+	assert updated.corners is field.corners
+	expected = BodySystem.pairwiseAccelerations(system.pos[free], system.pos[fixed[1:]], system.mass[fixed[1:]])
+	err = np.sqrt(((updated.accelerations(system.pos[free]) - expected)**2).sum(axis = 1))/np.sqrt((expected**2).sum(axis = 1))
+	assert err.max() < 1e-2
+	# once the pending change has been summed often enough, it is added into the samples
+	for _ in range(200):
+		updated.accelerations(system.pos[free])
+	system.mass[fixed[2]] *= 2
+	folded = FixedField.of(system, fixed[1:], system.pos[free])
+	assert len(folded.pending[0]) == 0 and folded.samples is not field.samples
+	assert folded.error() < 1e-2
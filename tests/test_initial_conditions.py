@@ -0,0 +1,74 @@
+import numpy as np
+from Body import Body
+from InitialConditions import InitialConditions
+from Simulation import Simulation
+
+GENERATORS = ["box", "disk", "plummer", "rings"]
+
+
+def test_threaded_bodies_match_serial(monkeypatch):
+	monkeypatch.setattr(InitialConditions, "chunkSize", 1000)
+	for name in GENERATORS:
+		serial = InitialConditions.generate(name, "generated", 10500)
+		for workers in (2, 4):
+			threaded = InitialConditions.generate(name, "generated", 10500, workers)
+			for a, b in zip(serial, threaded):
+				assert np.array_equal(a, b), name
+
+
+def test_chunks_do_not_depend_on_the_count(monkeypatch):
+	monkeypatch.setattr(InitialConditions, "chunkSize", 1000)
+	# the whole chunks of the smaller count are the same as in the larger one
+	small = InitialConditions.generate("box", "generated", 2500)
+	large = InitialConditions.generate("box", "generated", 7000, 3)
+	for a, b in zip(small, large):
+		assert np.array_equal(a[:2000], b[:2000])
+
+
+def test_seeds_give_their_own_bodies():
+	for name in GENERATORS:
+		first = InitialConditions.generate(name, "generated", 500)
+		assert all(np.array_equal(a, b) for a, b in zip(first, InitialConditions.generate(name, "generated", 500)))
+		assert not np.array_equal(first[0], InitialConditions.generate(name, "different", 500)[0])
+		pos, vec, mass = first
+		assert pos.shape == vec.shape == (len(mass), 2)
+		assert np.isfinite(pos).all() and np.isfinite(vec).all() and (mass > 0).all()
+
+
+def test_generator_shapes():
+	pos, vec, mass = InitialConditions.generate("box", "generated", 2000, size = (200, 100), maxSpeed = 0)
+	assert (np.abs(pos - (400, 400)) <= (100, 50)).all()
+	assert not vec.any()
+	lo, hi = InitialConditions.massRange
+	assert ((mass >= lo) & (mass <= hi)).all()
+	# rings: a still central body, then every body moving at the circular speed around it
+	centralMass = 5.972*10**24
+	pos, vec, mass = InitialConditions.generate("rings", "generated", 3001, centralMass = centralMass)
+	assert len(mass) == 3002 and mass[0] == centralMass and not vec[0].any()
+	r = np.sqrt(((pos[1:] - pos[0])**2).sum(axis = 1))
+	speed = np.sqrt((vec[1:]**2).sum(axis = 1))/mass[1:]
+	assert np.allclose(speed, np.sqrt(Body.G*centralMass/(r*Body.mpp)))
+	assert np.allclose(((pos[1:] - pos[0])*vec[1:]).sum(axis = 1), 0, atol = 1e-6*(r*speed*mass[1:]).max())
+	# the plummer sphere is cut off at maxRadius scale radii
+	pos, vec, mass = InitialConditions.generate("plummer", "generated", 5000, scaleRadius = 20, maxRadius = 5)
+	assert (np.sqrt(((pos - (400, 400))**2).sum(axis = 1)) <= 100 + 1e-9).all()
+
+
+def test_random_preset_keeps_its_bodies():
+	sim = Simulation("samebodies").generateRandomBodies(200, Simulation.randomMassRange)
+	expected = Simulation("samebodies")
+	for _ in range(200):
+		pos = (expected.rng.randint(0, Simulation.screenWidth), expected.rng.randint(0, Simulation.screenHeight))
+		expected.addBody(pos, [0, 0], expected.rng.randint(*Simulation.randomMassRange), released = True)
+	rows, expectedRows = sim.system.liveRows(), expected.system.liveRows()
+	for name in ("pos", "vec", "mass", "displayRad", "released"):
+		assert np.array_equal(getattr(sim.system, name)[rows], getattr(expected.system, name)[expectedRows]), name
+
+
+def test_loaded_bodies_do_not_depend_on_the_workers(monkeypatch):
+	monkeypatch.setattr(InitialConditions, "chunkSize", 500)
+	serial = Simulation("loaded").loadGenerated("disk", 3000, centralMass = 1e25)
+	threaded = Simulation("loaded").loadGenerated("disk", 3000, 4, centralMass = 1e25)
+	assert np.array_equal(serial.system.pos[serial.system.liveRows()], threaded.system.pos[threaded.system.liveRows()])
+	assert np.array_equal(serial.system.vec[serial.system.liveRows()], threaded.system.vec[threaded.system.liveRows()])
+	assert len(serial.system.liveRows()) == 3001
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from Simulation import Simulation
+
+
+# the largest relative energy drift allowed over about one orbit of the moon (2000 frames of 20 minutes)
+maxDrift = {"euler": 1e-5, "leapfrog": 1e-9, "yoshida": 1e-12, "rk45": 1e-12, "block": 1e-9}
+
+
+@pytest.mark.parametrize("name", sorted(maxDrift))
+def test_energy_drift_on_earth_and_moon(name):
+	sim = Simulation("abc123", integrator = name)
+	sim.loadPreset(Simulation.CIRCULAR_ORBIT)
+	sim.trackEnergy = True
+	sim.step(2000)
+	assert len(sim.system.liveRows()) == 2
+	assert abs(sim.energyDrift) < maxDrift[name]
+
+
+def test_block_timestep_with_an_unreleased_body():
+	sim = Simulation("abc123", integrator = "block")
+	sim.loadPreset(Simulation.RANDOM, 30)
+	# bodies placed by hand are held until they are released
+	sim.addBody((50, 50), [0, 0], 1e23)
+	held = sim.system.liveRows()[-1]
+	start = sim.system.pos[held].copy()
+	sim.step(5)
+	assert sim.frame == 5
+	assert np.array_equal(sim.system.pos[held], start)
+	assert np.isfinite(sim.system.pos[sim.system.liveRows()]).all()
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from Body import Body
+from BodySystem import BodySystem
+from Kernels import Kernels
+
+
+def randomBodies(n, seed):
+	rng = np.random.default_rng(seed)
+	pos = rng.uniform(0, 800, (n, 2))
+	pos[1] = pos[0] # two bodies in the same place
+	mass = rng.uniform(8e22, 4e23, n)
+	return pos, mass
+
+
+def loopAccelerations(targetPos, sourcePos, sourceMass):
+	acc = np.zeros((len(targetPos), 2))
+	pot = np.zeros(len(targetPos))
+	for t, p in enumerate(targetPos):
+		for q, m in zip(sourcePos, sourceMass):
+			d = q - p
+			r = np.sqrt(d @ d)
+			if r > 0:
+				acc[t] += m*d/r**3
+				pot[t] += m/r
+	return acc, pot
+
+
+def test_numpy_sum_matches_a_plain_loop():
+	pos, mass = randomBodies(120, 0)
+	acc, pot = BodySystem.numpyPairwiseAccelerations(pos[:40], pos, mass, potential = True)
+	expectedAcc, expectedPot = loopAccelerations(pos[:40], pos, mass)
+	assert np.allclose(acc, expectedAcc, rtol = 1e-10, atol = 0)
+	assert np.allclose(pot, expectedPot, rtol = 1e-10, atol = 0)
+
+
+def test_numpy_sum_does_not_depend_on_the_tiles(monkeypatch):
+	pos, mass = randomBodies(500, 1)
+	whole = BodySystem.numpyPairwiseAccelerations(pos, pos, mass)
+	monkeypatch.setattr(BodySystem, "tileElements", 1000)
+	assert np.allclose(BodySystem.numpyPairwiseAccelerations(pos, pos, mass), whole, rtol = 1e-12, atol = 0)
+
+
+def test_numpy_backend_is_used_when_asked(monkeypatch):
+	monkeypatch.setattr(Kernels, "backend", "numpy")
+	assert not Kernels.ready()
+	assert Kernels.active() == "numpy"
+	pos, mass = randomBodies(200, 2)
+	assert np.array_equal(BodySystem.pairwiseAccelerations(pos, pos, mass), BodySystem.numpyPairwiseAccelerations(pos, pos, mass))
+
+
+def test_compiled_kernels_match_numpy(monkeypatch):
+	pytest.importorskip("numba")
+	monkeypatch.setattr(Kernels, "backend", "auto")
+	monkeypatch.setattr(Kernels, "checked", None)
+	assert Kernels.ready()
+	assert Kernels.active() == "numba"
+	pos, mass = randomBodies(700, 3)
+	acc, pot = Kernels.pairwiseAccelerations(pos, pos, mass, potential = True)
+	expectedAcc, expectedPot = BodySystem.numpyPairwiseAccelerations(pos, pos, mass, potential = True)
+	assert np.allclose(acc, expectedAcc, rtol = 1e-9, atol = 0)
+	assert np.allclose(pot, expectedPot, rtol = 1e-9, atol = 0)
+	rad = Body.findDisplayRadius(mass)*np.random.default_rng(4).uniform(1, 20, len(mass))
+	i, j = np.triu_indices(len(mass), 1)
+	larger, smaller = Kernels.absorbingPairs(pos, rad, mass, i, j, Body.collisionDistanceFactor)
+	expectedLarger, expectedSmaller = Body.numpyAbsorbingPairs(pos, rad, mass, i, j)
+	assert np.array_equal(larger, expectedLarger) and np.array_equal(smaller, expectedSmaller)
+
+
+def test_kernels_are_turned_off_when_the_check_fails(monkeypatch):
+	pytest.importorskip("numba")
+	monkeypatch.setattr(Kernels, "backend", "auto")
+	monkeypatch.setattr(Kernels, "checked", None)
+	monkeypatch.setattr(Kernels, "selfCheck", staticmethod(lambda: False))
+	assert Kernels.active() == "numpy"
@@ -0,0 +1,52 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+import pytest
+from BodySystem import BodySystem
+from Camera import Camera
+from Layers import DirtyRects, StaticLayer
+from Renderer import Renderer
+
+
+@pytest.fixture
+def screen():
+	pygame.init()
+	yield pygame.display.set_mode((800, 800))
+	pygame.quit()
+
+
+def spreadBodies(n, seed):
+	rng = np.random.default_rng(seed)
+	system = BodySystem()
+	rad = np.where(np.arange(n) % 2 == 0, 3.0, 0.4)
+	system.addMany(rng.uniform(0, 800, (n, 2)), 0, rng.uniform(1e22, 1e24, n), rad, released = True)
+	return system
+
+
+def test_spread_out_bodies_only_dirty_part_of_the_screen(screen):
+	system = spreadBodies(100, 0)
+	dirty = DirtyRects((800, 800))
+	rects = dirty.add(Renderer.drawBodies(screen, Camera(800, 800), system, system.liveRows()))
+	assert len(rects) > 50
+	# the bodies reach every corner of the screen, but cover little of it
+	assert Renderer.union(rects).width*Renderer.union(rects).height > 0.8*800*800
+	assert dirty.current.mean() < DirtyRects.maxFraction
+	dirty.update()
+	assert len(dirty.stale()) > 0
+	assert sum(rect.width*rect.height for rect in dirty.stale()) < DirtyRects.maxFraction*800*800
+
+
+def test_static_layer_covers_up_last_frame(screen):
+	system = spreadBodies(50, 1)
+	camera = Camera(800, 800)
+	layer = StaticLayer((800, 800), (0, 0, 0))
+	layer.update(camera, system, system.liveRows())
+	dirty = DirtyRects((800, 800))
+	layer.draw(screen, dirty.stale())
+	dirty.add(Renderer.drawBodies(screen, camera, system, system.liveRows()))
+	dirty.update()
+	layer.draw(screen, dirty.stale())
+	assert pygame.surfarray.array2d(screen).max() == 0
@@ -0,0 +1,60 @@
+import time
+import numpy as np
+from BodySystem import BodySystem
+from ParticleMesh import ParticleMesh
+from SpatialHash import SpatialHash
+
+
+def cloud(n, seed):
+	rng = np.random.default_rng(seed)
+	return rng.uniform(0, 800, (n, 2)), rng.uniform(8e22, 4e23, n)
+
+
+def test_escaped_body_does_not_stretch_the_grid():
+	pos, mass = cloud(5000, 0)
+	pos = np.vstack((pos, [[2e5, 2e5]]))
+	mass = np.append(mass, 1e23)
+	mesh = ParticleMesh(pos, mass)
+	assert mesh.cellSize < 2*800/(mesh.gridSize - 1)
+	assert mesh.outliers.tolist() == [5000]
+	targets = np.array([3, 5000, 42])
+	direct = BodySystem.pairwiseAccelerations(pos[targets], pos, mass)
+	approx = mesh.accelerations(targets)
+	# the escaped body is summed directly, so it is exact
+	assert np.allclose(approx[1], direct[1])
+	err = np.sqrt(((approx - direct)**2).sum(axis = 1))/np.sqrt((direct**2).sum(axis = 1))
+	assert err.max() < 0.1
+
+
+def test_some_targets_match_all_targets():
+	pos, mass = cloud(3000, 1)
+	mesh = ParticleMesh(pos, mass)
+	targets = np.array([0, 10, 2999])
+	assert np.allclose(mesh.accelerations(targets), mesh.accelerations(np.arange(3000))[targets], rtol = 1e-9, atol = 0)
+
+
+# The average number of bodies within the short range cutoff of the first 2000
+def closeNeighbors(mesh, pos):
+	reach = mesh.cutoff*ParticleMesh.splitRadius*mesh.cellSize
+	q, j = SpatialHash.queryPairs(pos[:2000], pos, reach)
+	return int((np.sqrt(((pos[q] - pos[j])**2).sum(axis = 1)) < reach).sum())/2000
+
+
+def test_short_range_work_and_error_stay_bounded_at_1e5():
+	timings = {}
+	for n in (10000, 100000):
+		pos, mass = cloud(n, 2)
+		ParticleMesh(pos, mass) # making the kernel, which is only done once per grid size
+		startTime = time.perf_counter()
+		mesh = ParticleMesh(pos, mass)
+		mesh.accelerations(np.arange(n))
+		timings[n] = time.perf_counter() - startTime
+		assert closeNeighbors(mesh, pos) <= 1.5*ParticleMesh.maxNeighbors
+		err = ParticleMesh.forceError(pos, mass, 200, np.random.default_rng(3))
+		assert err["median"] < 2e-2 and err["p99"] < 0.2
+	# the time grows about in proportion to the number of bodies (with room for the larger FFT and a busy machine)
+	assert timings[100000] < 30*timings[10000]
+	# a grid that is too coarse for the bodies brings the cutoff in instead of summing hundreds of neighbors
+	mesh = ParticleMesh(pos, mass, 256)
+	assert mesh.cutoff < ParticleMesh.cutoff
+	assert closeNeighbors(mesh, pos) < 4*ParticleMesh.maxNeighbors
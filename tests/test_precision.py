@@ -0,0 +1,17 @@
+import numpy as np
+from Body import Body
+from BodySystem import BodySystem
+
+
+def test_gravity_uses_the_precision_of_the_store():
+	assert BodySystem.precision == "float64"
+	rng = np.random.default_rng(0)
+	pos, mass = rng.uniform(0, 800, (300, 2)), rng.uniform(8e22, 4e23, 300)
+	sums = {}
+	for precision in ("float64", "float32"):
+		system = BodySystem(precision = precision)
+		system.addMany(pos, 0, mass, 1.0, released = True)
+		sums[precision] = Body.findSystemSums(system, system.liveRows())
+	assert np.array_equal(sums["float32"], BodySystem.pairwiseAccelerations(pos, pos, mass, precision = "float32"))
+	assert np.array_equal(sums["float64"], BodySystem.pairwiseAccelerations(pos, pos, mass, precision = "float64"))
+	assert not np.array_equal(sums["float32"], sums["float64"])
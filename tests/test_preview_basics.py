@@ -0,0 +1,69 @@
+import time
+import numpy as np
+from Simulation import Simulation
+from TrajectoryPreview import TrajectoryPreview
+
+SUN = (np.array([400.0, 400.0]), 5.972*10**24)
+
+
+def fixedSun():
+	sim = Simulation("preview")
+	sim.addBody(SUN[0], [0, 0], SUN[1], released = True, fixed = True)
+	return sim
+
+
+def test_path_around_a_fixed_body_follows_the_simulation():
+	sim = fixedSun()
+	snapshot = sim.system.snapshot(sim.system.liveRows())
+	pos, vec, mass = np.array([400.0, 250.0]), np.array([-1.5e25, 0.0]), 1e22
+	path = TrajectoryPreview(300).path(0, snapshot, pos, vec, mass, 1.0, 1)
+	assert not path.hit and path.framesPerStep == 1 and len(path.points) == 301
+	body = sim.addBody(pos, vec, mass, released = True)
+	expected = [np.array(body.pos)]
+	for _ in range(300):
+		sim.step()
+		expected.append(np.array(body.pos))
+	assert np.allclose(path.points, expected, rtol = 0, atol = 1e-6)
+	# coarser steps cover the same frames in fewer points
+	coarse = TrajectoryPreview(300).path(0, snapshot, pos, vec, mass, 1.0, 4)
+	assert coarse.framesPerStep == 4 and len(coarse.points) == 76
+	assert np.array_equal(coarse.points[0], pos)
+
+
+def test_path_stops_when_it_runs_into_a_body():
+	sim = fixedSun()
+	snapshot = sim.system.snapshot(sim.system.liveRows())
+	path = TrajectoryPreview(1500).path(0, snapshot, np.array([400.0, 250.0]), np.array([0.0, 0.0]), 1e22, 1.0, 1)
+	assert path.hit and len(path.points) < 1501
+	assert np.sqrt(((path.points[-1] - SUN[0])**2).sum()) <= snapshot.displayRad[0] + 1.0 + 1e-9
+
+
+def test_thread_refines_the_latest_request():
+	sim = fixedSun()
+	snapshot = sim.system.snapshot(sim.system.liveRows())
+	preview = TrajectoryPreview(600)
+	preview.start()
+	try:
+		preview.predict(snapshot, np.array([400.0, 250.0]), np.array([-1.5e25, 0.0]), 1e22, 1.0)
+		preview.predict(snapshot, np.array([400.0, 200.0]), np.array([-1.2e25, 0.0]), 1e22, 1.0)
+		deadline = time.time() + 30
+		while not preview.finished() and time.time() < deadline:
+			time.sleep(0.01)
+		assert preview.finished()
+		path = preview.latest()
+		assert path.generation == 2 and path.framesPerStep == TrajectoryPreview.passes[-1]
+		assert np.array_equal(path.points[0], (400.0, 200.0))
+		preview.cancel()
+		assert preview.latest() is None and not preview.finished()
+	finally:
+		preview.stop()
+		preview.join(10)
+	assert not preview.is_alive()
+
+
+def test_out_of_date_requests_are_dropped():
+	sim = fixedSun()
+	snapshot = sim.system.snapshot(sim.system.liveRows())
+	preview = TrajectoryPreview(1500)
+	preview.generation = 5
+	assert preview.path(4, snapshot, np.array([400.0, 250.0]), np.array([-1.5e25, 0.0]), 1e22, 1.0, 1) is None
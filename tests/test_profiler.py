@@ -0,0 +1,56 @@
+import csv
+import json
+import time
+from Profiler import Profiler
+from Simulation import Simulation
+
+
+def test_hooks_do_nothing_without_a_profiler():
+	assert Profiler.active is None
+	assert Profiler.phase("gravity") is Profiler.off
+	Profiler.count("steps")
+
+
+def test_nested_phases_leave_out_the_inner_time():
+	profiler = Profiler().start()
+	try:
+		with Profiler.phase("outer"):
+			time.sleep(0.02)
+			with Profiler.phase("inner"):
+				time.sleep(0.05)
+			with Profiler.phase("inner"):
+				time.sleep(0.05)
+		Profiler.count("things", 3)
+		Profiler.count("things")
+		record = profiler.endFrame(bodies = 10)
+	finally:
+		profiler.stop()
+	assert Profiler.active is None
+	assert record["inner ms"]/1000 >= 0.1
+	assert 0.02 <= record["outer ms"]/1000 < record["inner ms"]/1000
+	assert record["frame ms"] >= record["outer ms"] + record["inner ms"]
+	assert record["things"] == 4
+
+
+def test_simulation_frames_are_profiled(tmp_path):
+	sim = Simulation("profiled")
+	sim.loadPreset(1, 80)
+	profiler = Profiler(window = 5).start()
+	try:
+		for _ in range(8):
+			sim.step()
+			profiler.endFrame(len(sim.system.liveRows()))
+	finally:
+		profiler.stop()
+	stats = profiler.summary()
+	for name in ("gravity ms", "collisions ms", "update ms", "interactions", "bodies/s"):
+		assert name in stats
+	assert stats["interactions"]["mean"] > 0
+	assert stats["frame ms"]["p50"] <= stats["frame ms"]["p99"] <= stats["frame ms"]["max"]
+	assert len(profiler.history["frame ms"]) == 5
+	assert any(line.startswith("gravity ms") for line in profiler.overlayLines())
+	with open(profiler.write(str(tmp_path / "trace.csv")), newline = "") as f:
+		rows = list(csv.DictReader(f))
+	assert [int(row["frame"]) for row in rows] == list(range(8))
+	with open(profiler.write(str(tmp_path / "trace.json"))) as f:
+		assert len(json.load(f)["frames"]) == 8
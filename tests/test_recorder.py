@@ -0,0 +1,25 @@
+import numpy as np
+from Recorder import Recorder, Recording
+from Simulation import Simulation
+
+
+def test_frames_and_ids_keep_going_up_across_a_reset(tmp_path):
+	sim = Simulation("abc123")
+	sim.loadPreset(Simulation.RANDOM, 40)
+	sim.recorder = Recorder(str(tmp_path/"run.rec"), sim)
+	sim.recorder.record(sim)
+	sim.step(30)
+	firstIds = set(sim.system.id[sim.system.liveRows()].tolist())
+	sim.reset()
+	sim.step(30)
+	sim.recorder.close()
+	recording = Recording(str(tmp_path/"run.rec"))
+	frames = recording.index["frame"]
+	assert recording.frameCount() == 61
+	assert (np.diff(frames) > 0).all()
+	merges = recording.mergeEvents["frame"]
+	assert (np.diff(merges) >= 0).all()
+	# the bodies after the reset are new ones as far as the recording is concerned
+	last = set(np.asarray(recording.column("id", recording.frameCount() - 1)).tolist())
+	assert not last & firstIds
+	assert len(recording.mergesUntil(int(frames[30]))) == np.searchsorted(merges, frames[30], side = "right")
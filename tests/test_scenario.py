@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from Body import Body
+from Scenario import Scenario
+from Simulation import Simulation
+
+
+def assertSameBodies(a, b):
+	rowsA, rowsB = a.system.liveRows(), b.system.liveRows()
+	for name in ("pos", "vec", "mass", "displayRad", "fixed", "released"):
+		assert np.array_equal(getattr(a.system, name)[rowsA], getattr(b.system, name)[rowsB]), name
+
+
+@pytest.mark.parametrize("preset", [Simulation.RANDOM, Simulation.OSCILLATION])
+def test_round_trip(tmp_path, preset):
+	sim = Simulation("abc123").loadPreset(preset, 500)
+	# a held body, to check the released column
+	sim.addBody((10, 20), [1e20, 0], 1e23)
+	path = Scenario.save(str(tmp_path/"run.scn"), sim, [True, False, False, True, False])
+	scenario = Scenario(path)
+	assert scenario.count == len(sim.system.liveRows())
+	assert scenario.seed == "abc123"
+	assert scenario.displayInfo() == [True, False, False, True, False]
+	for column in scenario.header["columns"].values():
+		assert column["offset"] % Scenario.alignment == 0
+	loaded = Simulation(scenario.seed).loadScenario(scenario)
+	assertSameBodies(sim, loaded)
+	# and both carry on the same way
+	sim.step(20)
+	loaded.step(20)
+	assertSameBodies(sim, loaded)
+
+
+def test_empty_scenario(tmp_path):
+	sim = Simulation("abc123").loadPreset(Simulation.NONE)
+	scenario = Scenario(Scenario.save(str(tmp_path/"empty.scn"), sim))
+	assert len(Simulation().loadScenario(scenario).system.liveRows()) == 0
+
+
+def test_positions_are_scaled_to_the_current_units(tmp_path):
+	sim = Simulation("abc123").loadPreset(Simulation.CIRCULAR_ORBIT)
+	scenario = Scenario(Scenario.save(str(tmp_path/"orbit.scn"), sim))
+	scenario.units["mpp"] = 2*Body.mpp
+	pos, _, _, rad, _, _ = scenario.bodies()
+	rows = sim.system.liveRows()
+	assert np.allclose(pos, 2*sim.system.pos[rows])
+	assert np.allclose(rad, 2*sim.system.displayRad[rows])
+
+
+def test_not_a_scenario(tmp_path):
+	path = tmp_path/"other.bin"
+	path.write_bytes(b"not a scenario file")
+	with pytest.raises(ValueError):
+		Scenario(str(path))
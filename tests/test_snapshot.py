@@ -0,0 +1,37 @@
+import numpy as np
+from BodySystem import BodySystem
+
+
+def systemWithTrails(frames, maxLength):
+	system = BodySystem()
+	system.addMany(np.zeros((3, 2)), 0, np.ones(3), 1.0, released = True)
+	for frame in range(frames):
+		system.pos[:3] = frame
+		system.appendTrails(system.liveRows(), maxLength)
+	return system
+
+
+def test_snapshot_shares_the_trails_without_seeing_new_points():
+	system = systemWithTrails(10, 5)
+	snapshot = system.snapshot(np.array([2, 0]))
+	assert np.shares_memory(snapshot.trail, system.trail)
+	before = snapshot.trailPoints(0, 5)
+	assert np.array_equal(before[:, 0], [5, 6, 7, 8, 9])
+	# the store carries on adding points, and the oldest ones the snapshot shows are dropped instead of changing
+	for frame in range(10, 12):
+		system.pos[:3] = frame
+		system.appendTrails(system.liveRows(), 5)
+	assert np.array_equal(snapshot.trailPoints(0, 5), before[2:])
+	# clearing the store's trails leaves the snapshot's alone
+	system.clearTrails(system.liveRows())
+	assert not np.shares_memory(snapshot.trail, system.trail)
+	assert np.array_equal(snapshot.trailPoints(1, 5), before[2:])
+
+
+def test_snapshot_can_be_changed_once_it_has_its_own_trails():
+	system = systemWithTrails(4, -1)
+	snapshot = system.snapshot(np.array([1]))
+	snapshot.pos[0] = 100
+	snapshot.appendTrails(np.array([0]), -1)
+	assert np.array_equal(snapshot.trailPoints(0)[:, 0], [0, 1, 2, 3, 100])
+	assert np.array_equal(system.trailPoints(1)[:, 0], [0, 1, 2, 3])
@@ -0,0 +1,88 @@
+import threading
+import time
+import numpy as np
+from Simulation import Simulation
+from Stream import StateStream, StreamServer
+
+
+def newSimulation():
+	sim = Simulation("streamed")
+	sim.loadPreset(1, 150)
+	return sim
+
+
+# Applies a delta to the bodies of the message before it (both as {column: array}), giving the bodies of the new state
+def applyDelta(bodies, delta):
+	keep = ~np.isin(bodies["id"], delta["removed"]) & ~np.isin(bodies["id"], delta["bodies"]["id"])
+	return {name: np.concatenate((column[keep], delta["bodies"][name])) for name, column in bodies.items()}
+
+
+def sortedById(bodies):
+	order = np.argsort(bodies["id"])
+	return {name: column[order] for name, column in bodies.items()}
+
+
+def assertSameBodies(bodies, expected):
+	bodies, expected = sortedById(bodies), sortedById(expected)
+	assert bodies.keys() == expected.keys()
+	for name in expected:
+		assert np.array_equal(bodies[name], expected[name]), name
+
+
+def test_deltas_rebuild_the_snapshots():
+	sim = newSimulation()
+	deltas = list(sim.stream(every = 5, deltas = True, frames = 100))
+	assert sim.streams == []
+	snapshots = list(newSimulation().stream(every = 5, frames = 100))
+	assert len(deltas) == len(snapshots) == 21
+	assert deltas[0]["type"] == "snapshot"
+	assert all(message["type"] == "delta" for message in deltas[1:])
+	assert all(message["type"] == "snapshot" for message in snapshots)
+	bodies = deltas[0]["bodies"]
+	for delta, snapshot in zip(deltas, snapshots):
+		assert delta["frame"] == snapshot["frame"]
+		if delta["type"] == "delta":
+			bodies = applyDelta(bodies, delta)
+			# every absorbed body is among the removed ones, and every survivor is too unless it is still there
+			assert np.isin(delta["merges"][:, 2], delta["removed"]).all()
+			assert np.isin(delta["merges"][:, 1], np.concatenate((bodies["id"], delta["removed"]))).all()
+		assertSameBodies(bodies, snapshot["bodies"])
+	assert sum(len(delta["merges"]) for delta in deltas) > 0
+	assert sum(len(delta["bodies"]["id"]) for delta in deltas[1:]) > 0
+
+
+def test_messages_survive_encoding():
+	messages = list(newSimulation().stream(every = 10, deltas = True, frames = 40))
+	for message in messages:
+		line = StateStream.toJSON(message)
+		assert line.endswith(b"\n") and line.count(b"\n") == 1
+		binary = StateStream.toBinary(message)
+		headerLength = int.from_bytes(binary[:4], "little")
+		for decoded in (StateStream.fromJSON(line), StateStream.fromBinary(binary[8:8 + headerLength], binary[8 + headerLength:])):
+			assert decoded["type"] == message["type"] and decoded["frame"] == message["frame"]
+			assertSameBodies(decoded["bodies"], message["bodies"])
+			assert np.array_equal(decoded["removed"], message["removed"])
+			assert np.array_equal(decoded["merges"].reshape(-1, 3), message["merges"])
+
+
+def test_socket_subscriber_follows_the_run():
+	for format in ("ndjson", "binary"):
+		sim = newSimulation()
+		server = StreamServer(format = format, every = 5)
+		received = []
+		reader = threading.Thread(target = lambda: received.extend(StreamServer.subscribe(server.port, format = format)), daemon = True)
+		reader.start()
+		assert server.waitForSubscriber(10)
+		sim.streamer = server
+		sim.run(50)
+		deadline = time.time() + 10
+		while len(received) < 10 and time.time() < deadline:
+			time.sleep(0.01)
+		server.close()
+		reader.join(10)
+		assert [message["frame"] for message in received] == list(range(5, 55, 5))
+		assert received[0]["type"] == "snapshot"
+		bodies = received[0]["bodies"]
+		for delta in received[1:]:
+			bodies = applyDelta(bodies, delta)
+		assertSameBodies(bodies, StateStream().message(sim)["bodies"])
@@ -0,0 +1,55 @@
+import csv
+import numpy as np
+import pytest
+from Simulation import Simulation
+from Sweep import Sweep, EvaluateState, BodyCount
+
+SEEDS = ["sweepA", "sweepB", "sweepC", "sweepD"]
+MASS_RANGE = (8*10**22, 4*10**23)
+
+
+def serialScore(seed, numBodies, frames, scorer):
+	sim = Simulation(seed)
+	sim.generateRandomBodies(numBodies, MASS_RANGE)
+	sim.step(frames)
+	rows = sim.system.liveRows()
+	return scorer.score(sim.system.pos[rows], sim.system.mass[rows])
+
+
+def test_parallel_scores_match_serial_runs():
+	# with a top bigger than the number of runs nothing can be pruned
+	sweep = Sweep(SEEDS, [20], [MASS_RANGE], frames = 60, top = len(SEEDS) + 1, workers = 2)
+	best = sweep.run()
+	assert len(sweep.results) == len(SEEDS)
+	scores = {r["seed"]: r["score"] for r in sweep.results}
+	for seed in SEEDS:
+		assert scores[seed] == pytest.approx(serialScore(seed, 20, 60, EvaluateState()), rel = 1e-12)
+	assert [r["score"] for r in best] == sorted(scores.values(), reverse = True)[:len(best)]
+	assert all(r["status"] == "done" and r["stoppedAt"] == 60 for r in sweep.results)
+
+
+def test_pruned_runs_never_make_the_top():
+	sweep = Sweep(SEEDS, [20], [MASS_RANGE], frames = 120, scorer = "bodyCount", top = 1, workers = 2)
+	best = sweep.run()
+	assert len(best) == 1
+	for r in sweep.results:
+		if r["status"] == "pruned":
+			assert r["stoppedAt"] < 120
+			assert r["score"] <= best[0]["score"]
+	assert best[0]["score"] == serialScore(best[0]["seed"], 20, 120, BodyCount())
+
+
+def test_finished_runs_are_skipped(tmp_path):
+	out = str(tmp_path / "sweep.csv")
+	Sweep(SEEDS[:2], [20], [MASS_RANGE], frames = 30, top = 5, workers = 2, out = out).run()
+	again = Sweep(SEEDS, [20], [MASS_RANGE], frames = 30, top = 5, workers = 2, out = out)
+	again.run()
+	with open(out, newline = "") as f:
+		rows = list(csv.DictReader(f))
+	assert sorted(r["seed"] for r in rows) == sorted(SEEDS)
+	assert sorted(r["seed"] for r in again.results) == sorted(SEEDS)
+
+
+def test_generated_seeds_are_reproducible():
+	assert Sweep.generateSeeds(5, "master") == Sweep.generateSeeds(5, "master")
+	assert len(set(Sweep.generateSeeds(50, "master"))) == 50
@@ -0,0 +1,29 @@
+import numpy as np
+from Simulation import Simulation
+from TrajectoryPreview import TrajectoryPreview
+
+
+def test_path_follows_the_simulation_with_the_other_bodies_moving():
+	sim = Simulation("abc123")
+	sim.loadPreset(Simulation.CIRCULAR_ORBIT)
+	snapshot = sim.system.snapshot(sim.system.liveRows())
+	pos, vec, mass = np.array([400.0, 150.0]), np.array([-6e25, 0.0]), 1e22
+	path = TrajectoryPreview(200).path(0, snapshot, pos, vec, mass, 1.0, 1)
+	assert path.moving and not path.hit
+	body = sim.addBody(pos, vec, mass, released = True)
+	expected = [np.array(body.pos)]
+	for _ in range(200):
+		sim.step()
+		expected.append(np.array(body.pos))
+	assert np.allclose(path.points, expected, rtol = 0, atol = 1e-6)
+
+
+def test_too_many_bodies_are_held_still():
+	sim = Simulation("abc123")
+	sim.loadPreset(Simulation.RANDOM, 200)
+	snapshot = sim.system.snapshot(sim.system.liveRows())
+	preview = TrajectoryPreview(1000)
+	preview.moveBudget = 1000*200**2 - 1
+	path = preview.path(0, snapshot, np.array([-500.0, -500.0]), np.array([0.0, 0.0]), 1e22, 1.0, 1)
+	assert not path.moving
+	assert preview.path(0, snapshot, np.array([-500.0, -500.0]), np.array([0.0, 0.0]), 1e22, 1.0, 16).moving
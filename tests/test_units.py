@@ -0,0 +1,65 @@
+import numpy as np
+from Body import Body
+from BodySystem import BodySystem
+from Simulation import Simulation
+from Units import Units
+
+
+def randomBodies(n, seed):
+	rng = np.random.default_rng(seed)
+	return rng.uniform(0, 800, (n, 2)), rng.uniform(8e22, 4e23, n)
+
+
+def relativeErrors(acc, expected):
+	return np.sqrt(((acc - expected)**2).sum(axis = 1))/np.sqrt((expected**2).sum(axis = 1))
+
+
+def test_natural_units_make_g_one():
+	assert np.isclose(Body.G*Units.mass()*Units.time()**2/Units.length()**3, 1)
+	assert np.isclose(Units.momentum(), Units.mass()*Body.mpp/Body.spf)
+	assert np.isclose(Units.energy(), Units.mass()*(Body.mpp/Body.spf)**2)
+
+
+def test_float32_forces_stay_close_to_float64(monkeypatch):
+	pos, mass = randomBodies(2000, 0)
+	# bodies far from the origin, where float32 positions would lose the most
+	pos += 1e5
+	expectedAcc, expectedPot = BodySystem.numpyPairwiseAccelerations(pos, pos, mass, potential = True)
+	monkeypatch.setattr(BodySystem, "precision", "float32")
+	acc, pot = BodySystem.pairwiseAccelerations(pos, pos, mass, potential = True)
+	assert acc.dtype == np.float64
+	err = relativeErrors(acc, expectedAcc)
+	assert np.median(err) < 1e-5
+	assert err.max() < 1e-3
+	potErr = np.abs(pot - expectedPot)/expectedPot
+	assert np.median(potErr) < 1e-5
+	assert potErr.max() < 1e-3
+
+
+def test_float32_stores_halve_the_reduced_columns(monkeypatch):
+	monkeypatch.setattr(BodySystem, "precision", "float32")
+	system = BodySystem()
+	pos, mass = randomBodies(100, 1)
+	for p, m in zip(pos, mass):
+		system.add(p, (0, 0), m, Body.findDisplayRadius(m), released = True)
+	for name in BodySystem.reduced:
+		assert getattr(system, name).dtype == np.float32, name
+	for name in ("pos", "vec", "mass"):
+		assert getattr(system, name).dtype == np.float64, name
+	copy = BodySystem.fromState(system.getState())
+	monkeypatch.setattr(BodySystem, "precision", "float64")
+	assert copy.precision == "float32"
+	assert copy.displayRad.dtype == np.float32
+	assert np.array_equal(copy.pos[:copy.count], system.pos[:system.count])
+
+
+def test_float32_run_follows_the_float64_one(monkeypatch):
+	runs = {}
+	for precision in ("float64", "float32"):
+		monkeypatch.setattr(BodySystem, "precision", precision)
+		sim = Simulation("precision")
+		sim.loadPreset(Simulation.CIRCULAR_ORBIT)
+		sim.run(500)
+		runs[precision] = sim.system.pos[sim.system.liveRows()]
+	assert runs["float32"].shape == runs["float64"].shape
+	assert np.allclose(runs["float32"], runs["float64"], rtol = 0, atol = 1e-3)